@@ -1,6 +1,18 @@
+import uuid
+
 import streamlit as st
-import numpy as np
-import plotly.graph_objects as go
+
+from figure_cache import get_figure_cache, quantize_key
+from figures import (APP_MODES, APP_SLIDERS, APP_SWEEPS, PHASE_SLIDERS, SAMPLINGS, app_sample_steps,
+                     build_app_figure, build_phase_figure, phase_cell_params)
+from frame_bundle import get_frame_bundle
+from frame_encoding import ENCODINGS, figure_payload_bytes
+from geometry import calc_c_range
+from memory_report import memory_lines
+from metrics import current_run, note, record_run, stage, timed
+from regions import region, region_stats
+from streaming import APP_STREAM_TRACES, STREAM_STEPS_SLIDER, app_frame_stream, app_stream_base, stream_chart
+from warmup import get_warmer
 
 # --- 1. 页面配置 ---
 st.set_page_config(
@@ -14,245 +26,236 @@ st.set_page_config(
 # 只有下面的 Plotly 图表会被强制画成白底。
 
 # ==========================================
-# PART A: 数学核心逻辑 (保持不变)
+# PART A/B: 数学核心逻辑 —— 见 geometry.py (只依赖 NumPy)
+#           动画帧与图表生成 —— 见 figures.py
 # ==========================================
-def get_triangle_CDE(c, angle_deg):
-    theta = np.radians(angle_deg)
-    xc, yc = c, c
-    xd = xc + 2 * np.cos(theta)
-    yd = yc + 2 * np.sin(theta)
-    theta_de = theta - np.pi/2
-    xe = xd + 2 * np.cos(theta_de)
-    ye = yd + 2 * np.sin(theta_de)
-    return np.array([[xc, yc], [xd, yd], [xe, ye]])
-
-def apply_n_transform(points, n, progress):
-    trans_points = points.copy()
-    if progress <= 0.5:
-        t = progress / 0.5
-        trans_points[:, 1] = points[:, 1] * (1 - t) + (2 * n - points[:, 1]) * t
-    else:
-        trans_points[:, 1] = 2 * n - points[:, 1]
-        t = (progress - 0.5) / 0.5
-        trans_points[:, 0] = points[:, 0] + t * n
-    return trans_points
-
-def check_intersection(points):
-    D_prime = points[1]
-    E_prime = points[2]
-    val_D = D_prime[1] - D_prime[0]
-    val_E = E_prime[1] - E_prime[0]
-    return (val_D * val_E <= 0)
-
-def calc_c_range(angle_deg, n):
-    base_tri = get_triangle_CDE(0, angle_deg)
-    sum_D = base_tri[1, 0] + base_tri[1, 1]
-    sum_E = base_tri[2, 0] + base_tri[2, 1]
-    c1 = (n - sum_D) / 2
-    c2 = (n - sum_E) / 2
-    return min(c1, c2), max(c1, c2)
 
 # ==========================================
-# PART B: 通用绘图数据生成器
+# PART C: 页面分区
 # ==========================================
-def get_trace_data(c, n, angle, progress):
-    pts_orig = get_triangle_CDE(c, angle)
-    pts_trans = apply_n_transform(pts_orig, n, progress)
-    
-    plot_orig = np.vstack([pts_orig, pts_orig[0]])
-    plot_trans = np.vstack([pts_trans, pts_trans[0]])
-    
-    is_intersect = check_intersection(pts_trans)
-    highlight = is_intersect and (progress > 0.9)
-    # 颜色：红/绿
-    de_color = '#FF0000' if highlight else '#008000' 
-    de_width = 5 if highlight else 3
-    
-    return {
-        "n_line_y": [n, n],
-        "c_line_x": [c, c],
-        "orig_x": plot_orig[:, 0], "orig_y": plot_orig[:, 1],
-        "txt_orig_x": [pts_orig[0,0], pts_orig[1,0], pts_orig[2,0]],
-        "txt_orig_y": [pts_orig[0,1], pts_orig[1,1], pts_orig[2,1]],
-        "trans_x": plot_trans[:, 0], "trans_y": plot_trans[:, 1],
-        "txt_trans_x": [pts_trans[0,0], pts_trans[1,0], pts_trans[2,0]],
-        "txt_trans_y": [pts_trans[0,1], pts_trans[1,1], pts_trans[2,1]],
-        "de_x": [pts_trans[1,0], pts_trans[2,0]], "de_y": [pts_trans[1,1], pts_trans[2,1]],
-        "de_color": de_color, "de_width": de_width,
-        "c_pos": [c], "c_label_text": [f"c={c:.1f}"]
-    }
+# 主区域先放好占位，参数控件所在的片段 (st.fragment) 往里写内容。
+# 拖动滑块只重跑这个片段，模式选择、标题等不会跟着重建；
+# 片段内部的理论说明和图表再各自按输入复用上一次的结果 (见 regions.py)。
+st.title("📐 几何变换全能演示系统")
+theory_slot = st.empty()
+# 相图模式的热力图可以点击选格子，属于控件，不能由片段写到片段外；它由主脚本画在这里
+phase_slot = st.container()
+chart_slot = st.empty()
+
+# 图表按量化后的 (模式, c, n, 角度, 采样, 编码) 缓存，回到看过的参数组合时直接复用
+# 缓存按生成图表时估算的帧数据大小计量 (见 figure_cache.data_nbytes)，不为此序列化或复制图表
+fig_cache = get_figure_cache("app")
+
+# 预计算的帧数据包 (见 frame_bundle.py)；没有生成时为 None，全部现算
+bundle = get_frame_bundle()
+
+# 其他动画模式的图表在后台预热 (见 warmup.py)，切换模式时从预热缓存里取
+warmer = get_warmer("app")
+warm_cache = warmer.cache
 
 # ==========================================
-# PART C: 侧边栏控制
+# PART D: 参数控件 (片段内)
 # ==========================================
-with st.sidebar:
-    st.header("🎮 演示控制器")
-    mode = st.radio(
-        "请选择演示模式：",
-        ("1️⃣ 演示变换过程 (n型变换)", "2️⃣ 演示点 C 移动 (参数 c)", 
-         "3️⃣ 演示参数 n 变化", "4️⃣ 演示旋转角度变化")
-    )
-    st.divider()
-    
+def mode_controls(mode):
+    """当前模式的滑块，返回 (c, n, 角度, 动画变量名)"""
     # 默认值
-    c_val, n_val, angle_val = 1.0, 3.0, 180
-    current_progress = 1.0
-    anim_steps = []
+    c_val, n_val, angle_val = (APP_SLIDERS[p][2] for p in ("c", "n", "angle"))
     anim_var_name = ""
 
     if "1️⃣" in mode:
-        c_val = st.slider("点 C 位置 (c)", -5.0, 8.0, 1.0)
-        n_val = st.slider("参数 n", 1.0, 5.0, 3.0)
-        angle_val = st.slider("旋转角度", 0, 360, 180, 15)
-        anim_steps = np.linspace(0, 1, 50)
+        c_val = st.slider("点 C 位置 (c)", *APP_SLIDERS["c"])
+        n_val = st.slider("参数 n", *APP_SLIDERS["n"])
+        angle_val = st.slider("旋转角度", *APP_SLIDERS["angle"])
         anim_var_name = "progress"
     elif "2️⃣" in mode:
-        n_val = st.slider("参数 n", 1.0, 5.0, 3.0)
-        angle_val = st.slider("旋转角度", 0, 360, 180, 15)
-        anim_steps = np.linspace(-4, 8, 60)
+        n_val = st.slider("参数 n", *APP_SLIDERS["n"])
+        angle_val = st.slider("旋转角度", *APP_SLIDERS["angle"])
         anim_var_name = "c"
     elif "3️⃣" in mode:
-        c_val = st.slider("点 C 位置 (c)", -5.0, 8.0, 1.0)
-        angle_val = st.slider("旋转角度", 0, 360, 180, 15)
-        anim_steps = np.linspace(1, 6, 50)
+        c_val = st.slider("点 C 位置 (c)", *APP_SLIDERS["c"])
+        angle_val = st.slider("旋转角度", *APP_SLIDERS["angle"])
         anim_var_name = "n"
     elif "4️⃣" in mode:
-        c_val = st.slider("点 C 位置 (c)", -5.0, 8.0, 1.0)
-        n_val = st.slider("参数 n", 1.0, 5.0, 3.0)
-        anim_steps = np.linspace(0, 360, 72)
+        c_val = st.slider("点 C 位置 (c)", *APP_SLIDERS["c"])
+        n_val = st.slider("参数 n", *APP_SLIDERS["n"])
         anim_var_name = "angle"
+    elif "5️⃣" in mode:
+        # 与热力图的分辨率相同；点击热力图会把这两个滑块设成所点格子的参数 (见 jump_to_phase_cell)
+        n_val = st.slider("参数 n", *PHASE_SLIDERS["n"], key="phase_n")
+        angle_val = st.slider("旋转角度", *PHASE_SLIDERS["angle"], key="phase_angle")
+        anim_var_name = "c"
+    return c_val, n_val, angle_val, anim_var_name
+
+# 模式 1-4 各自的动画变量；其余两个参数由同名滑块给出
+MODE_ANIM_VARS = dict(zip(APP_MODES, APP_SWEEPS))
+
 
 # ==========================================
-# PART D: 生成动画帧
+# PART D2: 其他模式的后台预热
 # ==========================================
-frames = []
-for val in anim_steps:
-    if anim_var_name == "progress": params = (c_val, n_val, angle_val, val)
-    elif anim_var_name == "c": params = (val, n_val, angle_val, current_progress)
-    elif anim_var_name == "n": params = (c_val, val, angle_val, current_progress)
-    elif anim_var_name == "angle": params = (c_val, n_val, val, current_progress)
-        
-    d = get_trace_data(*params)
-    
-    frames.append(go.Frame(
-        name=str(val),
-        traces=[1, 2, 3, 4, 5, 6, 7, 8],
-        data=[
-            go.Scatter(y=d['n_line_y']),
-            go.Scatter(x=d['c_line_x']),
-            go.Scatter(x=d['orig_x'], y=d['orig_y']),
-            go.Scatter(x=d['txt_orig_x'], y=d['txt_orig_y']),
-            go.Scatter(x=d['trans_x'], y=d['trans_y']),
-            go.Scatter(x=d['txt_trans_x'], y=d['txt_trans_y']),
-            go.Scatter(x=d['de_x'], y=d['de_y'], line=dict(color=d['de_color'], width=d['de_width'])),
-            go.Scatter(x=d['c_pos'], text=d['c_label_text'])
-        ]
-    ))
-
-# 初始计算
-start_val = anim_steps[0]
-if anim_var_name == "progress": init_params = (c_val, n_val, angle_val, start_val)
-elif anim_var_name == "c": init_params = (start_val, n_val, angle_val, current_progress)
-elif anim_var_name == "n": init_params = (c_val, start_val, angle_val, current_progress)
-elif anim_var_name == "angle": init_params = (c_val, n_val, start_val, current_progress)
-d0 = get_trace_data(*init_params)
+def warm_build(mode, c_val, n_val, angle_val, sampling, encoding, current_progress=1.0):
+    """预热任务：与片段里的做法相同 (数据包或现算)，在耗时的图表组装之前检查是否已取消"""
+    anim_var_name = MODE_ANIM_VARS[mode]
+
+    def build(check):
+        bundled = bundle and bundle.app_frames(anim_var_name, c_val, n_val, angle_val, current_progress, sampling)
+        anim_steps, batch = bundled or (
+            app_sample_steps(sampling, anim_var_name, c_val, n_val, angle_val, current_progress), None)
+        check()
+        return build_app_figure(mode, c_val, n_val, angle_val, anim_var_name, anim_steps, current_progress,
+                                encoding, batch, with_nbytes=True)
+    return build
+
+def warm_other_modes(mode, c_val, n_val, angle_val, sampling, encoding):
+    """
+    预热其他动画模式 (1-4)。切换过去时，当前模式也显示着的同名滑块保持原值 (Streamlit 按标签和参数
+    识别同一个控件)，其余滑块回到默认值；采样方式和编码保持不变
+    """
+    current = {"c": c_val, "n": n_val, "angle": angle_val}
+    shown = set(current) - {MODE_ANIM_VARS[mode]} if mode in MODE_ANIM_VARS else set()
+    builds = {}
+    for other, anim_var_name in MODE_ANIM_VARS.items():
+        if other == mode:
+            continue
+        params = {p: current[p] if p in shown else APP_SLIDERS[p][2] for p in current}
+        # 目标模式的动画变量没有滑块，切换过去时取默认值
+        if anim_var_name in params:
+            params[anim_var_name] = APP_SLIDERS[anim_var_name][2]
+        key = quantize_key(other, params["c"], params["n"], params["angle"], sampling, encoding)
+        # 页面缓存里已有的不再预热
+        if key in fig_cache:
+            continue
+        builds[key] = warm_build(other, params["c"], params["n"], params["angle"], sampling, encoding)
+    owner = st.session_state.setdefault("_warm_owner", uuid.uuid4().hex)
+    warmer.want(owner, builds)
+
+
+# ==========================================
+# PART D3: 流式播放 (很长的扫描，见 streaming.py)
+# ==========================================
+def stream_controls():
+    """流式播放的开关和参数；关闭时返回 None，否则返回 (帧数, 是否开始播放)"""
+    if not st.checkbox("🎞️ 流式播放 (服务端逐帧推送，适合很长的扫描)"):
+        return None
+    stream_steps = st.slider("流式帧数", *STREAM_STEPS_SLIDER)
+    return stream_steps, st.button("▶️ 开始流式播放")
+
+def stream_mode(mode, c_val, n_val, angle_val, anim_var_name, current_progress, encoding, stream_steps, start):
+    """图表占位里流式播放当前模式的均匀扫描 (不嵌入帧，不走图表缓存，见 streaming.stream_chart)"""
+    base = region("stream-base", (mode, c_val, n_val, angle_val, encoding),
+                  lambda: app_stream_base(mode, c_val, n_val, angle_val, anim_var_name, current_progress, encoding))
+    frames = app_frame_stream(c_val, n_val, angle_val, anim_var_name, stream_steps, current_progress, encoding)
+    stream_chart(chart_slot, st.empty(), base, frames, APP_STREAM_TRACES, stream_steps, anim_var_name, start)
+
 
 # ==========================================
 # PART E: 绘图与布局 (核心改动区)
 # ==========================================
-st.title("📐 几何变换全能演示系统")
+@st.fragment
+@record_run("app")
+def demo(mode):
+    with stage("params"):
+        c_val, n_val, angle_val, anim_var_name = mode_controls(mode)
+        current_progress = 1.0
 
-c_min, c_max = calc_c_range(angle_val if anim_var_name!='angle' else start_val, 
-                            n_val if anim_var_name!='n' else start_val)
-st.markdown(f"**📊 理论计算：** 当前状态下，使图形相交的 $c$ 的范围是 $[{c_min:.2f}, {c_max:.2f}]$")
-
-fig = go.Figure(
-    data=[
-        # [0] y=x (黑色虚线)
-        go.Scatter(x=[-10, 20], y=[-10, 20], mode='lines', line=dict(color='black', width=1.5, dash='dash'), name='y=x'),
-        # [1] 对称轴
-        go.Scatter(x=[-10, 20], y=d0['n_line_y'], mode='lines', line=dict(color='blue', dash='dashdot'), name='对称轴'),
-        # [2] c指示线
-        go.Scatter(x=d0['c_line_x'], y=[-10, 20], mode='lines', line=dict(color='red', width=1, dash='dot'), showlegend=False),
-        # [3] 原像
-        go.Scatter(x=d0['orig_x'], y=d0['orig_y'], mode='lines+markers', line=dict(color='#800080', dash='dot'), name='原像'),
-        # [4] 原像字母
-        go.Scatter(x=d0['txt_orig_x'], y=d0['txt_orig_y'], mode='text', text=["<b>C</b>","<b>D</b>","<b>E</b>"], 
-                   textfont=dict(size=14, color='#800080'), textposition="top left", showlegend=False),
-        # [5] 变换像
-        go.Scatter(x=d0['trans_x'], y=d0['trans_y'], mode='lines+markers', fill='toself', fillcolor='rgba(0, 128, 0, 0.2)',
-                   line=dict(color='green', width=3), name='变换像'),
-        # [6] 变换像字母
-        go.Scatter(x=d0['txt_trans_x'], y=d0['txt_trans_y'], mode='text', text=["<b>C'</b>","<b>D'</b>","<b>E'</b>"], 
-                   textfont=dict(size=16, color='black'), textposition="bottom right", showlegend=False),
-        # [7] D'E'
-        go.Scatter(x=d0['de_x'], y=d0['de_y'], mode='lines', line=dict(color=d0['de_color'], width=d0['de_width']), name="D'E'"),
-        # [8] c标签
-        go.Scatter(x=d0['c_pos'], y=[-0.5], mode='text', text=d0['c_label_text'], textfont=dict(color='red', size=14), showlegend=False)
-    ],
-    frames=frames
-)
+        st.divider()
+        sampling = st.selectbox("帧采样", list(SAMPLINGS), format_func=SAMPLINGS.get)
+        encoding = st.selectbox("帧数据编码", list(ENCODINGS), format_func=ENCODINGS.get)
+        compare_payload = st.checkbox("显示并对比各编码的数据量")
+        show_timings = st.checkbox("⏱️ 显示各阶段耗时")
+        # 内存报告要遍历会话状态和各个缓存，只在勾选时统计
+        show_memory = st.checkbox("🧠 显示内存 (容量规划)")
+        streaming = stream_controls()
 
-# 布局设置
-fig.update_layout(
-    # --- 1. 背景颜色设置 ---
-    # 强制图表区域变成白纸
-    paper_bgcolor='white', 
-    plot_bgcolor='white',
-    
-    # --- 2. 字体颜色设置 ---
-    # 强制图表内的所有文字变黑 (因为网页是暗色的，Plotly默认可能会用白字，所以必须强制改黑)
-    font=dict(color="black"),
-    
-    height=700,
-    title=dict(text=f"<b>当前演示模式：{mode.split(' ')[1]}</b>", font=dict(size=20, color="black"), x=0.5),
-    
-    # --- 3. 坐标轴设置 (强制黑色) ---
-    xaxis=dict(
-        range=[-6, 12], 
-        zeroline=True, zerolinecolor='black', zerolinewidth=2,
-        gridcolor='#e0e0e0', gridwidth=1,
-        tickfont=dict(color='black', size=14), # 强制刻度黑字
-        title_font=dict(color='black'),        # 强制标题黑字
-        showgrid=True
-    ),
-    yaxis=dict(
-        range=[-6, 12], scaleanchor="x", scaleratio=1,
-        zeroline=True, zerolinecolor='black', zerolinewidth=2,
-        gridcolor='#e0e0e0', gridwidth=1,
-        tickfont=dict(color='black', size=14),
-        title_font=dict(color='black'),
-        showgrid=True
-    ),
-    
-    # --- 4. 图例设置 (白底黑字黑框) ---
-    legend=dict(
-        x=0.01, y=0.99, bgcolor="white",
-        bordercolor="black", borderwidth=1,
-        font=dict(color="black", size=12)
-    ),
-    
-    # --- 5. 动画控件样式 ---
-    updatemenus=[dict(
-        type="buttons", showactive=False,
-        x=0.05, y=0, xanchor="right", yanchor="top",
-        # 按钮背景白，文字黑
-        bgcolor="white", bordercolor="black", borderwidth=1, font=dict(color="black"),
-        buttons=[dict(label="▶️ 播放动画", method="animate", args=[None, dict(frame=dict(duration=50, redraw=True), fromcurrent=True)])]
-    )],
-    
-    sliders=[dict(
-        steps=[dict(
-            method="animate",
-            args=[[str(v)], dict(mode="immediate", frame=dict(duration=0, redraw=True))],
-            label=f"{v:.1f}"
-        ) for v in anim_steps],
-        active=0,
-        # 滑块文字颜色
-        currentvalue=dict(prefix=f"{anim_var_name} : ", font=dict(color="black")),
-        pad=dict(t=0), font=dict(color="black"),
-        bgcolor="white", bordercolor="lightgray", borderwidth=1
-    )]
-)
+        # 网格上的参数直接从数据包取采样序列和几何数据，否则现算
+        bundled = bundle and bundle.app_frames(anim_var_name, c_val, n_val, angle_val, current_progress, sampling)
+        if bundled:
+            anim_steps, batch = bundled
+        else:
+            anim_steps = region("steps", (sampling, mode, c_val, n_val, angle_val),
+                                lambda: app_sample_steps(sampling, anim_var_name, c_val, n_val, angle_val, current_progress))
+            batch = None
+        start_val = anim_steps[0]
+
+    # 理论区间只依赖角度和 n (动画变量取起始值)
+    theory_angle = angle_val if anim_var_name != 'angle' else start_val
+    theory_n = n_val if anim_var_name != 'n' else start_val
+    c_min, c_max = region("theory", (theory_angle, theory_n),
+                          lambda: calc_c_range(theory_angle, theory_n))
+    theory_slot.markdown(f"**📊 理论计算：** 当前状态下，使图形相交的 $c$ 的范围是 $[{c_min:.2f}, {c_max:.2f}]$")
+
+    def get_figure(encoding):
+        """取图表 (优先走缓存)"""
+        key = quantize_key(mode, c_val, n_val, angle_val, sampling, encoding)
+        # 后台预热好的图表移进页面缓存 (大小已知，不再重新计算)
+        warmed = warm_cache.pop(key)
+        if warmed is not None:
+            fig_cache.put(key, *warmed)
+        return fig_cache.get_or_build(
+            key,
+            timed("figure", lambda: build_app_figure(mode, c_val, n_val, angle_val, anim_var_name, anim_steps, current_progress,
+                                              encoding, batch, with_nbytes=True)),
+            sized=True
+        )
+
+    if streaming:
+        stream_mode(mode, c_val, n_val, angle_val, anim_var_name, current_progress, encoding, *streaming)
+        return
+
+    fig = region("chart", (mode, c_val, n_val, angle_val, sampling, encoding), lambda: get_figure(encoding))
+    with stage("chart"):
+        chart_slot.plotly_chart(fig, use_container_width=True)
+    note(frames=len(anim_steps))
+    # 当前图表画好之后再开始预热，参数变了的话上一轮没做完的预热随即取消
+    warm_other_modes(mode, c_val, n_val, angle_val, sampling, encoding)
+
+    # 数据量要把图表再序列化一遍 (计入 "序列化" 阶段)，只在勾选对比时统计
+    if compare_payload:
+        payload_bytes = region("payload", (mode, c_val, n_val, angle_val, sampling, encoding),
+                               lambda: timed("serialize", figure_payload_bytes)(fig))
+        note(payload_bytes=payload_bytes)
+        st.caption(f"图表数据量：{payload_bytes / 1024:.1f} KB")
+        for other in ENCODINGS:
+            other_bytes = timed("serialize", figure_payload_bytes)(get_figure(other))
+            st.caption(f"· {ENCODINGS[other]}：{other_bytes / 1024:.1f} KB "
+                       f"({other_bytes / payload_bytes:.0%})")
+
+    stats = fig_cache.stats()
+    st.caption(f"图表缓存：命中 {stats['hits']} / 未命中 {stats['misses']}，"
+               f"{stats['entries']} 项，{stats['bytes'] / 2**20:.1f} MB")
+    warm = warmer.stats()
+    st.caption(f"后台预热：就绪 {warm['ready']} 项，进行中 {warm['pending']}，"
+               f"完成 {warm['done']} / 取消 {warm['cancelled']}")
+    st.caption(f"帧数据：{'预计算数据包 ' + bundle.describe() if bundled else '现算'}")
+    st.caption("分区重算 (重算/复用)：" + "，".join(
+        f"{name} {computed}/{reused}" for name, (computed, reused) in region_stats().items()))
+    if show_memory:
+        for line in memory_lines(st.session_state.to_dict()):
+            st.caption(line)
+    if show_timings:
+        for line in current_run().lines():
+            st.caption(line)
+
+
+with st.sidebar:
+    st.header("🎮 演示控制器")
+    mode = st.radio("请选择演示模式：", APP_MODES)
+    st.divider()
+    demo(mode)
+
+
+# ==========================================
+# PART F: 相图 (主脚本)
+# ==========================================
+def jump_to_phase_cell():
+    """点击热力图的某一格 (选中的是叠在上面的格子中心点)：把 n / 角度滑块设成该格的参数，下方动画随之切换"""
+    points = st.session_state["phase_chart"].selection.points
+    if points:
+        angle, n = phase_cell_params(points[0]["x"], points[0]["y"])
+        st.session_state["phase_angle"], st.session_state["phase_n"] = angle, n
 
-st.plotly_chart(fig, use_container_width=True)
+if "5️⃣" in mode:
+    with phase_slot:
+        st.caption("悬停查看每一格的 c 区间，点击某一格即跳到该 (n, 角度) 下的点 C 移动动画")
+        st.plotly_chart(build_phase_figure(), use_container_width=True, key="phase_chart",
+                        on_select=jump_to_phase_cell, selection_mode="points")
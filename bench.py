@@ -0,0 +1,163 @@
+"""
+基准测试：帧生成、go.Figure 组装与 to_json 序列化
+
+离线运行，不需要 Streamlit。覆盖 app.py 的四种演示模式和 video.py 的 c 扫描，
+记录耗时、峰值内存和发给浏览器的数据量，结果写入 JSON 文件以便前后对比。
+
+用法:
+    python bench.py                          # 各模式默认帧数
+    python bench.py --steps 50 500 5000      # 放大帧数
+    python bench.py --compare bench-old.json # 与之前的结果对比
+"""
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import time
+import tracemalloc
+
+import numpy as np
+
+from figures import (APP_MODES, APP_SWEEPS, SAMPLINGS, VIDEO_STEPS, app_frame_data, app_sample_steps,
+                     build_app_figure, build_video_figure, video_c_values, video_frame_data)
+from frame_encoding import DEFAULT_ENCODING, ENCODINGS
+
+# 与页面默认滑块值一致
+DEFAULT_PARAMS = dict(c_val=1.0, n_val=3.0, angle_val=180, current_progress=1.0)
+VIDEO_ANGLE = 180
+
+
+def make_cases(steps, encoding, sampling="uniform"):
+    """返回 [(名称, 帧数, 只算帧数据的函数, 生成完整图表的函数), ...]"""
+    cases = []
+    for mode, anim_var_name in zip(APP_MODES, APP_SWEEPS):
+        anim_steps = app_sample_steps(sampling, anim_var_name, DEFAULT_PARAMS["c_val"], DEFAULT_PARAMS["n_val"],
+                                      DEFAULT_PARAMS["angle_val"], DEFAULT_PARAMS["current_progress"], steps)
+        args = (DEFAULT_PARAMS["c_val"], DEFAULT_PARAMS["n_val"], DEFAULT_PARAMS["angle_val"],
+                anim_var_name, anim_steps, DEFAULT_PARAMS["current_progress"], encoding)
+        cases.append((
+            f"app-{anim_var_name}", len(anim_steps),
+            lambda args=args: app_frame_data(*args),
+            lambda mode=mode, args=args: build_app_figure(mode, *args),
+        ))
+    c_values = video_c_values(steps or VIDEO_STEPS, sampling)
+    cases.append((
+        "video-c", len(c_values),
+        lambda: video_frame_data(VIDEO_ANGLE, c_values, encoding),
+        lambda: build_video_figure(VIDEO_ANGLE, c_values, encoding)[0],
+    ))
+    return cases
+
+
+def time_call(fn, repeat):
+    """多次调用取耗时 (秒)，返回 (最小值, 中位数, 最后一次的返回值)"""
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - t0)
+    return min(times), statistics.median(times), result
+
+
+def peak_memory(fn):
+    """单独跑一次并用 tracemalloc 记录峰值内存 (MB)；不与计时混在一起，避免追踪开销影响耗时"""
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1] / 2**20
+    finally:
+        tracemalloc.stop()
+
+
+def run_case(name, n_frames, frames_fn, build_fn, repeat):
+    frames_min, frames_med, _ = time_call(frames_fn, repeat)
+    build_min, build_med, fig = time_call(build_fn, repeat)
+    json_min, json_med, payload = time_call(fig.to_json, repeat)
+    return {
+        "case": name,
+        "frames": n_frames,
+        "frame_gen_s": frames_min, "frame_gen_median_s": frames_med,
+        # 组装 go.Figure 的耗时 = 完整生成 - 只算帧数据
+        "figure_s": max(build_min - frames_min, 0.0),
+        "build_s": build_min, "build_median_s": build_med,
+        "to_json_s": json_min, "to_json_median_s": json_med,
+        "peak_frame_gen_mb": peak_memory(frames_fn),
+        "peak_build_mb": peak_memory(build_fn),
+        "peak_to_json_mb": peak_memory(fig.to_json),
+        "payload_bytes": len(payload.encode("utf-8")),
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_table(results, baseline=None):
+    base = {(r["case"], r["frames"]): r for r in (baseline or [])}
+    header = f"{'case':<12}{'frames':>7}{'frames ms':>11}{'figure ms':>11}{'json ms':>10}{'peak MB':>9}{'payload KB':>12}"
+    if base:
+        header += f"{'build vs base':>15}{'payload vs base':>17}"
+    print(header)
+    for r in results:
+        line = (f"{r['case']:<12}{r['frames']:>7}{r['frame_gen_s'] * 1e3:>11.1f}{r['figure_s'] * 1e3:>11.1f}"
+                f"{r['to_json_s'] * 1e3:>10.1f}{r['peak_build_mb']:>9.1f}{r['payload_bytes'] / 1024:>12.1f}")
+        old = base.get((r["case"], r["frames"]))
+        if old:
+            line += f"{r['build_s'] / old['build_s']:>14.2f}x{r['payload_bytes'] / old['payload_bytes']:>16.2f}x"
+        print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="帧生成 / 图表组装 / 序列化基准测试")
+    parser.add_argument("--steps", type=int, nargs="*", default=[0],
+                        help="每个动画的帧数，可给多个；0 表示各模式的默认帧数")
+    parser.add_argument("--repeat", type=int, default=3, help="每项重复次数 (取最小值和中位数)")
+    parser.add_argument("--encoding", choices=list(ENCODINGS), default=DEFAULT_ENCODING)
+    parser.add_argument("--sampling", choices=list(SAMPLINGS), default="uniform",
+                        help="帧采样方式；adaptive 时 --steps 按均匀采样的帧数折算预算")
+    parser.add_argument("--out", default=None, help="结果文件 (默认 bench-<时间>.json)")
+    parser.add_argument("--compare", default=None, help="与之前保存的结果文件对比")
+    args = parser.parse_args(argv)
+
+    # 预热：导入 Plotly 并加载其校验器，免得第一项的耗时里混进一次性的导入开销
+    make_cases(None, args.encoding)[0][3]()
+
+    results = []
+    for steps in args.steps:
+        for case in make_cases(steps or None, args.encoding, args.sampling):
+            results.append(run_case(*case, repeat=args.repeat))
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+    print_table(results, baseline)
+
+    import plotly
+
+    out = args.out or time.strftime("bench-%Y%m%d-%H%M%S.json")
+    report = {
+        "meta": {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "git": git_revision(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "plotly": plotly.__version__,
+            "encoding": args.encoding,
+            "sampling": args.sampling,
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n结果已保存到 {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,412 @@
+"""
+离线导出：把 video.py 的 c 扫描动画渲染成 GIF / APNG
+
+不需要浏览器、Plotly 或 Streamlit：帧数据仍由 figures.video_frame_data 生成，
+再用 Pillow 按 video.py 图表的样式 (坐标范围、颜色、线型) 直接画成位图。
+帧按块交给进程池栅格化并编码，主进程按顺序把编码好的帧写进文件；
+同时在途的块数有上限，所以扫描再长内存也不会增长。
+
+用法:
+    python export.py --angles 135 180 225 270 --format gif --fps 12
+    python export.py --angles 180 --steps 400 --width 1280 --height 960 --format apng
+    python export.py --angles 180 --font /usr/share/fonts/noto-cjk/NotoSansCJK-Regular.ttc
+
+图中的说明文字是中文。不给 --font 时会在常见位置 (以及 fc-list) 找一个系统中文字体；
+一个也找不到时退回 Pillow 的默认字体，中文会显示成方框，这时必须用 --font 指定字体。
+
+依赖 Pillow (见 requirements.txt)：GIF 用 GifImagePlugin.getheader / getdata 逐帧写入，
+而不是 Image.save(save_all=True)，后者会把全部帧留在内存里。
+"""
+import argparse
+import io
+import os
+import re
+import shutil
+import struct
+import subprocess
+import sys
+import unicodedata
+import zlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+import numpy as np
+from PIL import GifImagePlugin, Image, ImageDraw, ImageFont
+
+from figures import (SAMPLINGS, VIDEO_STEPS, VIDEO_X_RANGE, VIDEO_Y_RANGE, video_c_values, video_curve_resolution,
+                     video_frame_arrays, video_frame_data)
+from geometry import FIXED_N
+
+FORMATS = ("gif", "apng")
+
+# 与 build_video_figure 的布局一致
+X_RANGE = VIDEO_X_RANGE
+Y_RANGE = VIDEO_Y_RANGE
+GRID_STEP = 2
+TITLE = "原像(虚线) vs 变换像(实线)"
+
+# 先按 SUPERSAMPLE 倍分辨率绘制再缩小，得到平滑的线条
+SUPERSAMPLE = 2
+
+# 绘图区四周的边距 (左, 右, 上, 下，像素)
+MARGINS = (60, 20, 50, 50)
+
+# Plotly 的线型 (以线宽为单位的 实线/空白 长度)
+DASHES = {"solid": None, "dot": (1.5, 1.5), "dash": (4.5, 4.5), "dashdot": (4.5, 1.5, 1.5, 1.5)}
+
+# 常见的系统中文字体 (Debian/Ubuntu、Arch、Fedora、文泉驿、macOS、Windows)
+CJK_FONTS = (
+    "/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc",
+    "/usr/share/fonts/noto-cjk/NotoSansCJK-Regular.ttc",
+    "/usr/share/fonts/google-noto-cjk/NotoSansCJK-Regular.ttc",
+    "/usr/share/fonts/truetype/wqy/wqy-microhei.ttc",
+    "/usr/share/fonts/truetype/wqy/wqy-zenhei.ttc",
+    "/System/Library/Fonts/PingFang.ttc",
+    "/System/Library/Fonts/STHeiti Medium.ttc",
+    "C:/Windows/Fonts/msyh.ttc",
+    "C:/Windows/Fonts/simhei.ttf",
+)
+
+COLORS = {
+    "black": (0, 0, 0), "blue": (0, 0, 255), "purple": (128, 0, 128), "gray": (128, 128, 128),
+    "green": (0, 128, 0), "red": (255, 0, 0), "grid": (224, 224, 224), "white": (255, 255, 255),
+}
+
+
+# ==========================================
+# PART A: 栅格化
+# ==========================================
+@lru_cache(maxsize=None)
+def load_font(path, size):
+    if path:
+        return ImageFont.truetype(path, size)
+    return ImageFont.load_default(size)
+
+
+def find_cjk_font():
+    """找一个系统中文字体文件；找不到时返回 None"""
+    for path in CJK_FONTS:
+        if os.path.exists(path):
+            return path
+    # 其余位置交给 fontconfig：只列出支持中文的字体
+    if shutil.which("fc-list"):
+        try:
+            result = subprocess.run(["fc-list", ":lang=zh", "file"], capture_output=True, text=True, timeout=5)
+        except (OSError, subprocess.SubprocessError):
+            return None
+        for line in result.stdout.splitlines():
+            path = line.strip().rstrip(":")
+            if os.path.exists(path):
+                return path
+    return None
+
+
+def plain_lines(label):
+    """Plotly 文字 (含 <b>/<span>/<br>) → [(文字, 颜色), ...]；去掉字体里没有的符号 (✅ 等)"""
+    lines = []
+    for part in re.split(r"<br\s*/?>", label):
+        match = re.search(r"color:\s*([#\w]+)", part)
+        text = re.sub(r"<[^>]+>", "", part)
+        text = "".join(ch for ch in text if unicodedata.category(ch) != "So").strip()
+        lines.append((text, match.group(1) if match else "black"))
+    return lines
+
+
+def to_rgb(color):
+    if color.startswith("#"):
+        return tuple(int(color[i:i + 2], 16) for i in (1, 3, 5))
+    return COLORS[color]
+
+
+class Canvas:
+    """数据坐标 → 像素坐标；x、y 等比例 (对应 scaleanchor)，居中放在绘图区"""
+
+    def __init__(self, width, height, font_path=None):
+        s = SUPERSAMPLE
+        self.size = (width, height)
+        self.image = Image.new("RGB", (width * s, height * s), COLORS["white"])
+        self.draw = ImageDraw.Draw(self.image, "RGBA")
+        self.s = s
+        self.font = load_font(font_path, 14 * s)
+
+        left, right, top, bottom = (m * s for m in MARGINS)
+        plot_w, plot_h = width * s - left - right, height * s - top - bottom
+        self.unit = min(plot_w / (X_RANGE[1] - X_RANGE[0]), plot_h / (Y_RANGE[1] - Y_RANGE[0]))
+        self.x0 = left + (plot_w - self.unit * (X_RANGE[1] - X_RANGE[0])) / 2
+        self.y0 = top + (plot_h + self.unit * (Y_RANGE[1] - Y_RANGE[0])) / 2
+
+    def px(self, x, y):
+        x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+        return self.x0 + (x - X_RANGE[0]) * self.unit, self.y0 - (y - Y_RANGE[0]) * self.unit
+
+    def runs(self, x, y):
+        """按 NaN/None 断开的连续点段 (像素坐标)"""
+        px, py = self.px(np.array(x, dtype=float), np.array(y, dtype=float))
+        finite = np.isfinite(px) & np.isfinite(py)
+        edges = np.flatnonzero(np.diff(np.concatenate([[0], finite.astype(np.int8), [0]])))
+        return [list(zip(px[a:b], py[a:b])) for a, b in zip(edges[::2], edges[1::2])]
+
+    def line(self, x, y, color, width=1, dash="solid", opacity=1.0):
+        rgba = to_rgb(color) + (round(255 * opacity),)
+        w = max(1, round(width * self.s))
+        for pts in self.runs(x, y):
+            if DASHES[dash] is None:
+                self.draw.line(pts, fill=rgba, width=w, joint="curve")
+            else:
+                for seg in dash_segments(pts, [d * w for d in DASHES[dash]]):
+                    self.draw.line(seg, fill=rgba, width=w)
+
+    def polygon(self, x, y, fill):
+        for pts in self.runs(x, y):
+            if len(pts) >= 3:
+                self.draw.polygon(pts, fill=fill)
+
+    def marker(self, x, y, size, color):
+        r = size * self.s / 2
+        for cx, cy in zip(*self.px(x, y)):
+            self.draw.ellipse((cx - r, cy - r, cx + r, cy + r), fill=to_rgb(color))
+
+    def text(self, x, y, label, anchor="lm", font=None, dx=0, dy=0):
+        """在数据坐标 (x, y) 处写 Plotly 风格的多行文字"""
+        font = font or self.font
+        px, py = (float(v) for v in self.px(x, y))
+        lines = plain_lines(label)
+        line_h = font.size * 1.3
+        top = py - line_h * (len(lines) - 1) / 2
+        for k, (text, color) in enumerate(lines):
+            self.draw.text((px + dx * self.s, top + k * line_h + dy * self.s), text,
+                           fill=to_rgb(color), font=font, anchor=anchor)
+
+    def finish(self):
+        return self.image.resize(self.size, Image.Resampling.LANCZOS)
+
+
+def dash_segments(pts, pattern):
+    """把折线切成虚线段"""
+    segments, current = [], [pts[0]]
+    k, remaining, on = 0, pattern[0], True
+    for (x1, y1), (x2, y2) in zip(pts, pts[1:]):
+        length = np.hypot(x2 - x1, y2 - y1)
+        pos = 0.0
+        while length - pos > remaining:
+            pos += remaining
+            t = pos / length
+            point = (x1 + (x2 - x1) * t, y1 + (y2 - y1) * t)
+            if on:
+                segments.append(current + [point])
+            current = [point]
+            k = (k + 1) % len(pattern)
+            remaining, on = pattern[k], not on
+        remaining -= length - pos
+        if on:
+            current.append((x2, y2))
+    if on and len(current) > 1:
+        segments.append(current)
+    return segments
+
+
+def draw_background(canvas):
+    """坐标网格、坐标轴、标题和两条静态参考线 (对应底图的 [0]、[1])"""
+    for v in range(int(X_RANGE[0]), int(X_RANGE[1]) + 1, GRID_STEP):
+        canvas.line([v, v], Y_RANGE, "grid", 1)
+        canvas.text(v, Y_RANGE[0], str(v), anchor="mt", dy=6)
+    for v in range(int(Y_RANGE[0]), int(Y_RANGE[1]) + 1, GRID_STEP):
+        canvas.line(X_RANGE, [v, v], "grid", 1)
+        canvas.text(X_RANGE[0], v, str(v), anchor="rm", dx=-6)
+    canvas.line(X_RANGE, [0, 0], "black", 1)
+    canvas.line([0, 0], Y_RANGE, "black", 1)
+    canvas.draw.text((canvas.image.width / 2, 20 * canvas.s), TITLE, fill=COLORS["black"],
+                     font=canvas.font, anchor="mt")
+
+    diag = (max(X_RANGE[0], Y_RANGE[0]), min(X_RANGE[1], Y_RANGE[1]))
+    canvas.line(diag, diag, "black", 2, "dash")
+    canvas.line(X_RANGE, [FIXED_N, FIXED_N], "blue", 2, "dashdot")
+
+
+def render_frame(frame, width, height, font_path=None):
+    """按 build_video_figure 的样式画出一帧 (frame 为 video_frame_data 的一项，坐标未编码)"""
+    sector, circles, orig, trans, c_pt, c_prime, status = frame
+    canvas = Canvas(width, height, font_path)
+    draw_background(canvas)
+
+    # [2] 扇环 / [3] 轨迹圆
+    canvas.polygon(sector["x"], sector["y"], fill=(128, 0, 128, 77))
+    canvas.line(sector["x"], sector["y"], "purple", 1)
+    canvas.line(circles["x"], circles["y"], "gray", 1, "dot")
+
+    # [4] 原像 CDE / [5] 变换像 C'D'E'
+    canvas.line(orig["x"], orig["y"], "purple", 2, "dot")
+    canvas.line(trans["x"], trans["y"], trans["line"]["color"], 2, opacity=trans["opacity"])
+    for k, name in enumerate("CDE"):
+        canvas.text(orig["x"][k], orig["y"][k], name, anchor="rb", dx=-3, dy=-3)
+        canvas.text(trans["x"][k], trans["y"][k], name + "'", anchor="lb", dx=3, dy=-3)
+
+    # [6] C 点 / [7] C' 点 / [8] 状态文字
+    canvas.marker(c_pt["x"], c_pt["y"], 6, "purple")
+    canvas.marker(c_prime["x"], c_prime["y"], 8, "red")
+    canvas.text(status["x"][0], status["y"][0], status["text"][0])
+    return canvas.finish()
+
+
+# ==========================================
+# PART B: 编码 (流式写入，不把全部帧留在内存里)
+# ==========================================
+@lru_cache(maxsize=None)
+def gif_palette():
+    """固定调色板：各线条颜色与白色按不同比例混合 (对应抗锯齿的边缘)，再补一段灰阶"""
+    white = np.array(COLORS["white"], dtype=float)
+    colors = {tuple(COLORS[name]) for name in COLORS}
+    colors.add((217, 178, 217))  # 扇环填充色 (30% 紫色叠在白底上)
+    shades = set()
+    for color in colors:
+        for t in np.linspace(0, 1, 16):
+            shades.add(tuple(np.round(white + (np.array(color) - white) * t).astype(int)))
+    shades.update((g, g, g) for g in range(0, 256, 16))
+    palette = [v for color in sorted(shades)[:256] for v in color]
+    image = Image.new("P", (1, 1))
+    image.putpalette(palette + [0] * (768 - len(palette)))
+    return image
+
+
+def encode_frame(image, fmt, duration_ms):
+    """单帧编码成字节串：GIF 为一个图像块，APNG 为一张完整的 PNG (写入时再拆出 IDAT)"""
+    if fmt == "gif":
+        frame = image.quantize(palette=gif_palette(), dither=Image.Dither.NONE)
+        return b"".join(GifImagePlugin.getdata(frame, duration=duration_ms, disposal=1))
+    buf = io.BytesIO()
+    image.save(buf, format="PNG", compress_level=6)
+    return buf.getvalue()
+
+
+def png_chunks(data):
+    """[(类型, 内容), ...]"""
+    pos, chunks = 8, []
+    while pos < len(data):
+        length, kind = struct.unpack(">I4s", data[pos:pos + 8])
+        chunks.append((kind, data[pos + 8:pos + 8 + length]))
+        pos += 12 + length
+    return chunks
+
+
+class GifWriter:
+    def __init__(self, f, width, height, n_frames, duration_ms):
+        header = Image.new("P", (width, height))
+        header.putpalette(gif_palette().getpalette())
+        f.write(b"".join(GifImagePlugin.getheader(header, None, {"loop": 0})[0]))
+        self.f = f
+
+    def write(self, frame_bytes):
+        self.f.write(frame_bytes)
+
+    def close(self):
+        self.f.write(b";")
+
+
+class ApngWriter:
+    """逐帧写 APNG：第 0 帧用 IDAT，其余帧改写成带序号的 fdAT"""
+
+    def __init__(self, f, width, height, n_frames, duration_ms):
+        self.f, self.size, self.n_frames = f, (width, height), n_frames
+        self.delay = (duration_ms, 1000)
+        self.seq = 0
+        self.started = False
+
+    def chunk(self, kind, body):
+        self.f.write(struct.pack(">I", len(body)) + kind + body
+                     + struct.pack(">I", zlib.crc32(kind + body) & 0xFFFFFFFF))
+
+    def write(self, png_bytes):
+        chunks = png_chunks(png_bytes)
+        if not self.started:
+            self.f.write(png_bytes[:8])
+            self.chunk(b"IHDR", chunks[0][1])
+            self.chunk(b"acTL", struct.pack(">II", self.n_frames, 0))
+            self.started = True
+        self.chunk(b"fcTL", struct.pack(">IIIIIHHBB", self.seq, *self.size, 0, 0, *self.delay, 0, 0))
+        self.seq += 1
+        for kind, body in chunks:
+            if kind != b"IDAT":
+                continue
+            if self.seq == 1:
+                self.chunk(b"IDAT", body)
+            else:
+                self.chunk(b"fdAT", struct.pack(">I", self.seq) + body)
+                self.seq += 1
+
+    def close(self):
+        self.chunk(b"IEND", b"")
+
+
+WRITERS = {"gif": GifWriter, "apng": ApngWriter}
+
+
+# ==========================================
+# PART C: 并行导出
+# ==========================================
+def render_chunk(angle_val, c_values, resolution, width, height, fmt, duration_ms, font_path):
+    """子进程：生成一块 c 值的帧数据并栅格化、编码；返回 (编码后的帧列表, 校验不一致的帧数)"""
+    arrays = video_frame_arrays(angle_val, c_values, resolution)
+    frame_data, n_mismatch = video_frame_data(angle_val, c_values, encoding="json", arrays=arrays)
+    frames = [encode_frame(render_frame(frame, width, height, font_path), fmt, duration_ms)
+              for frame in frame_data]
+    return frames, n_mismatch
+
+
+def export_angle(pool, out_path, angle_val, c_values, args):
+    """把一个角度的整段扫描写成动画文件；在途的块数不超过 2 × 进程数"""
+    duration_ms = round(1000 / args.fps)
+    chunks = [c_values[i:i + args.chunk] for i in range(0, len(c_values), args.chunk)]
+    max_pending = 2 * (args.workers or os.cpu_count())
+    # 曲线分辨率按整段扫描的帧数和输出图像的绘图区大小选取 (各块一致)
+    resolution = video_curve_resolution(len(c_values), plot_px=(args.width - MARGINS[0] - MARGINS[1],
+                                                                args.height - MARGINS[2] - MARGINS[3]))
+    n_mismatch = 0
+    with open(out_path, "wb") as f:
+        writer = WRITERS[args.format](f, args.width, args.height, len(c_values), duration_ms)
+        pending = deque()
+        for k, chunk in enumerate(chunks):
+            pending.append(pool.submit(render_chunk, angle_val, chunk, resolution, args.width, args.height,
+                                       args.format, duration_ms, args.font))
+            while len(pending) >= max_pending or (pending and k == len(chunks) - 1):
+                frames, mismatch = pending.popleft().result()
+                n_mismatch += mismatch
+                for frame in frames:
+                    writer.write(frame)
+        writer.close()
+    return n_mismatch
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="把 c 扫描动画离线导出为 GIF / APNG")
+    parser.add_argument("--angles", type=float, nargs="+", default=[180.0], help="要导出的旋转角度，可给多个")
+    parser.add_argument("--steps", type=int, default=VIDEO_STEPS, help="帧数 (c 的采样数)")
+    parser.add_argument("--sampling", choices=list(SAMPLINGS), default="uniform",
+                        help="帧采样方式；adaptive 会在相交临界处放慢 (帧数约为 --steps 的 60%%)")
+    parser.add_argument("--format", choices=FORMATS, default="gif")
+    parser.add_argument("--fps", type=float, default=12.5, help="帧率")
+    parser.add_argument("--width", type=int, default=960)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--font", default=None, help="TrueType 字体文件 (需要含中文字形，默认找一个系统中文字体)")
+    parser.add_argument("--chunk", type=int, default=8, help="每个任务渲染多少帧")
+    parser.add_argument("--workers", type=int, default=None, help="进程数 (默认 CPU 核数)")
+    parser.add_argument("--out-dir", default="exports", help="输出目录")
+    args = parser.parse_args(argv)
+    if args.font is None:
+        args.font = find_cjk_font()
+        if args.font is None:
+            print("没有找到中文字体，图中的中文会显示成方框；请用 --font 指定一个中文字体", file=sys.stderr)
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    c_values = video_c_values(args.steps, args.sampling)
+    ext = "gif" if args.format == "gif" else "png"
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        for angle_val in args.angles:
+            out_path = os.path.join(args.out_dir, f"video-angle{angle_val:g}.{ext}")
+            n_mismatch = export_angle(pool, out_path, angle_val, c_values, args)
+            note = f"，{n_mismatch} 帧采样校验与闭式解不一致" if n_mismatch else ""
+            print(f"{out_path}：{len(c_values)} 帧，{os.path.getsize(out_path) / 1024:.0f} KB{note}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""
+跨 rerun 的图表缓存
+
+Streamlit 每拖动一次滑块都会把整个脚本重跑一遍，重新生成全部动画帧和布局。
+这里把做好的图表按量化后的输入参数缓存起来 (LRU 淘汰，限制条目数和字节数)，
+回到刚看过的参数组合时直接复用。缓存放在模块级，同一进程内的所有会话共享。
+字节数按缓存对象在内存里的大小估算，而不是序列化后的长度。图表由生成函数在包装成 Plotly
+对象之前按帧数据估算 (data_nbytes) 后直接传入；其他值按 deep_sizeof 计。
+"""
+import numbers
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+# 默认预算，可用环境变量覆盖
+DEFAULT_MAX_ENTRIES = int(os.environ.get("FIGURE_CACHE_MAX_ENTRIES", 64))
+DEFAULT_MAX_BYTES = int(os.environ.get("FIGURE_CACHE_MAX_BYTES", 256 * 2**20))
+
+
+def quantize_key(*parts, ndigits=6):
+    """把参数量化成缓存键：浮点数四舍五入，避免 1.0 与 1.0000000001 被当成两个键"""
+    key = []
+    for p in parts:
+        if isinstance(p, bool) or not isinstance(p, numbers.Real):
+            key.append(p)
+        elif isinstance(p, numbers.Integral):
+            key.append(int(p))
+        else:
+            key.append(round(float(p), ndigits))
+    return tuple(key)
+
+
+def deep_sizeof(value, _seen=None):
+    """估算对象及其引用的全部内容占用的内存 (字节)；同一对象只计一次"""
+    seen = set() if _seen is None else _seen
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    # numpy 数组的 getsizeof 已包含自有的数据缓冲区
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(v, seen) for v in value)
+    elif hasattr(value, "to_plotly_json"):
+        size += deep_sizeof(value.to_plotly_json(), seen)
+    return size
+
+
+def data_nbytes(value):
+    """
+    图表数据在包装成 Plotly 对象之前的大小估算：numpy 数组按 nbytes，数字按 8 字节，字符串按长度
+    只遍历 dict/list/tuple，不复制任何内容；Plotly 持有的数据与之大致相当
+    """
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, dict):
+        return sum(data_nbytes(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(data_nbytes(v) for v in value)
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    return 8
+
+
+class FigureCache:
+    """线程安全的 LRU 缓存，同时限制条目数和总字节数 (内存占用)，并记录命中/未命中次数"""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES, sizeof=deep_sizeof):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof
+        self._data = OrderedDict()  # key -> (value, nbytes)
+        self._lock = threading.Lock()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._data:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return self._data[key][0]
+
+    def put(self, key, value, nbytes=None):
+        """放入缓存；nbytes 已知时 (例如从另一个缓存移过来) 不再重新计算大小"""
+        if nbytes is None:
+            nbytes = self._sizeof(value)
+        with self._lock:
+            # 同一个键的旧值先移除：即使新值因为太大不缓存，也不能继续返回旧值
+            if key in self._data:
+                self.total_bytes -= self._data.pop(key)[1]
+            # 单个条目就超出字节预算的不缓存
+            if nbytes > self.max_bytes:
+                return
+            self._data[key] = (value, nbytes)
+            self.total_bytes += nbytes
+            while len(self._data) > self.max_entries or self.total_bytes > self.max_bytes:
+                _, (_, old_nbytes) = self._data.popitem(last=False)
+                self.total_bytes -= old_nbytes
+                self.evictions += 1
+
+    def nbytes(self, key):
+        """已缓存条目的字节数，不在缓存中时返回 None (不计入命中统计)"""
+        with self._lock:
+            entry = self._data.get(key)
+            return None if entry is None else entry[1]
+
+    def get_or_build(self, key, build, sized=False):
+        """命中则直接返回；否则调用 build() 生成并放入缓存。sized 为真时 build() 返回 (值, 字节数)"""
+        sentinel = object()
+        value = self.get(key, sentinel)
+        if value is sentinel:
+            if sized:
+                value, nbytes = build()
+            else:
+                value, nbytes = build(), None
+            self.put(key, value, nbytes)
+        return value
+
+    def pop(self, key):
+        """取出并移除条目，返回 (值, 字节数)；不在缓存中时返回 None (计入命中统计)"""
+        with self._lock:
+            entry = self._data.pop(key, None)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.total_bytes -= entry[1]
+            return entry
+
+    def __contains__(self, key):
+        """不计入命中统计，也不调整 LRU 顺序"""
+        with self._lock:
+            return key in self._data
+
+    def values(self):
+        """当前缓存的全部值 (快照)"""
+        with self._lock:
+            return [value for value, _ in self._data.values()]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.total_bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._data),
+                "bytes": self.total_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+            }
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_figure_cache(name, **kwargs):
+    """按名字取进程内共享的缓存实例 (每个页面一个)，第一次调用时按 kwargs 创建"""
+    with _caches_lock:
+        if name not in _caches:
+            _caches[name] = FigureCache(**kwargs)
+        return _caches[name]
+
+
+def all_figure_caches():
+    """{名字: 缓存实例}，本进程内已创建的全部缓存"""
+    with _caches_lock:
+        return dict(_caches)
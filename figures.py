@@ -0,0 +1,765 @@
+"""
+各页面的图表生成 (动画帧数据 + go.Figure 组装)
+
+与 Streamlit 无关，页面、基准测试和其他离线工具都可以直接调用。
+Plotly 只在 build_*_figure 里按需导入，只算帧数据时不会加载。
+"""
+from functools import partial
+
+import numpy as np
+
+from figure_cache import data_nbytes, deep_sizeof, get_figure_cache
+from frame_diff import build_diffed_frames
+from frame_encoding import DEFAULT_ENCODING, encode_coords
+from geometry import (FIXED_N, calc_c_range_batch, calc_sector_c_range, check_polygon_line_intersection_batch,
+                      get_circles_trace_batch, get_geometry_data_batch, get_trace_data_batch,
+                      get_valid_sector_shape_batch, trace_data_at)
+from lod import curve_points, units_per_pixel, zoomed_range
+from metrics import stage
+from sampling import LABEL_DECIMALS, adaptive_steps, find_transitions
+from transforms import (apply_affine, compose, interpolate, n_transform_at, pad_polygons, rotate, scale,
+                        segments_cross_line)
+
+# ==========================================
+# 进程内共享的静态部分
+# ==========================================
+# 布局、滑块 steps、静态 trace 这类不随帧变化的部分，每个进程只构建并校验一次，
+# 以校验后的纯 dict 形式被所有会话只读共享；组装图表时 Plotly 会另外复制一份，不会改到共享的副本
+STATIC_PARTS_MAX_ENTRIES = 256
+static_parts = get_figure_cache("static", max_entries=STATIC_PARTS_MAX_ENTRIES, sizeof=deep_sizeof)
+
+def shared_part(key, build):
+    """取共享的静态部分；build() 返回 Plotly 对象，共享的是它校验后的 to_plotly_json()"""
+    return static_parts.get_or_build(key, lambda: build().to_plotly_json())
+
+def shared_layout(layout_key, build_spec, steps_key, build_steps):
+    """
+    共享的布局 + 滑块 steps 拼成一份布局 dict (只新建最外两层，内部都是共享的对象)
+    steps_key 为 None 时 steps 随参数变化 (自适应采样)，每次现做、不进共享缓存
+    """
+    import plotly.graph_objects as go
+
+    def steps_json():
+        return [go.layout.slider.Step(step).to_plotly_json() for step in build_steps()]
+
+    base = static_parts.get_or_build(layout_key, lambda: go.Layout(build_spec()).to_plotly_json())
+    steps = steps_json() if steps_key is None else static_parts.get_or_build(steps_key, steps_json)
+    return dict(base, sliders=[dict(steps=steps, **base["sliders"][0])])
+
+def uniform_steps_key(key, values, uniform):
+    """values 就是固定的均匀网格 uniform 时返回共享 steps 的键 key，否则 (随参数变化的序列) 返回 None"""
+    return key if np.array_equal(values, uniform) else None
+
+def assemble_figure(data, frames, layout):
+    """组装 go.Figure：trace、帧和布局在各自构造时都已校验过，这里跳过 Figure 的重复校验"""
+    import plotly.graph_objects as go
+
+    return go.Figure(data=data, frames=frames, layout=layout, _validate=False)
+
+# ==========================================
+# PART A: app.py —— 四种演示模式
+# ==========================================
+APP_MODES = ("1️⃣ 演示变换过程 (n型变换)", "2️⃣ 演示点 C 移动 (参数 c)",
+             "3️⃣ 演示参数 n 变化", "4️⃣ 演示旋转角度变化", "5️⃣ 相图 (c 区间随 n 与角度变化)")
+
+# 侧边栏滑块 (最小值, 最大值, 默认值, 步长)；c、n 是 Streamlit 浮点滑块的默认步长 0.01。
+# 预计算帧数据包只覆盖其中较粗的一层网格 (见 frame_bundle.APP_GRID_STEPS)
+APP_SLIDERS = {
+    "c": (-5.0, 8.0, 1.0, 0.01),
+    "n": (1.0, 5.0, 3.0, 0.01),
+    "angle": (0, 360, 180, 15),
+}
+
+# 各动画变量的扫描范围 (起点, 终点, 默认帧数)
+APP_SWEEPS = {
+    "progress": (0, 1, 50),
+    "c": (-4, 8, 60),
+    "n": (1, 6, 50),
+    "angle": (0, 360, 72),
+}
+
+# 帧采样方式: 键为内部名称，值为侧边栏显示的说明；默认均匀，自适应需要在侧边栏选择
+SAMPLINGS = {
+    "uniform": "均匀",
+    "adaptive": "自适应 (相交临界处加密)",
+}
+DEFAULT_SAMPLING = "uniform"
+
+# 自适应采样的帧数预算占均匀采样帧数的比例
+ADAPTIVE_FRACTION = 0.6
+
+def app_anim_steps(anim_var_name, steps=None):
+    """动画变量的取值序列；steps 为空时用默认帧数"""
+    start, stop, default_steps = APP_SWEEPS[anim_var_name]
+    return np.linspace(start, stop, steps or default_steps)
+
+def app_adaptive_steps(anim_var_name, c_val, n_val, angle_val, current_progress, steps=None):
+    """
+    动画变量的自适应取值序列：在 D'E' 高亮开始/结束的位置加密，临界值本身单独成一帧
+    steps 为均匀采样的帧数 (为空时用默认帧数)，实际预算为其 ADAPTIVE_FRACTION
+    """
+    start, stop, default_steps = APP_SWEEPS[anim_var_name]
+    params = {"c": c_val, "n": n_val, "angle": angle_val, "progress": current_progress}
+
+    def highlight(values):
+        batch_params = dict(params, **{anim_var_name: values})
+        return get_trace_data_batch(batch_params["c"], batch_params["n"],
+                                    batch_params["angle"], batch_params["progress"])["highlight"]
+
+    events = find_transitions(highlight, start, stop)
+    return adaptive_steps(start, stop, round((steps or default_steps) * ADAPTIVE_FRACTION), events)
+
+def app_sample_steps(sampling, anim_var_name, c_val, n_val, angle_val, current_progress, steps=None):
+    """按采样方式取动画变量的序列"""
+    if sampling == "adaptive":
+        return app_adaptive_steps(anim_var_name, c_val, n_val, angle_val, current_progress, steps)
+    return app_anim_steps(anim_var_name, steps)
+
+# 需要按编码方式转换的坐标字段
+COORD_KEYS = ("n_line_y", "c_line_x", "orig_x", "orig_y", "txt_orig_x", "txt_orig_y",
+              "trans_x", "trans_y", "txt_trans_x", "txt_trans_y", "de_x", "de_y", "c_pos")
+
+def encode_trace_data(d, encoding):
+    """把一帧数据里的坐标按指定编码转换 (见 frame_encoding)"""
+    return {k: encode_coords(v, encoding) if k in COORD_KEYS else v for k, v in d.items()}
+
+def app_trace_batch(c_val, n_val, angle_val, anim_var_name, anim_steps, current_progress):
+    """app.py：全部帧的几何数据 (get_trace_data_batch 的结果)"""
+    # 把动画变量展开成与 anim_steps 等长的数组，其余参数保持标量，一次算出全部帧
+    batch_params = {"c": c_val, "n": n_val, "angle": angle_val, "progress": current_progress}
+    batch_params[anim_var_name] = anim_steps
+    return get_trace_data_batch(batch_params["c"], batch_params["n"],
+                                batch_params["angle"], batch_params["progress"])
+
+def app_frame_data(c_val, n_val, angle_val, anim_var_name, anim_steps, current_progress,
+                   encoding=DEFAULT_ENCODING, batch=None):
+    """
+    app.py：一次算出全部帧，返回每帧各 trace 的参数 (frame_data) 和第 0 帧的绘图数据 (d0)
+    batch 为预先算好的几何数据 (例如来自帧数据包)，为空时现算
+    """
+    if batch is None:
+        batch = app_trace_batch(c_val, n_val, angle_val, anim_var_name, anim_steps, current_progress)
+
+    # 每帧各 trace 的数据；不随动画变化的 trace/属性由 build_diffed_frames 省略，只留在底图里
+    frame_data = []
+    for i in range(len(anim_steps)):
+        d = encode_trace_data(trace_data_at(batch, i), encoding)
+        frame_data.append([
+            dict(y=d['n_line_y']),
+            dict(x=d['c_line_x']),
+            dict(x=d['orig_x'], y=d['orig_y']),
+            dict(x=d['txt_orig_x'], y=d['txt_orig_y']),
+            dict(x=d['trans_x'], y=d['trans_y']),
+            dict(x=d['txt_trans_x'], y=d['txt_trans_y']),
+            dict(x=d['de_x'], y=d['de_y'], line=dict(color=d['de_color'], width=d['de_width'])),
+            dict(x=d['c_pos'], text=d['c_label_text'])
+        ])
+    # 初始帧 = 批量结果的第 0 帧
+    d0 = encode_trace_data(trace_data_at(batch, 0), encoding)
+    return frame_data, d0
+
+def app_layout_spec(mode, anim_var_name):
+    """app.py 图表中与帧数据无关的布局 (滑块的 steps 另行生成)"""
+    return dict(
+        # --- 1. 背景颜色设置 ---
+        # 强制图表区域变成白纸
+        paper_bgcolor='white', 
+        plot_bgcolor='white',
+    
+        # --- 2. 字体颜色设置 ---
+        # 强制图表内的所有文字变黑 (因为网页是暗色的，Plotly默认可能会用白字，所以必须强制改黑)
+        font=dict(color="black"),
+    
+        height=700,
+        title=dict(text=f"<b>当前演示模式：{mode.split(' ')[1]}</b>", font=dict(size=20, color="black"), x=0.5),
+    
+        # --- 3. 坐标轴设置 (强制黑色) ---
+        xaxis=dict(
+            range=[-6, 12], 
+            zeroline=True, zerolinecolor='black', zerolinewidth=2,
+            gridcolor='#e0e0e0', gridwidth=1,
+            tickfont=dict(color='black', size=14), # 强制刻度黑字
+            title_font=dict(color='black'),        # 强制标题黑字
+            showgrid=True
+        ),
+        yaxis=dict(
+            range=[-6, 12], scaleanchor="x", scaleratio=1,
+            zeroline=True, zerolinecolor='black', zerolinewidth=2,
+            gridcolor='#e0e0e0', gridwidth=1,
+            tickfont=dict(color='black', size=14),
+            title_font=dict(color='black'),
+            showgrid=True
+        ),
+    
+        # --- 4. 图例设置 (白底黑字黑框) ---
+        legend=dict(
+            x=0.01, y=0.99, bgcolor="white",
+            bordercolor="black", borderwidth=1,
+            font=dict(color="black", size=12)
+        ),
+    
+        # --- 5. 动画控件样式 ---
+        updatemenus=[dict(
+            type="buttons", showactive=False,
+            x=0.05, y=0, xanchor="right", yanchor="top",
+            # 按钮背景白，文字黑
+            bgcolor="white", bordercolor="black", borderwidth=1, font=dict(color="black"),
+            buttons=[dict(label="▶️ 播放动画", method="animate", args=[None, dict(frame=dict(duration=50, redraw=True), fromcurrent=True)])]
+        )],
+    
+        sliders=[dict(
+            active=0,
+            # 滑块文字颜色
+            currentvalue=dict(prefix=f"{anim_var_name} : ", font=dict(color="black")),
+            pad=dict(t=0), font=dict(color="black"),
+            bgcolor="white", bordercolor="lightgray", borderwidth=1
+        )]
+    )
+
+def app_slider_steps(anim_steps):
+    """app.py 动画滑块的 steps (帧名与 build_app_figure 的帧名一致)"""
+    return [dict(
+        method="animate",
+        args=[[str(v)], dict(mode="immediate", frame=dict(duration=0, redraw=True))],
+        label=f"{v:.{LABEL_DECIMALS}f}"
+    ) for v in anim_steps]
+
+def build_app_figure(mode, c_val, n_val, angle_val, anim_var_name, anim_steps, current_progress,
+                     encoding=DEFAULT_ENCODING, batch=None, with_nbytes=False):
+    """
+    app.py：生成全部动画帧并组装完整的 go.Figure (含布局)；batch 见 app_frame_data
+    with_nbytes 为真时返回 (图表, 帧数据的字节数估算)，供图表缓存计量 (见 figure_cache.data_nbytes)
+    """
+    # Plotly 只在真正需要出图时才导入
+    import plotly.graph_objects as go
+
+    with stage("frames"):
+        frame_data, d0 = app_frame_data(c_val, n_val, angle_val, anim_var_name, anim_steps, current_progress,
+                                        encoding, batch)
+    frames = build_diffed_frames([str(v) for v in anim_steps], [1, 2, 3, 4, 5, 6, 7, 8], frame_data)
+
+    data = [
+        # [0] y=x (黑色虚线)
+        shared_part(("app-yx",), lambda: go.Scatter(
+            x=[-10, 20], y=[-10, 20], mode='lines', line=dict(color='black', width=1.5, dash='dash'), name='y=x')),
+        # [1] 对称轴
+        go.Scatter(x=[-10, 20], y=d0['n_line_y'], mode='lines', line=dict(color='blue', dash='dashdot'), name='对称轴'),
+        # [2] c指示线
+        go.Scatter(x=d0['c_line_x'], y=[-10, 20], mode='lines', line=dict(color='red', width=1, dash='dot'), showlegend=False),
+        # [3] 原像
+        go.Scatter(x=d0['orig_x'], y=d0['orig_y'], mode='lines+markers', line=dict(color='#800080', dash='dot'), name='原像'),
+        # [4] 原像字母
+        go.Scatter(x=d0['txt_orig_x'], y=d0['txt_orig_y'], mode='text', text=["<b>C</b>","<b>D</b>","<b>E</b>"], 
+                   textfont=dict(size=14, color='#800080'), textposition="top left", showlegend=False),
+        # [5] 变换像
+        go.Scatter(x=d0['trans_x'], y=d0['trans_y'], mode='lines+markers', fill='toself', fillcolor='rgba(0, 128, 0, 0.2)',
+                   line=dict(color='green', width=3), name='变换像'),
+        # [6] 变换像字母
+        go.Scatter(x=d0['txt_trans_x'], y=d0['txt_trans_y'], mode='text', text=["<b>C'</b>","<b>D'</b>","<b>E'</b>"], 
+                   textfont=dict(size=16, color='black'), textposition="bottom right", showlegend=False),
+        # [7] D'E'
+        go.Scatter(x=d0['de_x'], y=d0['de_y'], mode='lines', line=dict(color=d0['de_color'], width=d0['de_width']), name="D'E'"),
+        # [8] c标签
+        go.Scatter(x=d0['c_pos'], y=[-0.5], mode='text', text=d0['c_label_text'], textfont=dict(color='red', size=14), showlegend=False)
+    ]
+
+    # 布局和均匀网格的滑块 steps 每个进程只校验一次，各会话共享 (见 shared_layout)
+    steps_key = uniform_steps_key(("app-steps", anim_var_name), anim_steps, app_anim_steps(anim_var_name))
+    layout = shared_layout(("app-layout", mode, anim_var_name), lambda: app_layout_spec(mode, anim_var_name),
+                           steps_key, lambda: app_slider_steps(anim_steps))
+    fig = assemble_figure(data, frames, layout)
+    return (fig, data_nbytes(frame_data) + data_nbytes(d0)) if with_nbytes else fig
+
+# ==========================================
+# PART B: video.py —— c 扫描
+# ==========================================
+# 角度滑块 (最小值, 最大值, 默认值, 步长)
+VIDEO_ANGLE_SLIDER = (0, 360, 180, 5)
+
+VIDEO_C_RANGE = (-2.0, 6.0)
+VIDEO_STEPS = 100
+
+# 默认视野与可选的缩放倍数 (以默认视野中心为中心)
+VIDEO_X_RANGE = (-4, 14)
+VIDEO_Y_RANGE = (-4, 12)
+VIDEO_ZOOMS = (1, 2, 4, 8)
+
+# 绘图区大致的像素尺寸 (宽度随页面变化取常见值，高度为 750 扣除标题、滑块和边距)，用于估计曲线分辨率
+VIDEO_PLOT_PX = (1100, 560)
+
+# 扇环的弧和轨迹圆中最大的半径 (E' 的轨迹 2√2) 与扇环的张角，按它们估计折线的偏差
+VIDEO_CURVE_RADIUS = 2 * np.sqrt(2)
+VIDEO_SECTOR_SWEEP = 270 - 135
+
+def video_view(zoom=1):
+    """缩放后的 (x 范围, y 范围)"""
+    return zoomed_range(VIDEO_X_RANGE, zoom), zoomed_range(VIDEO_Y_RANGE, zoom)
+
+def video_curve_resolution(frames, zoom=1, plot_px=VIDEO_PLOT_PX):
+    """按视野和帧数选扇环每段弧、每个轨迹圆的点数 (见 lod.py)，返回 (n_arc, n_points)"""
+    unit_px = units_per_pixel(*video_view(zoom), *plot_px)
+    return (curve_points(VIDEO_CURVE_RADIUS, VIDEO_SECTOR_SWEEP, unit_px, frames),
+            curve_points(VIDEO_CURVE_RADIUS, 360, unit_px, frames))
+
+def video_c_values(steps=VIDEO_STEPS, sampling="uniform"):
+    """c 的扫描序列；自适应采样时在扇环与 y=x 开始/停止相交的 c (闭式解) 附近加密"""
+    if sampling == "adaptive":
+        events = calc_sector_c_range(FIXED_N)
+        return adaptive_steps(*VIDEO_C_RANGE, round(steps * ADAPTIVE_FRACTION), events)
+    return np.linspace(*VIDEO_C_RANGE, steps)
+
+def get_status_text(c_val, is_intersect, cross_lo, cross_hi):
+    """状态文字：相交时附上与 y=x 交点所在的范围"""
+    if is_intersect:
+        status = "✅ <b>相交</b>"
+        # 交点位置来自采样多边形，区间端点附近采样可能没有捕捉到交点
+        if not np.isnan(cross_lo):
+            status += f"<br><span style='font-size:13px'>y=x 上 x∈[{cross_lo:.2f}, {cross_hi:.2f}]</span>"
+        color = "#008000"
+    else:
+        status, color = "❌ 相离", "gray"
+    return f"<b>c={c_val:.1f}</b><br><span style='color:{color}; font-size:18px'>{status}</span>"
+
+def check_angle_validity(angle):
+    """
+    判断当前角度是否符合题意
+    范围: [135, 270]
+    """
+    norm_angle = angle % 360
+    if 135 - 0.1 <= norm_angle <= 270 + 0.1:
+        return True, "✅ 角度满足题意", "green"
+    else:
+        return False, "❌ 角度不合题意", "gray"
+
+def video_frame_arrays(angle_val, c_values, resolution=None):
+    """
+    video.py：c 扫描全部帧的几何数据 (数组字典)，video_frame_data 据此生成各帧参数
+    resolution 为 (n_arc, n_points)，为空时按默认视野和帧数选取
+    """
+    n_arc, n_points = resolution or video_curve_resolution(len(c_values))
+    # 相交判定直接用闭式解
+    c_lo, c_hi = calc_sector_c_range(FIXED_N)
+    arrays = {"intersects": (c_values >= c_lo) & (c_values <= c_hi)}
+
+    # 全部帧的曲线和三角形都由缓存的模板一次平移得到
+    arrays["sector_x"], arrays["sector_y"] = get_valid_sector_shape_batch(c_values, n_arc)
+    arrays["circles_x"], arrays["circles_y"] = get_circles_trace_batch(c_values, n_points)
+    arrays["origs"], arrays["transes"] = get_geometry_data_batch(c_values, angle_val)
+
+    # 扇环多边形本来就要画出来；顺便批量算出交点位置，用来校验闭式解
+    (arrays["sampled_intersects"], arrays["cross_los"],
+     arrays["cross_his"]) = check_polygon_line_intersection_batch(arrays["sector_x"], arrays["sector_y"])
+    return arrays
+
+def video_frame_data(angle_val, c_values, encoding=DEFAULT_ENCODING, arrays=None):
+    """
+    video.py：算出 c 扫描的全部帧，返回每帧动态层 [2]-[8] 的参数和采样校验与闭式解不一致的帧数
+    arrays 为预先算好的 video_frame_arrays (例如来自帧数据包)，为空时现算
+    """
+    is_angle_valid = check_angle_validity(angle_val)[0]
+    enc = partial(encode_coords, encoding=encoding)
+    frame_data = []
+
+    if arrays is None:
+        arrays = video_frame_arrays(angle_val, c_values)
+    intersects = arrays["intersects"]
+    sector_x, sector_y = arrays["sector_x"], arrays["sector_y"]
+    circles_x, circles_y = arrays["circles_x"], arrays["circles_y"]
+    origs, transes = arrays["origs"], arrays["transes"]
+    cross_los, cross_his = arrays["cross_los"], arrays["cross_his"]
+    n_mismatch = int(np.count_nonzero(arrays["sampled_intersects"] != intersects))
+
+    for i, val in enumerate(c_values):
+        # 1. 计算几何数据
+        orig, trans = origs[i], transes[i]
+        sx, sy = sector_x[i], sector_y[i]
+        circ_x, circ_y = circles_x[i], circles_y[i]
+    
+        # 中心点
+        cx, cy = val, val
+        cx_p, cy_p = val + FIXED_N, 2 * FIXED_N - val
+    
+        # 2. 状态判定
+        status_label = get_status_text(val, intersects[i], cross_los[i], cross_his[i])
+    
+        # 三角形样式
+        tri_color = "green" if is_angle_valid else "gray"
+        tri_opacity = 1.0 if is_angle_valid else 0.3
+    
+        # 动态层 [2]-[8] 的数据；不随 c 变化的部分由 build_diffed_frames 省略，只留在底图里
+        frame_data.append([
+            # [2] 扇环
+            dict(x=enc(sx), y=enc(sy)),
+            # [3] 轨迹圆
+            dict(x=enc(circ_x), y=enc(circ_y)),
+            # [4] 原像 CDE
+            dict(x=enc(orig[:,0]), y=enc(orig[:,1])),
+            # [5] 变换像 C'D'E'
+            dict(x=enc(trans[:,0]), y=enc(trans[:,1]), line=dict(color=tri_color), opacity=tri_opacity),
+            # [6] C 点
+            dict(x=enc([cx]), y=enc([cy])),
+            # [7] C' 点
+            dict(x=enc([cx_p]), y=enc([cy_p])),
+            # [8] 状态文字
+            dict(
+                x=enc([cx_p + 1.5]), y=enc([cy_p]),
+                text=[status_label]
+            )
+        ])
+    return frame_data, n_mismatch
+
+def video_layout_spec(zoom=1):
+    """video.py 图表中与帧数据无关的布局 (滑块的 steps 另行生成)"""
+    x_range, y_range = video_view(zoom)
+    return dict(
+        paper_bgcolor='white', plot_bgcolor='white',
+        font=dict(color='black', size=14),
+        height=750,
+        title=dict(text="<b>原像(虚线) vs 变换像(实线)</b>", x=0.5, font=dict(color='black')),
+    
+        xaxis=dict(range=list(x_range), scaleratio=1, scaleanchor="y", 
+                   zeroline=True, zerolinecolor='black', gridcolor='#e0e0e0', showgrid=True,
+                   tickfont=dict(color='black'), title=dict(text="x", font=dict(color='black'))),
+        yaxis=dict(range=list(y_range), 
+                   zeroline=True, zerolinecolor='black', gridcolor='#e0e0e0', showgrid=True,
+                   tickfont=dict(color='black'), title=dict(text="y", font=dict(color='black'))),
+    
+        legend=dict(
+            x=0.01, y=0.99,
+            bgcolor="rgba(255, 255, 255, 0.9)",
+            bordercolor="black", borderwidth=1,
+            font=dict(color="black", size=12)
+        ),
+    
+        updatemenus=[dict(
+            type="buttons", showactive=False,
+            x=0.1, y=0, xanchor="right", yanchor="top",
+            bgcolor="white", bordercolor="black", borderwidth=1, font=dict(color="black"),
+            buttons=[dict(
+                label="▶️ 播放动画",
+                method="animate",
+                args=[None, dict(frame=dict(duration=80, redraw=True), fromcurrent=True)]
+            )]
+        )],
+    
+        sliders=[dict(
+            currentvalue=dict(prefix="c = ", font=dict(color="black")),
+            active=0,
+            bgcolor="white", bordercolor="lightgray", borderwidth=1, font=dict(color="black")
+        )]
+    )
+
+def video_slider_steps(c_values):
+    """video.py 动画滑块的 steps (帧名与 build_video_figure 的帧名一致)"""
+    return [dict(
+        method="animate",
+        args=[[f"{v:.{LABEL_DECIMALS}f}"], dict(mode="immediate", frame=dict(duration=0, redraw=True))],
+        label=f"{v:.{LABEL_DECIMALS}f}"
+    ) for v in c_values]
+
+def build_video_figure(angle_val, c_values, encoding=DEFAULT_ENCODING, arrays=None, zoom=1, with_nbytes=False):
+    """
+    video.py：生成全部动画帧并组装完整的 go.Figure；同时返回采样校验与闭式解不一致的帧数
+    arrays 见 video_frame_data；为空时曲线分辨率按 zoom 倍视野和帧数选取
+    with_nbytes 为真时返回 ((图表, 不一致的帧数), 帧数据的字节数估算)，供图表缓存计量
+    """
+    # Plotly 只在真正需要出图时才导入
+    import plotly.graph_objects as go
+
+    with stage("frames"):
+        if arrays is None:
+            arrays = video_frame_arrays(angle_val, c_values, video_curve_resolution(len(c_values), zoom))
+        frame_data, n_mismatch = video_frame_data(angle_val, c_values, encoding, arrays)
+    frames = build_diffed_frames([f"{v:.{LABEL_DECIMALS}f}" for v in c_values], [2, 3, 4, 5, 6, 7, 8], frame_data)
+
+    # 底图 = 第 0 帧
+    f0 = frame_data[0]
+
+    data = [
+        # --- 静态背景层 (Index 0, 1)，进程内共享 ---
+        shared_part(("video-yx",), lambda: go.Scatter(
+            x=[-10, 20], y=[-10, 20], mode='lines',
+            line=dict(color='black', width=2, dash='dash'), name='y=x', hoverinfo='skip')),
+        shared_part(("video-axis",), lambda: go.Scatter(
+            x=[-10, 20], y=[3, 3], mode='lines',
+            line=dict(color='blue', width=2, dash='dashdot'), name='y=3 (对称轴)', hoverinfo='skip')),
+    
+        # --- 动态层 (Index 2-8) ---
+        # [2] 有效扇环 (紫色)
+        go.Scatter(
+            x=f0[0]['x'], y=f0[0]['y'],
+            fill='toself', fillcolor='rgba(128, 0, 128, 0.3)',
+            line=dict(color='purple', width=1),
+            name="扫过区域 (C'D'E')", hoverinfo='skip'
+        ),
+    
+        # [3] 完整轨迹圆 (灰色虚线)
+        go.Scatter(
+            x=f0[1]['x'], y=f0[1]['y'], mode='lines',
+            line=dict(color='gray', width=1, dash='dot'),
+            name="完整轨迹圆", hoverinfo='skip'
+        ),
+    
+        # [4] 原像 CDE (紫色虚线)
+        go.Scatter(
+            x=f0[2]['x'], y=f0[2]['y'],
+            mode='lines+text',
+            line=dict(color='purple', width=2, dash='dot'),
+            text=["<b>C</b>", "<b>D</b>", "<b>E</b>", ""],
+            textposition=["top left", "top left", "bottom right", "top left"],
+            textfont=dict(color='purple', size=14),
+            name="原像 CDE (顺时针)"
+        ),
+    
+        # [5] 变换像 C'D'E' (绿色实线)
+        go.Scatter(
+            x=f0[3]['x'], y=f0[3]['y'],
+            mode='lines+text',
+            line=dict(color=f0[3]['line']['color'], width=2),
+            opacity=f0[3]['opacity'],
+            text=["<b>C'</b>", "<b>D'</b>", "<b>E'</b>", ""],
+            textposition=["top right", "bottom left", "bottom right", "top right"],
+            textfont=dict(color='black', size=14),
+            name="变换像 C'D'E' (逆时针)"
+        ),
+    
+        # [6] C点 (紫点)
+        go.Scatter(
+            x=f0[4]['x'], y=f0[4]['y'], mode='markers',
+            marker=dict(size=6, color='purple'), name="C"
+        ),
+    
+        # [7] C'点 (红点)
+        go.Scatter(
+            x=f0[5]['x'], y=f0[5]['y'], mode='markers',
+            marker=dict(size=8, color='red'), name="C'"
+        ),
+    
+        # [8] 状态文字
+        go.Scatter(
+            x=f0[6]['x'], y=f0[6]['y'], mode='text',
+            text=f0[6]['text'],
+            textposition="middle right",
+            textfont=dict(size=14, color='black'),
+            showlegend=False
+        )
+    ]
+
+    # 布局和均匀网格的滑块 steps 每个进程只校验一次，各会话共享
+    steps_key = uniform_steps_key(("video-steps",), c_values, video_c_values())
+    layout = shared_layout(("video-layout", zoom), lambda: video_layout_spec(zoom),
+                           steps_key, lambda: video_slider_steps(c_values))
+    result = assemble_figure(data, frames, layout), n_mismatch
+    return (result, data_nbytes(frame_data)) if with_nbytes else result
+
+# ==========================================
+# PART C: app.py —— 相图 (相交时 c 的区间随 n、角度的变化)
+# ==========================================
+# 相图模式的 n / 角度滑块 (最小值, 最大值, 默认值, 步长)
+PHASE_SLIDERS = {
+    "n": (1.0, 5.0, 3.0, 0.01),
+    "angle": (0.0, 360.0, 180.0, 0.5),
+}
+
+# 热力图按滑块的步长取满分辨率 (401 × 721 格)，z 以 float32 二进制发送；
+# 点击用的透明格子中心点只取较粗的一层 (41 × 145 个，步长是滑块步长的整数倍)，点多了浏览器选取会变慢
+PHASE_CLICK_STEPS = {"n": 0.1, "angle": 2.5}
+
+# 三张热力图: (数组序号, 标题, 颜色轴)；c_min 与 c_max 共用一个色标
+PHASE_PANELS = ((0, "c_min", "coloraxis"), (1, "c_max", "coloraxis"), (2, "区间宽度 c_max - c_min", "coloraxis2"))
+
+def phase_axes(steps=None):
+    """网格的 n 轴和角度轴；steps 为 {参数: 步长}，为空时用滑块步长 (满分辨率)"""
+    return tuple(np.round(np.linspace(lo, hi, int(round((hi - lo) / (steps or {}).get(p, step))) + 1), 6)
+                 for p, (lo, hi, _, step) in (("n", PHASE_SLIDERS["n"]), ("angle", PHASE_SLIDERS["angle"])))
+
+def phase_grid(steps=None):
+    """整个 (n, 角度) 网格上的 c 区间，一次向量化调用；返回 n 轴、角度轴和 (c_min, c_max, 宽度) 三个数组"""
+    n_axis, angle_axis = phase_axes(steps)
+    c_min, c_max = calc_c_range_batch(angle_axis[None, :], n_axis[:, None])
+    return n_axis, angle_axis, (c_min, c_max, c_max - c_min)
+
+def phase_cell_params(angle, n):
+    """点击位置 -> 最近的滑块值 (角度, n)，并限制在滑块范围内"""
+    def snap(value, lo, hi, _, step):
+        return float(np.clip(np.round(lo + round((value - lo) / step) * step, 6), lo, hi))
+    return snap(angle, *PHASE_SLIDERS["angle"]), snap(n, *PHASE_SLIDERS["n"])
+
+def phase_layout_spec():
+    """相图的布局：三张热力图横排，共用 n 轴"""
+    from plotly.subplots import make_subplots
+
+    fig = make_subplots(rows=1, cols=3, shared_yaxes=True, horizontal_spacing=0.06,
+                        subplot_titles=[title for _, title, _ in PHASE_PANELS])
+    fig.update_layout(
+        paper_bgcolor='white', plot_bgcolor='white', font=dict(color="black"),
+        height=380, margin=dict(t=40, b=40),
+        coloraxis=dict(colorscale="RdBu", colorbar=dict(title="c", x=0.64, len=0.9)),
+        coloraxis2=dict(colorscale="Viridis", colorbar=dict(title="宽度", x=1.0, len=0.9)),
+        # 点击选中一格，选中状态就是当前参数的标记
+        clickmode="event+select",
+    )
+    fig.update_xaxes(title_text="旋转角度 (°)", range=[0, 360], dtick=45)
+    fig.update_yaxes(title_text="参数 n", row=1, col=1)
+    return fig.layout
+
+def build_phase_figure():
+    """
+    app.py 相图模式的热力图；与参数无关，每个进程只生成和校验一次
+    热力图是满分辨率的网格 (z 为 float32)；plotly.js 的热力图不支持选择，每张图上另叠一层较粗的透明
+    格子中心点用来点击选格子 (悬停数值也由它显示，是该点上的精确值)，选中的格子显示成一个黑点
+    """
+    import plotly.graph_objects as go
+
+    def build_panels():
+        n_axis, angle_axis, values = phase_grid()
+        click_n, click_angle, click_values = phase_grid(PHASE_CLICK_STEPS)
+        # 格子中心也按 float32 发送，点击得到的坐标由页面按 phase_cell_params 取回最近的滑块值
+        cell_angle, cell_n = (v.ravel().astype(np.float32) for v in np.meshgrid(click_angle, click_n))
+        panels = []
+        for col, (i, title, coloraxis) in enumerate(PHASE_PANELS):
+            axes = dict(xaxis=f"x{col + 1 if col else ''}", yaxis=f"y{col + 1 if col else ''}")
+            panels.append(go.Heatmap(x=angle_axis, y=n_axis, z=values[i].astype(np.float32), coloraxis=coloraxis,
+                                     hoverinfo="skip", **axes).to_plotly_json())
+            panels.append(go.Scatter(
+                x=cell_angle, y=cell_n, customdata=encode_coords(click_values[i].ravel()), mode="markers",
+                marker=dict(color="black", size=6, opacity=0), showlegend=False,
+                selected=dict(marker=dict(opacity=1)), unselected=dict(marker=dict(opacity=0)),
+                hovertemplate=f"角度 %{{x}}°<br>n = %{{y}}<br>{title} = %{{customdata:.2f}}<extra></extra>",
+                **axes).to_plotly_json())
+        return panels
+
+    data = static_parts.get_or_build(("phase-panels",), build_panels)
+    layout = static_parts.get_or_build(("phase-layout",), lambda: phase_layout_spec().to_plotly_json())
+    return assemble_figure(data, [], layout)
+
+# ==========================================
+# PART D: shapes.py —— 多形状画布 (组合变换，见 transforms.py)
+# ==========================================
+# 侧边栏滑块 (最小值, 最大值, 默认值, 步长)
+SHAPES_SLIDERS = {
+    "count": (4, 64, 24, 4),
+    "n": (1.0, 5.0, 3.0, 0.1),
+    "spin": (0, 360, 90, 15),
+    "scale": (0.5, 2.0, 1.0, 0.1),
+}
+SHAPES_STEPS = 40
+SHAPES_RADIUS = 0.45
+SHAPES_X_RANGE = (-6, 12)
+SHAPES_Y_RANGE = (-6, 10)
+
+def shapes_polygons(count):
+    """
+    count 个正多边形 (3-8 边轮换)，中心在 [-4, 4]² 里排成方阵 (带固定的随机抖动)、跨在 y=x 两侧
+    返回补齐顶点后的 (S, V, 2) 数组和 (S, 2) 的中心
+    """
+    cols = int(np.ceil(np.sqrt(count)))
+    rows = -(-count // cols)
+    idx = np.arange(count)
+    centers = np.stack([-4 + 8 * (idx % cols) / max(cols - 1, 1),
+                        -4 + 8 * (idx // cols) / max(rows - 1, 1)], axis=-1)
+    centers += np.random.default_rng(0).uniform(-0.5, 0.5, centers.shape)
+    polygons = []
+    for center, sides in zip(centers, 3 + idx % 6):
+        theta = np.pi / 2 + np.linspace(0, 2 * np.pi, sides, endpoint=False)
+        polygons.append(center + SHAPES_RADIUS * np.stack([np.cos(theta), np.sin(theta)], axis=-1))
+    return pad_polygons(polygons), centers
+
+def shapes_transforms(centers, n_val, spin, scale_val, progress):
+    """
+    每帧每个形状的组合变换 (F, S, 3, 3)：先绕自身中心转 spin·t 度，再以原点为中心缩放 (随 t 插值)，
+    最后做 n 型变换的中间状态；t 为每帧的 progress
+    """
+    progress = np.asarray(progress, dtype=float)[:, None]
+    angle = np.broadcast_to(spin * progress, (len(progress), len(centers)))
+    return compose(rotate(angle, centers[:, 0], centers[:, 1]),
+                   interpolate(scale(scale_val), progress),
+                   n_transform_at(n_val, progress))
+
+def closed_paths(points):
+    """(..., S, V, 2) 多边形 -> 首尾相接、形状之间用 NaN 断开的 (..., S·(V+2), 2) 路径 (一条 trace 画全部)"""
+    gap = np.full(points.shape[:-2] + (1, 2), np.nan)
+    paths = np.concatenate([points, points[..., :1, :], gap], axis=-2)
+    return paths.reshape(points.shape[:-3] + (-1, 2))
+
+def shapes_frame_data(count, n_val, spin, scale_val, steps=SHAPES_STEPS, encoding=DEFAULT_ENCODING):
+    """
+    shapes.py：全部形状 × 全部帧的顶点在一次批量变换里算出，与 y=x 的相交判定也是整批的；
+    Python 循环只按帧拆分成 [2] 未碰到 / [3] 碰到 y=x 两条 trace。返回 (帧数据, 每帧各形状是否相交)
+    """
+    enc = partial(encode_coords, encoding=encoding)
+    polygons, centers = shapes_polygons(count)
+    points = apply_affine(polygons, shapes_transforms(centers, n_val, spin, scale_val, np.linspace(0, 1, steps)))
+    hits = segments_cross_line(points)
+    frame_data = []
+    for frame_points, frame_hits in zip(points, hits):
+        frame = []
+        for mask in (~frame_hits, frame_hits):
+            path = closed_paths(frame_points[mask])
+            frame.append(dict(x=enc(path[:, 0]), y=enc(path[:, 1])))
+        frame_data.append(frame)
+    return frame_data, hits
+
+def shapes_layout_spec():
+    """shapes.py 图表中与帧数据无关的布局 (滑块的 steps 另行生成)"""
+    return dict(
+        paper_bgcolor='white', plot_bgcolor='white',
+        font=dict(color='black', size=14),
+        height=700,
+        xaxis=dict(range=list(SHAPES_X_RANGE), scaleratio=1, scaleanchor="y",
+                   zeroline=True, zerolinecolor='black', gridcolor='#e0e0e0', showgrid=True,
+                   tickfont=dict(color='black')),
+        yaxis=dict(range=list(SHAPES_Y_RANGE),
+                   zeroline=True, zerolinecolor='black', gridcolor='#e0e0e0', showgrid=True,
+                   tickfont=dict(color='black')),
+        legend=dict(x=0.01, y=0.99, bgcolor="rgba(255, 255, 255, 0.9)",
+                    bordercolor="black", borderwidth=1, font=dict(color="black", size=12)),
+        updatemenus=[dict(
+            type="buttons", showactive=False,
+            x=0.1, y=0, xanchor="right", yanchor="top",
+            bgcolor="white", bordercolor="black", borderwidth=1, font=dict(color="black"),
+            buttons=[dict(label="▶️ 播放动画", method="animate",
+                          args=[None, dict(frame=dict(duration=50, redraw=True), fromcurrent=True)])]
+        )],
+        sliders=[dict(
+            currentvalue=dict(prefix="progress = ", font=dict(color="black")),
+            active=0,
+            bgcolor="white", bordercolor="lightgray", borderwidth=1, font=dict(color="black")
+        )]
+    )
+
+def build_shapes_figure(count, n_val, spin, scale_val, steps=SHAPES_STEPS, encoding=DEFAULT_ENCODING,
+                        with_nbytes=False):
+    """
+    shapes.py：生成全部动画帧并组装完整的 go.Figure；同时返回最后一帧碰到 y=x 的形状数
+    with_nbytes 为真时返回 ((图表, 相交数), 帧数据的字节数估算)，供图表缓存计量
+    """
+    import plotly.graph_objects as go
+
+    with stage("frames"):
+        frame_data, hits = shapes_frame_data(count, n_val, spin, scale_val, steps, encoding)
+    progress = np.linspace(0, 1, steps)
+    frames = build_diffed_frames([f"{v:.{LABEL_DECIMALS}f}" for v in progress], [2, 3], frame_data)
+
+    f0 = frame_data[0]
+    orig = closed_paths(shapes_polygons(count)[0])
+    data = [
+        # [0] y=x，进程内共享
+        shared_part(("shapes-yx",), lambda: go.Scatter(
+            x=[-10, 20], y=[-10, 20], mode='lines',
+            line=dict(color='black', width=2, dash='dash'), name='y=x', hoverinfo='skip')),
+        # [1] 原像 (灰色虚线)
+        go.Scatter(x=encode_coords(orig[:, 0], encoding), y=encode_coords(orig[:, 1], encoding), mode='lines',
+                   line=dict(color='gray', width=1, dash='dot'), name="原像", hoverinfo='skip'),
+        # [2] 未碰到 y=x 的像
+        go.Scatter(x=f0[0]['x'], y=f0[0]['y'], fill='toself', fillcolor='rgba(0, 0, 255, 0.2)',
+                   line=dict(color='blue', width=1), name="像 (未碰到 y=x)", hoverinfo='skip'),
+        # [3] 碰到 y=x 的像
+        go.Scatter(x=f0[1]['x'], y=f0[1]['y'], fill='toself', fillcolor='rgba(255, 0, 0, 0.3)',
+                   line=dict(color='red', width=1), name="像 (碰到 y=x)", hoverinfo='skip'),
+    ]
+    # 布局和滑块 steps 只与帧数有关，每个进程只校验一次；帧名、标签的写法与 video.py 相同
+    layout = shared_layout(("shapes-layout",), shapes_layout_spec,
+                           ("shapes-steps", steps), lambda: video_slider_steps(progress))
+    result = assemble_figure(data, frames, layout), int(hits[-1].sum())
+    return (result, data_nbytes(frame_data)) if with_nbytes else result
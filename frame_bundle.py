@@ -0,0 +1,265 @@
+"""
+预计算帧数据包
+
+两个页面的滑块都是离散的，角度每 15° / 5° 一档，能取到的角度不多。c、n 的滑块每 0.01 一档，
+全部展开太大，数据包只覆盖其中每 0.1 一档的值 (APP_GRID_STEPS，包括默认值)。
+这里一次性把网格上的动画帧几何数据 (采样序列、三角形顶点、相交标记、扇环和轨迹圆) 算好，
+写成一组 .npy 文件；页面运行时以内存映射的方式读取，只有真正访问到的页才会载入内存。
+不在网格上的参数 (或没有数据包时) 仍然现算。
+
+数据包目录下的 index.json 记录了生成时的网格和采样常数 (见 signature)，与当前代码不一致时
+整个数据包被忽略；修改了 geometry.py 的计算方法后也需要重新生成。
+
+模式 1 (progress 动画) 的网格是 c × n × 角度 三维，约 1.3 GB，默认不生成，需要时用 --modes 指定。
+
+用法:
+    python frame_bundle.py                              # 默认: app 模式 2-4 + video 页
+    python frame_bundle.py --modes progress c n angle video --out frames.bundle
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import time
+from functools import lru_cache
+
+import numpy as np
+
+from figures import (ADAPTIVE_FRACTION, APP_SLIDERS, APP_SWEEPS, SAMPLINGS, VIDEO_ANGLE_SLIDER,
+                     VIDEO_C_RANGE, VIDEO_PLOT_PX, VIDEO_STEPS, VIDEO_X_RANGE, VIDEO_Y_RANGE, app_sample_steps,
+                     app_trace_batch, video_c_values, video_frame_arrays)
+from geometry import FIXED_N, assemble_trace_batch
+from lod import FRAME_POINT_BUDGET, MAX_ERROR_PX, TARGET_ERROR_PX
+from sampling import BISECT_ITERS, COARSE_POINTS, DENSE_SHARE, DENSE_WINDOW, LABEL_DECIMALS
+
+BUNDLE_VERSION = 1
+BUNDLE_DIR = os.environ.get("FRAME_BUNDLE",
+                            os.path.join(os.path.dirname(os.path.abspath(__file__)), "frames.bundle"))
+
+# app.py 里非 progress 动画时 progress 固定为 1
+APP_PROGRESS = 1.0
+APP_PARAMS = ("c", "n", "angle")
+APP_MODE_VARS = ("progress", "c", "n", "angle")
+
+# video 页与角度无关、每种采样只存一份的数组；origs/transes 另按角度存
+VIDEO_SHARED = ("intersects", "sector_x", "sector_y", "circles_x", "circles_y",
+                "sampled_intersects", "cross_los", "cross_his")
+VIDEO_PER_ANGLE = ("origs", "transes")
+
+# 数据包网格的步长：必须是对应滑块步长的整数倍，网格值才都是滑块能取到的值
+APP_GRID_STEPS = {"c": 0.1, "n": 0.1, "angle": 15}
+
+# 网格值的小数位数，与 figure_cache.quantize_key 一致 (-5 + 62 × 0.1 取 1.2 而不是 1.2000000000000002)
+GRID_DIGITS = 6
+
+
+def signature():
+    """决定数据包内容的全部常数；与生成时不一致的数据包不能使用"""
+    consts = {
+        "version": BUNDLE_VERSION,
+        "app_sliders": APP_SLIDERS, "app_grid_steps": APP_GRID_STEPS, "app_sweeps": APP_SWEEPS,
+        "app_progress": APP_PROGRESS,
+        "adaptive_fraction": ADAPTIVE_FRACTION,
+        "sampling": [COARSE_POINTS, BISECT_ITERS, DENSE_SHARE, DENSE_WINDOW, LABEL_DECIMALS],
+        "video_angle_slider": VIDEO_ANGLE_SLIDER, "video_c_range": VIDEO_C_RANGE, "video_steps": VIDEO_STEPS,
+        "fixed_n": FIXED_N, "video_view": [VIDEO_X_RANGE, VIDEO_Y_RANGE, VIDEO_PLOT_PX],
+        "lod": [TARGET_ERROR_PX, MAX_ERROR_PX, FRAME_POINT_BUDGET],
+    }
+    return hashlib.sha1(json.dumps(consts, sort_keys=True).encode()).hexdigest()
+
+
+def slider_grid(lo, hi, default, step):
+    """滑块能取到的全部值"""
+    count = int(round((hi - lo) / step)) + 1
+    return np.round(lo + np.arange(count) * step, GRID_DIGITS)
+
+
+def grid_index(value, lo, hi, default, step):
+    """value 在滑块网格上的序号；不在网格上时返回 None"""
+    i = int(round((value - lo) / step))
+    if 0 <= i <= round((hi - lo) / step) and abs(lo + i * step - value) < 10 ** -GRID_DIGITS:
+        return i
+    return None
+
+
+def app_grid(param):
+    """app.py 滑块 param 在数据包里的网格 (最小值, 最大值, 默认值, 步长)"""
+    lo, hi, default, _ = APP_SLIDERS[param]
+    return lo, hi, default, APP_GRID_STEPS[param]
+
+
+def fixed_params(anim_var_name):
+    """该模式下由滑块给定 (即需要按网格展开) 的参数"""
+    return tuple(p for p in APP_PARAMS if p != anim_var_name)
+
+
+# ==========================================
+# PART A: 生成
+# ==========================================
+def build_app_arrays(out_dir, anim_var_name, samplings):
+    """app.py 一种模式的全部网格：每个 (固定参数, 采样方式) 一行，帧数不足的用 NaN 补齐"""
+    fixed = fixed_params(anim_var_name)
+    axes = [slider_grid(*app_grid(p)) for p in fixed]
+    grid_shape = tuple(len(a) for a in axes) + (len(samplings),)
+    n_frames = APP_SWEEPS[anim_var_name][2]
+
+    def open_array(name, dtype, tail=()):
+        path = os.path.join(out_dir, f"app-{anim_var_name}-{name}.npy")
+        return np.lib.format.open_memmap(path, mode="w+", dtype=dtype, shape=grid_shape + (n_frames,) + tail)
+
+    steps = open_array("steps", float)
+    steps[:] = np.nan
+    orig, trans = open_array("orig", float, (3, 2)), open_array("trans", float, (3, 2))
+    is_intersect = open_array("is_intersect", bool)
+
+    for idx in np.ndindex(*grid_shape[:-1]):
+        params = dict(c=0.0, n=0.0, angle=0.0, progress=APP_PROGRESS)
+        params.update({p: float(axis[i]) for p, axis, i in zip(fixed, axes, idx)})
+        for k, s in enumerate(samplings):
+            anim_steps = app_sample_steps(s, anim_var_name, params["c"], params["n"], params["angle"],
+                                          params["progress"])
+            batch = app_trace_batch(params["c"], params["n"], params["angle"], anim_var_name, anim_steps,
+                                    params["progress"])
+            row = idx + (k, slice(0, len(anim_steps)))
+            steps[row] = anim_steps
+            orig[row], trans[row], is_intersect[row] = batch["orig"], batch["trans"], batch["is_intersect"]
+
+    for array in (steps, orig, trans, is_intersect):
+        array.flush()
+    return {"fixed": fixed, "shape": list(grid_shape), "frames": n_frames}
+
+
+def build_video_arrays(out_dir, samplings):
+    """video.py：每种采样方式一份 c 序列和扇环/轨迹圆，三角形按角度网格展开"""
+    angles = slider_grid(*VIDEO_ANGLE_SLIDER)
+    for s in samplings:
+        c_values = video_c_values(sampling=s)
+        np.save(os.path.join(out_dir, f"video-{s}-c_values.npy"), c_values)
+        per_angle = {}
+        for i, angle in enumerate(angles):
+            arrays = video_frame_arrays(float(angle), c_values)
+            if i == 0:
+                for name in VIDEO_SHARED:
+                    np.save(os.path.join(out_dir, f"video-{s}-{name}.npy"), arrays[name])
+            for name in VIDEO_PER_ANGLE:
+                if name not in per_angle:
+                    per_angle[name] = np.lib.format.open_memmap(
+                        os.path.join(out_dir, f"video-{s}-{name}.npy"), mode="w+", dtype=float,
+                        shape=(len(angles),) + arrays[name].shape)
+                per_angle[name][i] = arrays[name]
+        for array in per_angle.values():
+            array.flush()
+    return {"angles": len(angles)}
+
+
+def build_bundle(out_dir, modes, samplings):
+    """在临时目录里生成，index.json 最后写入，完成后整体替换旧数据包"""
+    tmp_dir = out_dir.rstrip(os.sep) + ".tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    index = {"signature": signature(), "samplings": list(samplings), "app": {}, "video": None}
+    for mode in modes:
+        t0 = time.perf_counter()
+        if mode == "video":
+            index["video"] = build_video_arrays(tmp_dir, samplings)
+        else:
+            index["app"][mode] = build_app_arrays(tmp_dir, mode, samplings)
+        print(f"{mode}: {time.perf_counter() - t0:.1f} s")
+
+    with open(os.path.join(tmp_dir, "index.json"), "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=2)
+
+    # 正在运行的页面仍映射着旧文件；Linux 上删除目录项不影响已有的映射
+    old_dir = out_dir.rstrip(os.sep) + ".old"
+    shutil.rmtree(old_dir, ignore_errors=True)
+    if os.path.exists(out_dir):
+        os.replace(out_dir, old_dir)
+    os.replace(tmp_dir, out_dir)
+    shutil.rmtree(old_dir, ignore_errors=True)
+
+
+# ==========================================
+# PART B: 读取
+# ==========================================
+class FrameBundle:
+    """以内存映射方式打开的数据包；查询不到 (不在网格上、没有生成该模式) 时返回 None"""
+
+    def __init__(self, path, index):
+        self.path = path
+        self.samplings = index["samplings"]
+        self.app = {var: self._load_group(f"app-{var}", ("steps", "orig", "trans", "is_intersect"))
+                    for var in index["app"]}
+        self.video = {}
+        if index["video"]:
+            self.video = {s: self._load_group(f"video-{s}", ("c_values",) + VIDEO_SHARED + VIDEO_PER_ANGLE)
+                          for s in self.samplings}
+
+    def _load_group(self, prefix, names):
+        return {name: np.load(os.path.join(self.path, f"{prefix}-{name}.npy"), mmap_mode="r") for name in names}
+
+    def app_frames(self, anim_var_name, c_val, n_val, angle_val, current_progress, sampling):
+        """app.py：(动画变量的取值序列, 与 get_trace_data_batch 相同格式的几何数据) 或 None"""
+        arrays = self.app.get(anim_var_name)
+        if arrays is None or sampling not in self.samplings or current_progress != APP_PROGRESS:
+            return None
+        params = {"c": c_val, "n": n_val, "angle": angle_val}
+        idx = tuple(grid_index(params[p], *app_grid(p)) for p in fixed_params(anim_var_name))
+        if None in idx:
+            return None
+        idx += (self.samplings.index(sampling),)
+
+        steps = arrays["steps"][idx]
+        n_frames = int(np.count_nonzero(~np.isnan(steps)))
+        anim_steps = np.array(steps[:n_frames])
+        # 标量参数按页面传入的原值展开，与现算时 get_trace_data_batch 的结果一致
+        params.update(progress=current_progress, **{anim_var_name: anim_steps})
+        c, n, angle, progress = np.broadcast_arrays(*(np.atleast_1d(np.asarray(params[p], dtype=float))
+                                                      for p in ("c", "n", "angle", "progress")))
+        batch = assemble_trace_batch(c, n, angle, progress, np.array(arrays["orig"][idx][:n_frames]),
+                                     np.array(arrays["trans"][idx][:n_frames]),
+                                     np.array(arrays["is_intersect"][idx][:n_frames]))
+        return anim_steps, batch
+
+    def video_frames(self, angle_val, sampling, zoom=1):
+        """video.py：(c 序列, 与 video_frame_arrays 相同格式的几何数据) 或 None；曲线只存了默认视野的分辨率"""
+        i = grid_index(angle_val, *VIDEO_ANGLE_SLIDER)
+        arrays = self.video.get(sampling)
+        if arrays is None or i is None or zoom != 1:
+            return None
+        frame_arrays = {name: arrays[name] for name in VIDEO_SHARED}
+        frame_arrays.update({name: arrays[name][i] for name in VIDEO_PER_ANGLE})
+        return arrays["c_values"], frame_arrays
+
+    def describe(self):
+        modes = list(self.app) + (["video"] if self.video else [])
+        return f"{os.path.basename(self.path)} ({'、'.join(modes)})"
+
+
+@lru_cache(maxsize=None)
+def get_frame_bundle(path=BUNDLE_DIR):
+    """本进程共享的数据包；不存在、不完整或与当前代码常数不一致时返回 None"""
+    try:
+        with open(os.path.join(path, "index.json"), encoding="utf-8") as f:
+            index = json.load(f)
+        if index.get("signature") != signature():
+            return None
+        return FrameBundle(path, index)
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="把滑块网格上的全部动画帧数据预计算成内存映射数据包")
+    parser.add_argument("--modes", nargs="+", choices=APP_MODE_VARS + ("video",), default=["c", "n", "angle", "video"],
+                        help="app 模式 (按动画变量) 和 video 页；progress 约 1.3 GB，默认不生成")
+    parser.add_argument("--samplings", nargs="+", choices=list(SAMPLINGS), default=list(SAMPLINGS))
+    parser.add_argument("--out", default=BUNDLE_DIR)
+    args = parser.parse_args(argv)
+    build_bundle(args.out, args.modes, args.samplings)
+    print(f"已写入 {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+动画帧差分
+
+逐个比较每条 trace 在整个扫描过程中的取值，只把真正变化的 trace (以及变化的属性) 写进
+go.Frame；不变的部分只在底图里发送一次。要求调用方的底图用的是第 0 帧的数据，
+这样被省略的 trace/属性在每一帧里都与底图一致，画面不受影响。
+"""
+import numpy as np
+
+
+def same_value(a, b):
+    """比较两个 trace 属性值是否完全相同 (支持 numpy 数组、含 None 的列表、嵌套 dict)"""
+    if isinstance(a, dict) or isinstance(b, dict):
+        return (isinstance(a, dict) and isinstance(b, dict) and a.keys() == b.keys()
+                and all(same_value(a[k], b[k]) for k in a))
+    if isinstance(a, (list, tuple, np.ndarray)) or isinstance(b, (list, tuple, np.ndarray)):
+        a_arr, b_arr = np.asarray(a), np.asarray(b)
+        if a_arr.shape != b_arr.shape:
+            return False
+        if a_arr.dtype.kind in "fc" and b_arr.dtype.kind in "fc":
+            return np.array_equal(a_arr, b_arr, equal_nan=True)
+        return bool(np.all(a_arr == b_arr))
+    return a == b
+
+
+def changing_attrs(frame_data, trace_ids):
+    """
+    找出每条 trace 在各帧之间会变化的属性
+    frame_data: 每帧一个列表，与 trace_ids 一一对应，元素为 go.Scatter 的参数字典
+    返回: {trace_id: [变化的属性名, ...]}，完全不变的 trace 不出现在结果中
+    """
+    first = frame_data[0]
+    result = {}
+    for j, trace_id in enumerate(trace_ids):
+        attrs = [k for k in first[j]
+                 if any(not same_value(first[j][k], frame[j][k]) for frame in frame_data[1:])]
+        if attrs:
+            result[trace_id] = attrs
+    return result
+
+
+def build_diffed_frames(names, trace_ids, frame_data):
+    """生成只包含变化部分的 go.Frame 列表 (底图须使用第 0 帧的数据)"""
+    import plotly.graph_objects as go
+
+    changing = changing_attrs(frame_data, trace_ids)
+    columns = [j for j, trace_id in enumerate(trace_ids) if trace_id in changing]
+    frames = []
+    for name, data in zip(names, frame_data):
+        frames.append(go.Frame(
+            name=name,
+            traces=[trace_ids[j] for j in columns],
+            data=[go.Scatter(**{k: data[j][k] for k in changing[trace_ids[j]]}) for j in columns]
+        ))
+    return frames
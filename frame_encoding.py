@@ -0,0 +1,54 @@
+"""
+动画帧坐标的编码方式
+
+Plotly 默认把坐标当作 JSON 浮点列表 (或 float64 的 base64) 发给浏览器，100 帧的扇环和轨迹圆
+加起来很大。这里提供更紧凑的编码：把坐标四舍五入到显示精度，长数组用 float32 二进制 (base64)
+发送，并能统计每个图表的数据量以便和原编码对比。
+
+二进制发送依赖 plotly>=6 (numpy 数组序列化成 base64 的 bdata)；更早的 plotly 会把 float32 数组
+写成带舍入误差的长十进制列表，反而比取整后的列表大，这时 "float32" 按 "rounded" 处理。
+"""
+from importlib.metadata import PackageNotFoundError, version
+
+import numpy as np
+
+# 可选编码: 键为内部名称，值为侧边栏显示的说明
+ENCODINGS = {
+    "float32": "float32 二进制 (按显示精度取整)",
+    "rounded": "JSON 列表 (按显示精度取整)",
+    "json": "JSON 原始精度 (旧版)",
+}
+DEFAULT_ENCODING = "float32"
+
+# 显示精度：坐标轴范围约 20 个单位，千分之一远小于一个像素
+DISPLAY_DECIMALS = 3
+
+# 比这更短的数组用 JSON 列表反而更小 (base64 有固定的包装开销)
+MIN_BINARY_LENGTH = 16
+
+
+def plotly_sends_binary():
+    """已安装的 plotly 是否把 numpy 数组序列化成 base64 (plotly 6 起)"""
+    try:
+        return int(version("plotly").split(".")[0]) >= 6
+    except (PackageNotFoundError, ValueError):
+        return False
+
+BINARY_ARRAYS = plotly_sends_binary()
+
+
+def encode_coords(values, encoding=DEFAULT_ENCODING, decimals=DISPLAY_DECIMALS):
+    """按指定编码转换一组坐标；None (断线) 会变成 NaN/null，Plotly 同样当作断点处理"""
+    if encoding == "json":
+        return values
+    arr = np.round(np.asarray(values, dtype=float), decimals)
+    if encoding == "float32" and BINARY_ARRAYS and arr.size >= MIN_BINARY_LENGTH:
+        return arr.astype(np.float32)
+    if encoding in ("float32", "rounded"):
+        return [None if np.isnan(v) else v for v in arr.tolist()]
+    raise ValueError(f"未知的编码方式: {encoding}")
+
+
+def figure_payload_bytes(fig):
+    """图表序列化成 JSON 后发给浏览器的字节数"""
+    return len(fig.to_json().encode("utf-8"))
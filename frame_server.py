@@ -0,0 +1,333 @@
+"""
+帧数据服务 (本地 HTTP)
+
+把动画的逐帧几何数据 (与 get_trace_data / get_geometry_data 相同，由批量引擎一次算出) 以紧凑的 JSON
+或二进制返回，课程网页可以自己画，不必给每个观看者开一个 Streamlit 会话。
+
+- 请求由固定数量的常驻工作线程处理 (不是每个连接一个新线程)，支持 HTTP/1.1 keep-alive：
+  空闲的长连接不占工作线程，由一个 selector 线程统一等待，有新请求到达才交给工作线程，
+  空闲超过 KEEPALIVE_TIMEOUT 秒的连接被关闭 (不支持管线化：客户端须等上一个响应回来再发下一个请求)
+- 响应体按量化后的参数缓存在进程内 (见 figure_cache.py)，同一组参数只算一次，之后直接发送字节
+
+接口:
+    GET /frames?mode=c&c=1&n=3&angle=180&steps=60[&progress=1][&sampling=uniform][&format=json|bin]
+        mode: progress / c / n / angle 为 app.py 的动画变量 (沿该变量扫描，其余参数固定)；
+              video 为 video.py 的 c 扫描 (n 固定为 3，只用 angle)
+    GET /stats    缓存与请求统计
+
+二进制格式: 4 字节小端无符号整数 (头部长度) + JSON 头部 + 各字段的原始数据 (小端)，
+头部的 fields 给出每个字段的 dtype、shape 和在数据区的偏移。
+
+用法:
+    python frame_server.py                    # 127.0.0.1:8765，8 个工作线程
+    python frame_server.py --port 9000 --workers 16
+"""
+import argparse
+import json
+import os
+import queue
+import selectors
+import socket
+import struct
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+from figure_cache import get_figure_cache, quantize_key
+from figures import (APP_SLIDERS, APP_SWEEPS, SAMPLINGS, VIDEO_ANGLE_SLIDER, VIDEO_STEPS, app_sample_steps,
+                     video_c_values)
+from frame_encoding import DISPLAY_DECIMALS
+from geometry import FIXED_N, calc_sector_c_range, get_geometry_data_batch, get_trace_data_batch
+
+SERVER_WORKERS = int(os.environ.get("FRAME_SERVER_WORKERS", 8))
+KEEPALIVE_TIMEOUT = 5.0
+MAX_STEPS = 5000
+
+# 响应缓存：值是编码好的响应体 (bytes)
+RESPONSE_CACHE_MAX_ENTRIES = 1024
+RESPONSE_CACHE_MAX_BYTES = int(os.environ.get("FRAME_SERVER_CACHE_BYTES", 128 * 2**20))
+
+MODES = tuple(APP_SWEEPS) + ("video",)
+FORMATS = {"json": "application/json", "bin": "application/octet-stream"}
+
+
+class BadRequest(ValueError):
+    """请求参数不合法 (返回 400)"""
+
+
+def param(query, name, default, cast=float):
+    """取查询参数并转换类型"""
+    if name not in query:
+        return default
+    try:
+        return cast(query[name][0])
+    except ValueError:
+        raise BadRequest(f"参数 {name} 不合法: {query[name][0]!r}")
+
+
+def parse_request(query):
+    """查询参数 -> (模式, 参数字典)；参数默认值与页面滑块一致"""
+    mode = param(query, "mode", "c", str)
+    if mode not in MODES:
+        raise BadRequest(f"未知的模式: {mode} (可选 {', '.join(MODES)})")
+    default_steps = VIDEO_STEPS if mode == "video" else APP_SWEEPS[mode][2]
+    params = {
+        "c": param(query, "c", APP_SLIDERS["c"][2]),
+        "n": param(query, "n", APP_SLIDERS["n"][2]),
+        "angle": param(query, "angle", (VIDEO_ANGLE_SLIDER if mode == "video" else APP_SLIDERS["angle"])[2]),
+        "progress": param(query, "progress", 1.0),
+        "steps": param(query, "steps", default_steps, int),
+        "sampling": param(query, "sampling", "uniform", str),
+        "format": param(query, "format", "json", str),
+    }
+    if not 2 <= params["steps"] <= MAX_STEPS:
+        raise BadRequest(f"steps 须在 2 到 {MAX_STEPS} 之间")
+    if params["sampling"] not in SAMPLINGS:
+        raise BadRequest(f"未知的采样方式: {params['sampling']}")
+    if params["format"] not in FORMATS:
+        raise BadRequest(f"未知的格式: {params['format']}")
+    if not all(np.isfinite(params[k]) for k in ("c", "n", "angle", "progress")):
+        raise BadRequest("c、n、angle、progress 须为有限数")
+    return mode, params
+
+
+def frame_fields(mode, params):
+    """
+    全部帧的数据 {字段: 数组}，第一维都是帧数：
+    app 模式为扫描值、原像/变换像闭合折线 (帧数, 4, 2) 和 D'E' 高亮标记 (与 get_trace_data 一致)；
+    video 模式为 c、原像/变换像闭合折线 (与 get_geometry_data 一致) 和扇环是否与 y=x 相交 (闭式解)
+    """
+    if mode == "video":
+        c_values = video_c_values(params["steps"], params["sampling"])
+        origs, transes = get_geometry_data_batch(c_values, params["angle"])
+        c_lo, c_hi = calc_sector_c_range(FIXED_N)
+        return {"values": c_values, "orig": origs, "trans": transes,
+                "intersect": (c_values >= c_lo) & (c_values <= c_hi)}
+
+    values = app_sample_steps(params["sampling"], mode, params["c"], params["n"], params["angle"],
+                              params["progress"], params["steps"])
+    batch_params = {k: params[k] for k in ("c", "n", "angle", "progress")}
+    batch_params[mode] = values
+    batch = get_trace_data_batch(batch_params["c"], batch_params["n"], batch_params["angle"], batch_params["progress"])
+    return {"values": values, "orig": batch["orig_closed"], "trans": batch["trans_closed"],
+            "highlight": batch["highlight"]}
+
+
+def compact_array(arr):
+    """坐标按显示精度取整后转 float32，标记转 uint8"""
+    arr = np.asarray(arr)
+    if arr.dtype == bool:
+        return arr.astype(np.uint8)
+    return np.round(arr, DISPLAY_DECIMALS).astype("<f4")
+
+
+def encode_json(header, fields):
+    """JSON：每个字段是展平的列表加 shape，数字按显示精度输出"""
+    body = dict(header, fields={name: {"shape": list(arr.shape),
+                                       "data": np.round(arr.astype(float), DISPLAY_DECIMALS).ravel().tolist()}
+                                for name, arr in fields.items()})
+    return json.dumps(body, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def encode_binary(header, fields):
+    """二进制：头部长度 + JSON 头部 + 各字段原始数据"""
+    meta, chunks, offset = {}, [], 0
+    for name, arr in fields.items():
+        data = np.ascontiguousarray(arr).tobytes()
+        meta[name] = {"dtype": arr.dtype.str, "shape": list(arr.shape), "offset": offset}
+        chunks.append(data)
+        offset += len(data)
+    head = json.dumps(dict(header, fields=meta), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return struct.pack("<I", len(head)) + head + b"".join(chunks)
+
+
+def render_frames(mode, params):
+    """按请求算出帧数据并编码成响应体"""
+    fields = {name: compact_array(arr) for name, arr in frame_fields(mode, params).items()}
+    header = {"mode": mode, "params": {k: v for k, v in params.items() if k != "format"},
+              "frames": len(fields["values"])}
+    encode = encode_binary if params["format"] == "bin" else encode_json
+    return encode(header, fields)
+
+
+class FrameHandler(BaseHTTPRequestHandler):
+    """每次只处理连接上的一个请求；连接是否保持由 FrameServer 决定 (见 _work)"""
+    protocol_version = "HTTP/1.1"   # keep-alive
+    timeout = KEEPALIVE_TIMEOUT     # 请求发到一半停住的客户端，超时后关闭
+    # 请求行畸形、读不出版本号时按 HTTP/1.0 回复；默认的 HTTP/0.9 只发正文，客户端看不到 400 状态
+    default_request_version = "HTTP/1.0"
+
+    def handle(self):
+        self.handle_one_request()
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        try:
+            if url.path == "/frames":
+                self.send_frames(parse_qs(url.query))
+            elif url.path == "/stats":
+                self.send_body(json.dumps(self.server.stats(), ensure_ascii=False).encode("utf-8"),
+                               FORMATS["json"])
+            else:
+                self.send_error_json(404, f"未知的路径: {url.path}")
+        except BadRequest as e:
+            self.send_error_json(400, str(e))
+
+    def send_frames(self, query):
+        mode, params = parse_request(query)
+        key = quantize_key(mode, *params.values())
+        body = self.server.cache.get_or_build(key, lambda: render_frames(mode, params))
+        self.send_body(body, FORMATS[params["format"]], cache_control="public, max-age=86400")
+
+    def send_body(self, body, content_type, status=200, cache_control="no-store"):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", cache_control)
+        # 课程网页与本服务不同源，允许跨域读取
+        self.send_header("Access-Control-Allow-Origin", "*")
+        if self.close_connection:
+            self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(body)
+        self.server.count_request()
+
+    def send_error(self, code, message=None, explain=None):
+        """http.server 自己发现的错误 (请求行或头部畸形等) 同样以 JSON 返回，并关闭连接"""
+        self.close_connection = True
+        self.send_error_json(code, message or self.responses.get(code, ("",))[0])
+
+    def send_error_json(self, status, message):
+        self.send_body(json.dumps({"error": message}, ensure_ascii=False).encode("utf-8"), FORMATS["json"], status)
+
+    def log_message(self, format, *args):
+        # 几百个观看者时逐条打印请求会拖慢服务
+        pass
+
+
+class FrameServer(HTTPServer):
+    """
+    常驻工作线程池的 HTTP 服务 (socketserver.ThreadingMixIn 是每个连接新开一个线程)：
+    所有连接先在 selector 里等待，有请求可读时放进队列，由 workers 个线程轮流处理一个请求，
+    处理完仍要保持的连接回到 selector
+    """
+    request_queue_size = 256
+
+    def __init__(self, address, workers=SERVER_WORKERS):
+        super().__init__(address, FrameHandler)
+        self.cache = get_figure_cache("frame-server", max_entries=RESPONSE_CACHE_MAX_ENTRIES,
+                                      max_bytes=RESPONSE_CACHE_MAX_BYTES, sizeof=len)
+        self._ready = queue.Queue()      # 有请求可读的连接
+        self._parked = queue.Queue()     # 等待放回 selector 的空闲连接
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._closing = threading.Event()
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.idle_connections = 0
+        self.started = time.time()
+        self._threads = [threading.Thread(target=self._watch_idle, daemon=True, name="frame-idle")]
+        self._threads += [threading.Thread(target=self._work, daemon=True, name=f"frame-worker-{i}")
+                          for i in range(workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def process_request(self, request, client_address):
+        self._park(request, client_address)
+
+    def _park(self, request, client_address):
+        """连接交给 selector 线程等待下一个请求"""
+        self._parked.put((request, client_address))
+        self._wake_w.send(b"\0")
+
+    def _watch_idle(self):
+        """selector 线程：等待空闲连接上的新请求，关闭空闲太久和已断开的连接"""
+        selector = selectors.DefaultSelector()
+        selector.register(self._wake_r, selectors.EVENT_READ)
+        deadlines = {}
+        while not self._closing.is_set():
+            for key, _ in selector.select(timeout=1.0):
+                if key.fileobj is self._wake_r:
+                    self._wake_r.recv(4096)
+                    continue
+                selector.unregister(key.fileobj)
+                del deadlines[key.fileobj]
+                self._ready.put((key.fileobj, key.data))
+            while not self._parked.empty():
+                request, client_address = self._parked.get()
+                selector.register(request, selectors.EVENT_READ, client_address)
+                deadlines[request] = time.monotonic() + KEEPALIVE_TIMEOUT
+            now = time.monotonic()
+            for request in [r for r, deadline in deadlines.items() if deadline < now]:
+                selector.unregister(request)
+                del deadlines[request]
+                self.shutdown_request(request)
+            with self._lock:
+                self.idle_connections = len(deadlines)
+        for request in deadlines:
+            self.shutdown_request(request)
+        selector.close()
+
+    def _work(self):
+        """工作线程：每次处理一个连接上的一个请求；需要保持的连接放回 selector"""
+        while True:
+            request, client_address = self._ready.get()
+            if request is None:
+                return
+            keep = False
+            try:
+                handler = self.RequestHandlerClass(request, client_address, self)
+                keep = not handler.close_connection
+            except Exception:
+                self.handle_error(request, client_address)
+            if keep and not self._closing.is_set():
+                self._park(request, client_address)
+            else:
+                self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self._closing.set()
+        self._wake_w.send(b"\0")
+        for _ in self._threads[1:]:
+            self._ready.put((None, None))
+        for thread in self._threads:
+            thread.join()
+        self._wake_r.close()
+        self._wake_w.close()
+
+    def count_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def stats(self):
+        with self._lock:
+            requests = self.requests
+            idle = self.idle_connections
+        return {"requests": requests, "uptime_s": round(time.time() - self.started, 1),
+                "workers": len(self._threads) - 1, "idle_connections": idle,
+                "ready_connections": self._ready.qsize(), "cache": self.cache.stats()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="本地帧数据 HTTP 服务 (JSON / 二进制)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=SERVER_WORKERS, help="常驻工作线程数")
+    args = parser.parse_args(argv)
+
+    server = FrameServer((args.host, args.port), args.workers)
+    print(f"帧数据服务: http://{args.host}:{args.port}/frames?mode=c&n=3&angle=180 "
+          f"({args.workers} 个工作线程)", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
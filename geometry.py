@@ -0,0 +1,370 @@
+"""
+几何核心：n 型变换演示用到的全部数学计算
+
+只依赖 NumPy，不导入 Streamlit / Plotly。app.py、video.py 两个页面以及任何离线工具
+(批量扫描、基准测试等) 都可以直接 import，不会启动 Streamlit。
+"""
+from functools import lru_cache
+
+import numpy as np
+
+# ==========================================
+# PART A: 数学核心逻辑 (app.py)
+# ==========================================
+def get_triangle_CDE(c, angle_deg):
+    theta = np.radians(angle_deg)
+    xc, yc = c, c
+    xd = xc + 2 * np.cos(theta)
+    yd = yc + 2 * np.sin(theta)
+    theta_de = theta - np.pi/2
+    xe = xd + 2 * np.cos(theta_de)
+    ye = yd + 2 * np.sin(theta_de)
+    return np.array([[xc, yc], [xd, yd], [xe, ye]])
+
+def apply_n_transform(points, n, progress):
+    trans_points = points.copy()
+    if progress <= 0.5:
+        t = progress / 0.5
+        trans_points[:, 1] = points[:, 1] * (1 - t) + (2 * n - points[:, 1]) * t
+    else:
+        trans_points[:, 1] = 2 * n - points[:, 1]
+        t = (progress - 0.5) / 0.5
+        trans_points[:, 0] = points[:, 0] + t * n
+    return trans_points
+
+def check_intersection(points):
+    D_prime = points[1]
+    E_prime = points[2]
+    val_D = D_prime[1] - D_prime[0]
+    val_E = E_prime[1] - E_prime[0]
+    return (val_D * val_E <= 0)
+
+def calc_c_range(angle_deg, n):
+    base_tri = get_triangle_CDE(0, angle_deg)
+    sum_D = base_tri[1, 0] + base_tri[1, 1]
+    sum_E = base_tri[2, 0] + base_tri[2, 1]
+    c1 = (n - sum_D) / 2
+    c2 = (n - sum_E) / 2
+    return min(c1, c2), max(c1, c2)
+
+# ==========================================
+# PART B: 通用绘图数据生成器 (app.py)
+# ==========================================
+def get_trace_data(c, n, angle, progress):
+    pts_orig = get_triangle_CDE(c, angle)
+    pts_trans = apply_n_transform(pts_orig, n, progress)
+    
+    plot_orig = np.vstack([pts_orig, pts_orig[0]])
+    plot_trans = np.vstack([pts_trans, pts_trans[0]])
+    
+    is_intersect = check_intersection(pts_trans)
+    highlight = is_intersect and (progress > 0.9)
+    # 颜色：红/绿
+    de_color = '#FF0000' if highlight else '#008000' 
+    de_width = 5 if highlight else 3
+    
+    return {
+        "n_line_y": [n, n],
+        "c_line_x": [c, c],
+        "orig_x": plot_orig[:, 0], "orig_y": plot_orig[:, 1],
+        "txt_orig_x": [pts_orig[0,0], pts_orig[1,0], pts_orig[2,0]],
+        "txt_orig_y": [pts_orig[0,1], pts_orig[1,1], pts_orig[2,1]],
+        "trans_x": plot_trans[:, 0], "trans_y": plot_trans[:, 1],
+        "txt_trans_x": [pts_trans[0,0], pts_trans[1,0], pts_trans[2,0]],
+        "txt_trans_y": [pts_trans[0,1], pts_trans[1,1], pts_trans[2,1]],
+        "de_x": [pts_trans[1,0], pts_trans[2,0]], "de_y": [pts_trans[1,1], pts_trans[2,1]],
+        "de_color": de_color, "de_width": de_width,
+        "c_pos": [c], "c_label_text": [f"c={c:.1f}"]
+    }
+
+# ==========================================
+# PART B2: 批量帧引擎 (一次向量化算出全部帧)
+# ==========================================
+@lru_cache(maxsize=1024)
+def unit_triangle(angle_deg):
+    """
+    单位三角形模板：角度固定时 CD、DE 两条边的向量 (cd_x, cd_y, de_x, de_y)
+    角度滑块是 15°/5° 一档，取值有限，按角度缓存后每帧只剩平移
+    """
+    theta = np.radians(angle_deg)
+    theta_de = theta - np.pi/2
+    return 2 * np.cos(theta), 2 * np.sin(theta), 2 * np.cos(theta_de), 2 * np.sin(theta_de)
+
+def get_triangle_CDE_batch(c, angle_deg):
+    """get_triangle_CDE 的批量版：c、angle_deg 可为标量或数组(自动广播)，返回 (帧数, 3, 2)"""
+    if np.ndim(angle_deg) == 0:
+        # 角度固定：取缓存的单位三角形，整批只做平移
+        c = np.atleast_1d(np.asarray(c, dtype=float))
+        cd_x, cd_y, de_x, de_y = unit_triangle(float(angle_deg))
+    else:
+        c, angle_deg = np.broadcast_arrays(np.atleast_1d(np.asarray(c, dtype=float)),
+                                           np.asarray(angle_deg, dtype=float))
+        theta = np.radians(angle_deg)
+        theta_de = theta - np.pi/2
+        cd_x, cd_y = 2 * np.cos(theta), 2 * np.sin(theta)
+        de_x, de_y = 2 * np.cos(theta_de), 2 * np.sin(theta_de)
+    xc, yc = c, c
+    xd = xc + cd_x
+    yd = yc + cd_y
+    xe = xd + de_x
+    ye = yd + de_y
+    x = np.stack([xc, xd, xe], axis=-1)
+    y = np.stack([yc, yd, ye], axis=-1)
+    return np.stack([x, y], axis=-1)
+
+def apply_n_transform_batch(points, n, progress):
+    """apply_n_transform 的批量版：points 为 (帧数, k, 2)，n、progress 为标量或长度为帧数的数组"""
+    n = np.asarray(n, dtype=float).reshape(-1, 1)
+    progress = np.asarray(progress, dtype=float).reshape(-1, 1)
+    x, y = points[..., 0], points[..., 1]
+    # 两个阶段都算出来，再按 progress 逐帧挑选，避免 Python 分支
+    first_half = progress <= 0.5
+    t1 = progress / 0.5
+    t2 = (progress - 0.5) / 0.5
+    trans_y = np.where(first_half, y * (1 - t1) + (2 * n - y) * t1, 2 * n - y)
+    trans_x = np.where(first_half, x, x + t2 * n)
+    return np.stack([trans_x, trans_y], axis=-1)
+
+def check_intersection_batch(points):
+    """check_intersection 的批量版：返回每一帧 D'E' 是否碰到 y=x，形状 (帧数,)"""
+    vals = points[..., 1] - points[..., 0]
+    return vals[:, 1] * vals[:, 2] <= 0
+
+def calc_c_range_batch(angle_deg, n):
+    """calc_c_range 的批量版：angle_deg、n 为标量或可相互广播的数组，返回 (c_min, c_max) 两个数组"""
+    base_tri = get_triangle_CDE_batch(0, angle_deg)
+    sum_D = base_tri[..., 1, 0] + base_tri[..., 1, 1]
+    sum_E = base_tri[..., 2, 0] + base_tri[..., 2, 1]
+    n = np.asarray(n, dtype=float)
+    c1 = (n - sum_D) / 2
+    c2 = (n - sum_E) / 2
+    return np.minimum(c1, c2), np.maximum(c1, c2)
+
+def get_trace_data_batch(c, n, angle, progress):
+    """
+    get_trace_data 的批量版：四个参数任意一个(或几个)可以是数组，其余为标量。
+    返回的数组第一维都是帧数：
+    orig/trans 顶点 (帧数, 3, 2)，闭合折线 (帧数, 4, 2)，D'E' 线段 (帧数, 2, 2)，相交标记 (帧数,)
+    """
+    # 角度固定时保留标量，让 get_triangle_CDE_batch 直接用缓存的单位三角形
+    fixed_angle = angle if np.ndim(angle) == 0 else None
+    c, n, angle, progress = np.broadcast_arrays(*(np.atleast_1d(np.asarray(v, dtype=float))
+                                                  for v in (c, n, angle, progress)))
+    pts_orig = get_triangle_CDE_batch(c, angle if fixed_angle is None else fixed_angle)
+    pts_trans = apply_n_transform_batch(pts_orig, n, progress)
+    return assemble_trace_batch(c, n, angle, progress, pts_orig, pts_trans, check_intersection_batch(pts_trans))
+
+def assemble_trace_batch(c, n, angle, progress, pts_orig, pts_trans, is_intersect):
+    """由顶点和相交标记拼出 get_trace_data_batch 的返回值 (只做拼接，不再计算几何)"""
+    return {
+        "c": c, "n": n, "angle": angle, "progress": progress,
+        "orig": pts_orig, "trans": pts_trans,
+        "orig_closed": np.concatenate([pts_orig, pts_orig[:, :1]], axis=1),
+        "trans_closed": np.concatenate([pts_trans, pts_trans[:, :1]], axis=1),
+        "de": pts_trans[:, 1:3],
+        "is_intersect": is_intersect,
+        "highlight": is_intersect & (progress > 0.9),
+    }
+
+def trace_data_at(batch, i):
+    """从批量结果中取出第 i 帧，格式与 get_trace_data 的返回值一致"""
+    c, n = batch["c"][i], batch["n"][i]
+    pts_orig, pts_trans = batch["orig"][i], batch["trans"][i]
+    plot_orig, plot_trans = batch["orig_closed"][i], batch["trans_closed"][i]
+    highlight = bool(batch["highlight"][i])
+    return {
+        "n_line_y": [n, n],
+        "c_line_x": [c, c],
+        "orig_x": plot_orig[:, 0], "orig_y": plot_orig[:, 1],
+        "txt_orig_x": pts_orig[:, 0].tolist(), "txt_orig_y": pts_orig[:, 1].tolist(),
+        "trans_x": plot_trans[:, 0], "trans_y": plot_trans[:, 1],
+        "txt_trans_x": pts_trans[:, 0].tolist(), "txt_trans_y": pts_trans[:, 1].tolist(),
+        "de_x": batch["de"][i, :, 0].tolist(), "de_y": batch["de"][i, :, 1].tolist(),
+        "de_color": '#FF0000' if highlight else '#008000',
+        "de_width": 5 if highlight else 3,
+        "c_pos": [c], "c_label_text": [f"c={c:.1f}"]
+    }
+
+# ==========================================
+# PART C: 扇环扫描 (video.py)
+# ==========================================
+FIXED_N = 3.0
+
+# 曲线分辨率 (每段弧/每个圆的点数)
+SECTOR_ARC_POINTS = 50
+CIRCLE_POINTS = 90
+
+def get_geometry_data(c, angle_deg):
+    """
+    计算两组三角形的数据：
+    1. 原像 CDE (顺时针)
+    2. 变换像 C'D'E' (n型变换后，自然变为逆时针)
+    """
+    theta = np.radians(angle_deg)
+    
+    # --- A. 计算原像 CDE ---
+    # C 坐标
+    Cx, Cy = c, c
+    
+    # D 坐标 (相对C)
+    vec_CD_x = 2 * np.cos(theta)
+    vec_CD_y = 2 * np.sin(theta)
+    Dx = Cx + vec_CD_x
+    Dy = Cy + vec_CD_y
+    
+    # E 坐标 (顺时针排列 => DE 是 CD 顺时针转90度)
+    # 顺时针转90度: (x, y) -> (y, -x)
+    vec_DE_x = vec_CD_y
+    vec_DE_y = -vec_CD_x
+    
+    Ex = Dx + vec_DE_x
+    Ey = Dy + vec_DE_y
+    
+    # 闭合用于画图
+    orig_tri = np.array([[Cx, Cy], [Dx, Dy], [Ex, Ey], [Cx, Cy]])
+    
+    # --- B. 计算变换像 C'D'E' ---
+    # n型变换: x' = x + n, y' = 2n - y
+    def n_transform(x, y, n):
+        return x + n, 2*n - y
+    
+    C_prime = n_transform(Cx, Cy, FIXED_N)
+    D_prime = n_transform(Dx, Dy, FIXED_N)
+    E_prime = n_transform(Ex, Ey, FIXED_N)
+    
+    trans_tri = np.array([C_prime, D_prime, E_prime, C_prime])
+    
+    return orig_tri, trans_tri
+
+@lru_cache(maxsize=None)
+def unit_sector_template(n_arc=SECTOR_ARC_POINTS, angle_lo=135, angle_hi=270):
+    """
+    扇环多边形相对 C' 的偏移 (dx, dy)，按分辨率缓存；各帧只需平移到各自的 C'
+    条件: xD <= c 且 xE <= c
+    推导: theta in [135, 270] (基于原像顺时针推导)
+    """
+    thetas = np.radians(np.linspace(angle_lo, angle_hi, n_arc))
+    cos2, sin2 = 2 * np.cos(thetas), 2 * np.sin(thetas)
+    
+    # 注意：这里直接用变换后的向量公式来生成轨迹
+    # 原像中: xD = c + 2cos, yD = c + 2sin
+    # 变换后: xD' = (c + 2cos) + n = xc' + 2cos
+    #        yD' = 2n - (c + 2sin) = (2n - c) - 2sin = yc' - 2sin
+    
+    # D' 轨迹 (内弧)
+    d_dx, d_dy = cos2, -sin2
+    
+    # E' 轨迹 (外弧)
+    # 原像中: xE = c + 2cos + 2sin
+    # 变换后: xE' = xE + n = xc' + (2cos + 2sin)
+    #        yE' = 2n - yE = yc' - (2sin - 2cos) = yc' - 2sin + 2cos
+    e_dx, e_dy = cos2 + sin2, -(sin2 - cos2)
+    
+    # 闭合多边形
+    dx = np.concatenate([e_dx, d_dx[::-1], [e_dx[0]]])
+    dy = np.concatenate([e_dy, d_dy[::-1], [e_dy[0]]])
+    dx.flags.writeable = dy.flags.writeable = False
+    return dx, dy
+
+@lru_cache(maxsize=None)
+def unit_circles_template(n_points=CIRCLE_POINTS):
+    """两个轨迹圆 (半径 2 和 2√2) 相对 C' 的偏移，中间用 NaN 断开，按分辨率缓存"""
+    full_rad = np.radians(np.linspace(0, 360, n_points))
+    r_out = 2 * np.sqrt(2)
+    dx = np.concatenate([2 * np.cos(full_rad), [np.nan], r_out * np.cos(full_rad)])
+    dy = np.concatenate([2 * np.sin(full_rad), [np.nan], r_out * np.sin(full_rad)])
+    dx.flags.writeable = dy.flags.writeable = False
+    return dx, dy
+
+def get_c_prime(c_values):
+    """变换基准点 C' = (c + n, 2n - c)，c 为标量或数组"""
+    c = np.asarray(c_values, dtype=float)
+    return c + FIXED_N, 2 * FIXED_N - c
+
+def get_valid_sector_shape_batch(c_values, n_arc=SECTOR_ARC_POINTS):
+    """全部帧的扇环：把缓存的模板一次广播平移到各帧的 C'，返回两个 (帧数, 点数) 数组"""
+    dx, dy = unit_sector_template(n_arc)
+    xc_prime, yc_prime = get_c_prime(np.atleast_1d(c_values)[:, None])
+    return xc_prime + dx, yc_prime + dy
+
+def get_circles_trace_batch(c_values, n_points=CIRCLE_POINTS):
+    """全部帧的轨迹圆：同样是模板平移，返回两个 (帧数, 点数) 数组 (NaN 处断线)"""
+    dx, dy = unit_circles_template(n_points)
+    xc_prime, yc_prime = get_c_prime(np.atleast_1d(c_values)[:, None])
+    return xc_prime + dx, yc_prime + dy
+
+def get_valid_sector_shape(c_val):
+    """计算变换后的有效扇环区域 (单帧)"""
+    poly_x, poly_y = get_valid_sector_shape_batch(c_val)
+    return poly_x[0], poly_y[0]
+
+def get_circles_trace(c_val):
+    """完整轨迹圆虚线 (基于变换后的 C'，单帧)"""
+    circ_x, circ_y = get_circles_trace_batch(c_val)
+    return circ_x[0], circ_y[0]
+
+def get_geometry_data_batch(c_values, angle_deg):
+    """get_geometry_data 的批量版：角度固定、c 为数组，返回原像/变换像的闭合折线，形状均为 (帧数, 4, 2)"""
+    pts = get_triangle_CDE_batch(c_values, float(angle_deg))
+    orig_tri = np.concatenate([pts, pts[:, :1]], axis=1)
+    # n型变换: x' = x + n, y' = 2n - y
+    trans_tri = np.stack([orig_tri[..., 0] + FIXED_N, 2 * FIXED_N - orig_tri[..., 1]], axis=-1)
+    return orig_tri, trans_tri
+
+def check_polygon_line_intersection_batch(poly_x, poly_y):
+    """
+    批量检测多边形是否穿过 y=x (一次处理全部帧)
+    poly_x, poly_y: 形状 (帧数, 点数)，每一行是一帧的闭合多边形
+    返回: (is_intersect, cross_lo, cross_hi)，形状均为 (帧数,)
+          cross_lo/cross_hi 为多边形与 y=x 交点在 y=x 上的坐标范围 (不相交时为 nan)
+    """
+    poly_x = np.atleast_2d(np.asarray(poly_x, dtype=float))
+    poly_y = np.atleast_2d(np.asarray(poly_y, dtype=float))
+    diffs = poly_x - poly_y
+    # 快速排斥
+    separated = np.all(diffs > 1e-5, axis=1) | np.all(diffs < -1e-5, axis=1)
+    # 跨越检测：相邻两点的 x-y 异号(或贴近 0)的边
+    d0, d1 = diffs[:, :-1], diffs[:, 1:]
+    crossing = (d0 * d1 <= 1e-6) & ~separated[:, None]
+    is_intersect = crossing.any(axis=1)
+    
+    # 交点位置：在边上线性插值到 x-y=0，再投影到 y=x 上 (取 (x+y)/2)
+    denom = d0 - d1
+    safe_denom = np.where(denom == 0, 1.0, denom)
+    t = np.clip(np.where(denom == 0, 0.0, d0 / safe_denom), 0.0, 1.0)
+    px = poly_x[:, :-1] + t * (poly_x[:, 1:] - poly_x[:, :-1])
+    py = poly_y[:, :-1] + t * (poly_y[:, 1:] - poly_y[:, :-1])
+    s = (px + py) / 2
+    cross_lo = np.where(crossing, s, np.inf).min(axis=1)
+    cross_hi = np.where(crossing, s, -np.inf).max(axis=1)
+    cross_lo[~is_intersect] = np.nan
+    cross_hi[~is_intersect] = np.nan
+    return is_intersect, cross_lo, cross_hi
+
+def check_polygon_line_intersection(poly_x, poly_y):
+    """检测多边形是否穿过 y=x"""
+    is_intersect, _, _ = check_polygon_line_intersection_batch(poly_x, poly_y)
+    return bool(is_intersect[0])
+
+def _sin_range(amp, phase_deg, lo_deg, hi_deg):
+    """amp * sin(θ + phase) 在 θ ∈ [lo, hi] (角度制) 上的最小值和最大值"""
+    candidates = [lo_deg, hi_deg]
+    # 极值点: θ + phase = 90 + 180k
+    k_lo = int(np.ceil((lo_deg + phase_deg - 90) / 180))
+    k_hi = int(np.floor((hi_deg + phase_deg - 90) / 180))
+    candidates += [90 + 180 * k - phase_deg for k in range(k_lo, k_hi + 1)]
+    values = amp * np.sin(np.radians(np.array(candidates, dtype=float) + phase_deg))
+    return values.min(), values.max()
+
+def calc_sector_c_range(n=FIXED_N, angle_lo=135, angle_hi=270):
+    """
+    闭式求解：扫过区域 (θ ∈ [angle_lo, angle_hi] 时所有 D'E' 的并) 与 y=x 相交时 c 的范围
+    沿每条 D'E' 上 x-y 线性变化，所以极值只在 D'、E' 两端取到：
+        D': x-y = 2c - n + 2cosθ + 2sinθ = 2c - n + 2√2·sin(θ+45°)
+        E': x-y = 2c - n + 4sinθ
+    相交 <=> min(x-y) <= 0 <= max(x-y)
+    """
+    d_min, d_max = _sin_range(2 * np.sqrt(2), 45, angle_lo, angle_hi)
+    e_min, e_max = _sin_range(4, 0, angle_lo, angle_hi)
+    g_min, g_max = min(d_min, e_min), max(d_max, e_max)
+    return (n - g_max) / 2, (n - g_min) / 2
@@ -0,0 +1,204 @@
+"""
+并发会话压测
+
+用 Streamlit 自带的 AppTest 在同一进程里模拟 N 个同时在线的会话 (不需要浏览器和网络)，
+每个会话在 app.py / video.py 上随机切换模式、拖动滑块、改采样方式，记录每次 rerun 的耗时。
+会话数逐级增加，报告 rerun 耗时的 p50/p95、吞吐量 (rerun/秒) 和进程常驻内存，
+用来在全班同时登录之前估计单个服务进程能撑住多少会话。
+
+注意：
+- AppTest 每次运行都会替换进程级的全局状态 (Runtime 实例、配置项、脚本缓存)，不能在多个线程里
+  同时运行。所以各会话在各自的线程里并发地操作和停顿，rerun 本身排队逐个执行。rerun 是受 GIL
+  限制的 Python/NumPy 计算，真实服务器上多线程并发执行时吞吐量也差不多，排队相当于服务器上的
+  线程轮转；报告的耗时 = 排队 + 执行，另外单独给出纯执行时间。
+- AppTest 每次操作都会重跑整个脚本 (不区分 st.fragment)，所以 app.py 的耗时比浏览器里
+  拖动滑块 (只重跑片段) 略高；各会话共享进程内的图表缓存和帧数据包，与真实部署一致。
+
+用法:
+    python loadtest.py                               # 1 2 4 8 个会话，每个会话 20 次操作
+    python loadtest.py --sessions 1 4 16 32 --actions 50 --pages app --think 0
+"""
+import argparse
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from figures import SAMPLINGS
+from memory_report import process_rss
+
+PAGES = ("app", "video")
+PAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 每次操作的类型及其权重：大部分是拖滑块，偶尔换模式 / 采样方式
+ACTIONS = {
+    "app": {"slider": 0.7, "mode": 0.15, "sampling": 0.15},
+    "video": {"slider": 0.85, "sampling": 0.15},
+}
+
+RSS_INTERVAL = 0.1   # 采样进程内存的间隔 (秒)
+SCRIPT_TIMEOUT = 120
+DEFAULT_THINK = 0.2  # 两次操作之间的平均停顿 (秒，指数分布)
+
+# AppTest 不能并发运行，见模块说明
+_run_lock = threading.Lock()
+
+
+def percentile(values, q):
+    """q 分位数 (0-100)，线性插值"""
+    values = sorted(values)
+    if not values:
+        return float("nan")
+    pos = (len(values) - 1) * q / 100
+    lo = int(pos)
+    hi = min(lo + 1, len(values) - 1)
+    return values[lo] + (values[hi] - values[lo]) * (pos - lo)
+
+
+def random_slider_value(slider, rng):
+    """滑块网格上的随机值 (与浏览器里拖动得到的值一样落在步长上)"""
+    count = int(round((slider.max - slider.min) / slider.step))
+    value = slider.min + rng.randint(0, count) * slider.step
+    return type(slider.min)(round(value, 6))
+
+
+def timed_run(at):
+    """排队执行一次 rerun，返回 (排队 + 执行, 执行) 秒数"""
+    t0 = time.perf_counter()
+    with _run_lock:
+        t1 = time.perf_counter()
+        at.run()
+    t2 = time.perf_counter()
+    return t2 - t0, t2 - t1
+
+
+def perform(at, page, rng):
+    """随机做一次操作并重跑脚本，返回 timed_run 的结果"""
+    kinds, weights = zip(*ACTIONS[page].items())
+    kind = rng.choices(kinds, weights)[0]
+    if kind == "mode":
+        radio = at.sidebar.radio[0]
+        radio.set_value(rng.choice(radio.options))
+    elif kind == "sampling":
+        # AppTest 里 selectbox 的 options 是 format_func 处理后的显示文字，只能直接设置内部名称
+        at.sidebar.selectbox[0].set_value(rng.choice(list(SAMPLINGS)))
+    else:
+        slider = rng.choice(at.sidebar.slider)
+        slider.set_value(random_slider_value(slider, rng))
+    return timed_run(at)
+
+
+def run_session(page, n_actions, seed, think=DEFAULT_THINK):
+    """一个会话：打开页面后连续做 n_actions 次操作 (中间随机停顿)，返回各次 rerun 的耗时"""
+    from streamlit.testing.v1 import AppTest
+
+    rng = random.Random(seed)
+    at = AppTest.from_file(os.path.join(PAGE_DIR, f"{page}.py"), default_timeout=SCRIPT_TIMEOUT)
+    first = timed_run(at)[0]
+    latencies, service, errors = [], [], len(at.exception)
+    for _ in range(n_actions):
+        if think:
+            time.sleep(rng.expovariate(1 / think))
+        latency, busy = perform(at, page, rng)
+        latencies.append(latency)
+        service.append(busy)
+        errors += len(at.exception)
+    return {"page": page, "first": first, "latencies": latencies, "service": service, "errors": errors}
+
+
+class RssSampler:
+    """后台线程定时采样进程内存，记录峰值"""
+
+    def __init__(self, interval=RSS_INTERVAL):
+        self.interval = interval
+        self.peak = process_rss()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, process_rss())
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, process_rss())
+
+
+def run_level(n_sessions, pages, n_actions, seed, think=DEFAULT_THINK):
+    """n_sessions 个会话同时运行 (按顺序轮流分到各页面)"""
+    with RssSampler() as rss, ThreadPoolExecutor(max_workers=n_sessions) as pool:
+        t0 = time.perf_counter()
+        futures = [pool.submit(run_session, pages[i % len(pages)], n_actions, seed * 1000 + i, think)
+                   for i in range(n_sessions)]
+        sessions = [f.result() for f in futures]
+        wall = time.perf_counter() - t0
+
+    latencies = [t for s in sessions for t in s["latencies"]]
+    result = {
+        "sessions": n_sessions,
+        "reruns": len(latencies),
+        "wall_s": wall,
+        "throughput": len(latencies) / wall,
+        "p50_s": percentile(latencies, 50),
+        "p95_s": percentile(latencies, 95),
+        "service_p50_s": percentile([t for s in sessions for t in s["service"]], 50),
+        "first_p50_s": percentile([s["first"] for s in sessions], 50),
+        "errors": sum(s["errors"] for s in sessions),
+        "rss_end_mb": process_rss() / 2**20,
+        "rss_peak_mb": rss.peak / 2**20,
+    }
+    for page in pages:
+        page_latencies = [t for s in sessions if s["page"] == page for t in s["latencies"]]
+        result[f"{page}_p95_s"] = percentile(page_latencies, 95)
+    return result
+
+
+def print_table(results, pages):
+    header = (f"{'sessions':>8}{'reruns':>8}{'rerun/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'exec p50':>10}"
+              + "".join(f"{page + ' p95':>11}" for page in pages)
+              + f"{'first ms':>10}{'RSS MB':>8}{'peak MB':>9}{'errors':>8}")
+    print(header)
+    for r in results:
+        print(f"{r['sessions']:>8}{r['reruns']:>8}{r['throughput']:>9.1f}{r['p50_s'] * 1e3:>9.0f}"
+              f"{r['p95_s'] * 1e3:>9.0f}{r['service_p50_s'] * 1e3:>10.0f}"
+              + "".join(f"{r[page + '_p95_s'] * 1e3:>11.0f}" for page in pages)
+              + f"{r['first_p50_s'] * 1e3:>10.0f}{r['rss_end_mb']:>8.0f}{r['rss_peak_mb']:>9.0f}{r['errors']:>8}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="用 AppTest 模拟多个并发会话压测两个页面")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 2, 4, 8], help="逐级测试的并发会话数")
+    parser.add_argument("--actions", type=int, default=20, help="每个会话的操作次数")
+    parser.add_argument("--pages", nargs="+", choices=PAGES, default=list(PAGES))
+    parser.add_argument("--think", type=float, default=DEFAULT_THINK,
+                        help="两次操作之间的平均停顿 (秒)；0 表示不停顿，测最大负载")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=None, help="结果文件 (默认 loadtest-<时间>.json)")
+    args = parser.parse_args(argv)
+
+    results = []
+    for n_sessions in args.sessions:
+        results.append(run_level(n_sessions, args.pages, args.actions, args.seed, args.think))
+        print(f"{n_sessions} 个会话完成", flush=True)
+    print_table(results, args.pages)
+
+    out = args.out or time.strftime("loadtest-%Y%m%d-%H%M%S.json")
+    report = {
+        "meta": {"time": time.strftime("%Y-%m-%dT%H:%M:%S"), "cpus": os.cpu_count(),
+                 "pages": args.pages, "actions": args.actions, "think": args.think, "seed": args.seed},
+        "results": results,
+    }
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n结果已保存到 {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+曲线分辨率 (细节层次)
+
+圆和圆弧画成折线时，相邻两点之间的弦与圆弧的最大偏差 (弦高) 为 r·(1 - cos(Δθ/2))。
+按屏幕上允许的偏差 (像素) 和当前视野里每个像素对应的数据长度，就能算出需要多少个点：
+视野放大时点数增加，整个画布时减少；帧数很多时再按总点数预算降低分辨率，
+但偏差始终不超过 MAX_ERROR_PX 像素。只依赖 NumPy。
+"""
+import numpy as np
+
+# 目标偏差与允许的最大偏差 (像素)
+TARGET_ERROR_PX = 0.5
+MAX_ERROR_PX = 2.0
+
+# 每条曲线在全部帧里的总点数预算，以及每条曲线的点数上下限
+FRAME_POINT_BUDGET = 20_000
+MIN_POINTS = 8
+MAX_POINTS = 2048
+
+
+def units_per_pixel(x_range, y_range, plot_w, plot_h):
+    """x、y 等比例显示时每个像素对应的数据长度 (两个方向中较挤的那个决定比例)"""
+    return max((x_range[1] - x_range[0]) / plot_w, (y_range[1] - y_range[0]) / plot_h)
+
+
+def zoomed_range(axis_range, zoom):
+    """以中心为基准缩放坐标轴范围"""
+    center, half = (axis_range[0] + axis_range[1]) / 2, (axis_range[1] - axis_range[0]) / 2 / zoom
+    return center - half, center + half
+
+
+def points_for_error(radius, sweep_deg, max_error):
+    """半径 radius、张角 sweep_deg 的圆弧在弦高不超过 max_error (数据单位) 时需要的点数 (含两端)"""
+    step = 2 * np.arccos(1 - min(max_error / radius, 1.0))
+    return int(np.ceil(np.radians(sweep_deg) / step)) + 1
+
+
+def error_px(radius, sweep_deg, n_points, unit_px):
+    """用 n_points 个点画圆弧时的最大弦高 (像素)"""
+    step = np.radians(sweep_deg) / (n_points - 1)
+    return radius * (1 - np.cos(step / 2)) / unit_px
+
+
+def curve_points(radius, sweep_deg, unit_px, frames, budget=FRAME_POINT_BUDGET):
+    """
+    一条圆弧每帧用的点数：
+    先按 TARGET_ERROR_PX 取点；全部帧超出总预算时降到 budget // frames，但不少于 MAX_ERROR_PX 对应的点数
+    """
+    wanted = points_for_error(radius, sweep_deg, TARGET_ERROR_PX * unit_px)
+    floor = points_for_error(radius, sweep_deg, MAX_ERROR_PX * unit_px)
+    n = max(min(wanted, budget // max(frames, 1)), floor)
+    return int(np.clip(n, MIN_POINTS, MAX_POINTS))
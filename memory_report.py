@@ -0,0 +1,68 @@
+"""
+内存报告：估算每个会话和整个进程的内存占用，用来给服务器定容量
+
+进程里的图表缓存和静态部分 (见 figure_cache、figures.static_parts) 由所有会话共享，
+会话自己的 session_state 里对它们的引用不重复计算。
+缓存的字节数是缓存对象在内存里的估算大小 (图表按生成时的帧数据计，见 figure_cache.data_nbytes；
+其他按 deep_sizeof；HTTP 帧服务缓存的是 bytes 响应，按长度计)，可以直接从进程常驻内存里扣除。
+页面只在勾选 "显示内存" 时才生成报告。
+"""
+import os
+import resource
+import sys
+
+from figure_cache import all_figure_caches, deep_sizeof
+
+
+def process_rss():
+    """当前进程的常驻内存 (字节)；取不到 /proc 时退回到历史峰值"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux 以 KB 为单位，macOS 以字节为单位
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def active_sessions():
+    """Streamlit 当前的活动会话数；不在 Streamlit 里运行 (或接口变化) 时返回 None"""
+    try:
+        from streamlit import runtime
+
+        if not runtime.exists():
+            return None
+        return runtime.get_instance()._session_mgr.num_active_sessions()
+    except (ImportError, AttributeError, RuntimeError):
+        return None
+
+
+def session_nbytes(session_state):
+    """一个会话独占的内存：session_state 中除去进程级缓存里共享对象之外的部分"""
+    shared = {id(v) for cache in all_figure_caches().values() for v in cache.values()}
+    return deep_sizeof(dict(session_state), shared)
+
+
+def memory_report(session_state):
+    """{"rss", "sessions", "session", "caches": {名字: 内存估算}} —— 各项单位均为字节"""
+    return {
+        "rss": process_rss(),
+        "sessions": active_sessions(),
+        "session": session_nbytes(session_state),
+        "caches": {name: cache.stats()["bytes"] for name, cache in all_figure_caches().items()},
+    }
+
+
+def memory_lines(session_state):
+    """侧边栏显示用的几行文字"""
+    report = memory_report(session_state)
+    shared = sum(report["caches"].values())
+    lines = [
+        f"进程常驻内存：{report['rss'] / 2**20:.0f} MB",
+        "共享缓存 (内存估算)：" + "，".join(f"{name} {nbytes / 1024:.0f} KB" for name, nbytes in report["caches"].items()),
+        f"本会话独占：{report['session'] / 1024:.1f} KB",
+    ]
+    if report["sessions"]:
+        per_session = max(report["rss"] - shared, 0) / report["sessions"]
+        lines.append(f"活动会话 {report['sessions']} 个，平均每会话 ≤ {per_session / 2**20:.1f} MB (进程内存扣除共享缓存后均摊)")
+    return lines
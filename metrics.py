@@ -0,0 +1,192 @@
+"""
+热路径计时
+
+把一次 rerun 拆成几个阶段分别计时：参数解析、帧数据生成、go.Figure 组装、序列化、
+交给 st.plotly_chart。每次 rerun 的记录同时带上帧数和数据量，可以在侧边栏查看，
+也可以通过环境变量导出：
+    METRICS_PROM_FILE  Prometheus 文本格式 (每次 rerun 后整体重写，可交给 node_exporter 的 textfile 收集器)
+    METRICS_JSON_LOG   JSON Lines 日志 (每次 rerun 追加一行)
+没有进行中的记录时 (离线工具、基准测试) stage() 什么也不做。
+"""
+import contextvars
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# 阶段名与侧边栏显示的说明
+STAGES = {
+    "params": "参数解析",
+    "frames": "帧数据生成",
+    "figure": "go.Figure 组装",
+    "serialize": "序列化",
+    "chart": "st.plotly_chart",
+}
+
+PROM_FILE = os.environ.get("METRICS_PROM_FILE")
+JSON_LOG = os.environ.get("METRICS_JSON_LOG")
+
+_current = contextvars.ContextVar("metrics_run", default=None)
+
+
+class Run:
+    """一次 rerun 的计时记录"""
+
+    def __init__(self, page):
+        self.page = page
+        self.time = time.time()
+        self.stages = {}
+        self._children = []  # 进行中的各层阶段里，子阶段已用掉的时间
+        self.frames = None
+        self.payload_bytes = None
+
+    def add(self, stage, seconds):
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    @property
+    def cache_hit(self):
+        """没有生成帧数据就说明图表来自缓存"""
+        return "frames" not in self.stages
+
+    def as_dict(self):
+        return {
+            "page": self.page,
+            "time": self.time,
+            "stages": self.stages,
+            "frames": self.frames,
+            "payload_bytes": self.payload_bytes,
+            "cache_hit": self.cache_hit,
+        }
+
+    def lines(self):
+        """侧边栏显示用的几行文字"""
+        lines = [f"{STAGES.get(name, name)}：{seconds * 1e3:.1f} ms" for name, seconds in self.stages.items()]
+        lines.append(f"帧数 {self.frames}，数据量 {(self.payload_bytes or 0) / 1024:.1f} KB"
+                     + ("，图表来自缓存" if self.cache_hit else ""))
+        return lines
+
+
+class MetricsRegistry:
+    """进程内的累计值 (按页面和阶段)，用于导出 Prometheus 文本"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stage_seconds = {}  # (page, stage) -> [次数, 总秒数, 最大值]
+        self.runs = {}           # page -> [rerun 次数, 缓存命中次数, 帧数总和, 数据量总和]
+
+    def observe(self, run):
+        with self._lock:
+            for stage, seconds in run.stages.items():
+                entry = self.stage_seconds.setdefault((run.page, stage), [0, 0.0, 0.0])
+                entry[0] += 1
+                entry[1] += seconds
+                entry[2] = max(entry[2], seconds)
+            totals = self.runs.setdefault(run.page, [0, 0, 0, 0])
+            totals[0] += 1
+            totals[1] += run.cache_hit
+            totals[2] += run.frames or 0
+            totals[3] += run.payload_bytes or 0
+
+    def prometheus_text(self):
+        with self._lock:
+            out = ["# HELP geometry_stage_seconds 每次 rerun 各阶段的耗时",
+                   "# TYPE geometry_stage_seconds summary"]
+            for (page, stage), (count, total, _) in sorted(self.stage_seconds.items()):
+                labels = f'page="{page}",stage="{stage}"'
+                out.append(f"geometry_stage_seconds_sum{{{labels}}} {total:.6f}")
+                out.append(f"geometry_stage_seconds_count{{{labels}}} {count}")
+            out += ["# HELP geometry_stage_seconds_max 各阶段的最大耗时",
+                    "# TYPE geometry_stage_seconds_max gauge"]
+            for (page, stage), (_, _, peak) in sorted(self.stage_seconds.items()):
+                out.append(f'geometry_stage_seconds_max{{page="{page}",stage="{stage}"}} {peak:.6f}')
+            for i, (name, help_text) in enumerate((("runs", "rerun 次数"), ("cache_hits", "图表缓存命中的 rerun 次数"),
+                                                   ("frames", "生成的动画帧数"), ("payload_bytes", "发给浏览器的图表数据量"))):
+                out += [f"# HELP geometry_{name}_total {help_text}", f"# TYPE geometry_{name}_total counter"]
+                out += [f'geometry_{name}_total{{page="{page}"}} {totals[i]}' for page, totals in sorted(self.runs.items())]
+            return "\n".join(out) + "\n"
+
+
+registry = MetricsRegistry()
+_export_lock = threading.Lock()
+
+
+def export(run):
+    """按环境变量把记录写到 Prometheus 文本文件 / JSON 日志"""
+    if not (PROM_FILE or JSON_LOG):
+        return
+    with _export_lock:
+        if PROM_FILE:
+            tmp = PROM_FILE + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(registry.prometheus_text())
+            os.replace(tmp, PROM_FILE)
+        if JSON_LOG:
+            with open(JSON_LOG, "a", encoding="utf-8") as f:
+                f.write(json.dumps(run.as_dict(), ensure_ascii=False) + "\n")
+
+
+def begin_run(page):
+    """开始记录一次 rerun (同一线程里新的记录会替换旧的)"""
+    run = Run(page)
+    _current.set(run)
+    return run
+
+
+def finish_run(run):
+    """结束记录：计入累计值并导出"""
+    if _current.get() is run:
+        _current.set(None)
+    registry.observe(run)
+    export(run)
+
+
+def current_run():
+    return _current.get()
+
+
+@contextmanager
+def record_run(page):
+    """记录一次 rerun；也可以当装饰器用 (例如包住 st.fragment 的函数体)"""
+    run = begin_run(page)
+    try:
+        yield run
+    finally:
+        finish_run(run)
+
+
+@contextmanager
+def stage(name):
+    """
+    给当前记录的某个阶段计时；没有进行中的记录时直接执行
+    阶段可以嵌套，外层只计自身的时间 (例如 "figure" 里调用的 "frames" 不重复计入 "figure")
+    """
+    run = _current.get()
+    if run is None:
+        yield
+        return
+    run._children.append(0.0)
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - t0
+        run.add(name, elapsed - run._children.pop())
+        if run._children:
+            run._children[-1] += elapsed
+
+
+def note(**fields):
+    """给当前记录补充帧数、数据量等信息"""
+    run = _current.get()
+    if run is not None:
+        for key, value in fields.items():
+            setattr(run, key, value)
+
+
+def timed(stage_name, fn):
+    """包装一个函数，使每次调用都计入指定阶段"""
+    def wrapper(*args, **kwargs):
+        with stage(stage_name):
+            return fn(*args, **kwargs)
+    return wrapper
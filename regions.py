@@ -0,0 +1,31 @@
+"""
+页面分区重算
+
+把页面拆成几个区域 (理论说明、图表…)，每个区域声明自己依赖的输入。
+重跑时输入没变的区域直接复用本会话上一次的结果；配合 st.fragment，
+侧边栏控件变化时只重跑受影响的片段，而不是整个脚本。
+"""
+import streamlit as st
+
+from figure_cache import quantize_key
+
+_STATE_KEY = "_regions"
+
+
+def region(name, inputs, compute):
+    """inputs 与上次相同时返回上次的结果，否则调用 compute() 重新计算"""
+    state = st.session_state.setdefault(_STATE_KEY, {})
+    key = quantize_key(*inputs)
+    entry = state.setdefault(name, {"key": None, "value": None, "computed": 0, "reused": 0})
+    if entry["computed"] and entry["key"] == key:
+        entry["reused"] += 1
+        return entry["value"]
+    entry["key"], entry["value"] = key, compute()
+    entry["computed"] += 1
+    return entry["value"]
+
+
+def region_stats():
+    """{区域名: (重算次数, 复用次数)}"""
+    state = st.session_state.get(_STATE_KEY, {})
+    return {name: (entry["computed"], entry["reused"]) for name, entry in state.items()}
@@ -0,0 +1,72 @@
+"""
+自适应帧采样
+
+均匀的 np.linspace 网格把大部分帧花在画面几乎不变的区间上，而 D'E' 开始/停止碰到 y=x
+的那一刻却可能落在两帧之间。这里先找出状态翻转的参数值 (粗扫 + 二分，或由调用方直接给出
+闭式解)，再在帧数预算内把帧集中到这些值附近，其余区间稀疏采样；翻转值本身一定单独成一帧。
+只依赖 NumPy。
+"""
+import numpy as np
+
+# 粗扫的点数与二分的次数 (40 次足以把区间缩到浮点精度附近)
+COARSE_POINTS = 256
+BISECT_ITERS = 40
+
+# 动画滑块标签和帧名保留的小数位数；相邻两帧的间隔不小于 1.5 个末位单位，取整后才一定不同
+LABEL_DECIMALS = 2
+
+# 预算中分给临界值附近的比例，以及每个临界值两侧加密的范围 (占整个区间的比例)
+DENSE_SHARE = 0.5
+DENSE_WINDOW = 0.05
+
+
+def find_transitions(predicate, start, stop, coarse=COARSE_POINTS, iters=BISECT_ITERS):
+    """
+    找出 predicate 在 [start, stop] 上取值翻转的位置
+    predicate: 接收一组参数值、返回等长布尔数组的向量化函数
+    返回: 每个翻转处第一个取到新状态的参数值 (升序)
+    """
+    grid = np.linspace(start, stop, coarse)
+    state = np.asarray(predicate(grid), dtype=bool)
+    idx = np.flatnonzero(state[1:] != state[:-1])
+    if idx.size == 0:
+        return idx.astype(float)
+    # 所有翻转区间一起二分，每轮只调用一次 predicate
+    lo, hi, lo_state = grid[idx], grid[idx + 1], state[idx]
+    for _ in range(iters):
+        mid = (lo + hi) / 2
+        same = np.asarray(predicate(mid), dtype=bool) == lo_state
+        lo, hi = np.where(same, mid, lo), np.where(same, hi, mid)
+    return hi
+
+
+def adaptive_steps(start, stop, budget, events, dense_share=DENSE_SHARE, window=DENSE_WINDOW,
+                   decimals=LABEL_DECIMALS):
+    """
+    在 budget 帧以内生成从 start 到 stop 单调的参数序列：起点、终点和每个临界值 (events) 必定包含，
+    临界值两侧 window 范围内加密，其余区间均匀稀疏采样。
+    相邻两帧按 decimals 位小数取整后互不相同；彼此 (或与端点) 相距更近的临界值只保留一个
+    """
+    span = stop - start
+    events = np.unique(np.clip(np.asarray(events, dtype=float), min(start, stop), max(start, stop)))
+    if events.size == 0 or budget < 2 + 3 * events.size:
+        return np.linspace(start, stop, budget)
+
+    per_event = int(budget * dense_share) // events.size
+    dense = [np.linspace(e - window * span, e + window * span, per_event) for e in events]
+    n_sparse = budget - per_event * events.size - events.size
+    values = np.concatenate([np.linspace(start, stop, n_sparse), *dense])
+    values = values[(values - start) * (values - stop) <= 0]
+
+    # 相邻两帧至少相隔这么远，免得帧名/滑块标签重复；冲突时优先保留端点和临界值
+    min_gap = max(abs(span) / (budget * 8), 1.5 * 10.0 ** -decimals)
+    protected = np.concatenate([[start, stop], events])
+    order = np.sign(span) or 1.0
+    kept = []
+    for v in sorted(set(values.tolist()) | set(protected.tolist()), key=lambda v: order * v):
+        if kept and abs(v - kept[-1]) < min_gap:
+            if v in protected and kept[-1] not in protected:
+                kept[-1] = v
+            continue
+        kept.append(v)
+    return np.array(kept)
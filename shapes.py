@@ -0,0 +1,57 @@
+import streamlit as st
+
+from figure_cache import get_figure_cache, quantize_key
+from figures import SHAPES_SLIDERS, SHAPES_STEPS, build_shapes_figure
+from frame_encoding import ENCODINGS
+from metrics import begin_run, finish_run, note, stage, timed
+
+# --- 1. 页面配置 ---
+st.set_page_config(
+    page_title="多形状组合变换",
+    layout="wide",
+    initial_sidebar_state="expanded"
+)
+
+# --- 2. 组合变换见 transforms.py (3×3 齐次矩阵，整批形状 × 整批帧一次算完)，图表生成见 figures.py ---
+
+# 本次 rerun 各阶段的计时 (见 metrics.py)
+run = begin_run("shapes")
+
+# --- 3. 侧边栏 ---
+with st.sidebar, stage("params"):
+    st.header("🎮 控制台")
+    count = st.slider("形状数量", *SHAPES_SLIDERS["count"])
+    n_val = st.slider("参数 n", *SHAPES_SLIDERS["n"])
+    spin = st.slider("自转角度 (绕各自中心)", *SHAPES_SLIDERS["spin"])
+    scale_val = st.slider("缩放 (以原点为中心)", *SHAPES_SLIDERS["scale"])
+    encoding = st.selectbox("帧数据编码", list(ENCODINGS), format_func=ENCODINGS.get)
+    show_timings = st.checkbox("⏱️ 显示各阶段耗时")
+
+# --- 4. 绘图主程序 ---
+st.title("🔷 多形状组合变换")
+st.markdown("每个形状依次 **绕自身中心旋转 → 以原点为中心缩放 → n 型变换**，三步合成一个 3×3 矩阵；"
+            "碰到 $y=x$ 的形状标成红色")
+
+# 图表按量化后的全部参数缓存，缓存按帧数据大小计量 (见 figure_cache.data_nbytes)
+fig_cache = get_figure_cache("shapes")
+key = quantize_key(count, n_val, spin, scale_val, encoding)
+fig, n_hits = fig_cache.get_or_build(
+    key,
+    timed("figure", lambda: build_shapes_figure(count, n_val, spin, scale_val, SHAPES_STEPS, encoding,
+                                                with_nbytes=True)),
+    sized=True
+)
+
+with stage("chart"):
+    st.plotly_chart(fig, use_container_width=True)
+note(frames=SHAPES_STEPS)
+st.sidebar.caption(f"变换完成时 {n_hits} / {count} 个形状碰到 y=x")
+
+stats = fig_cache.stats()
+st.sidebar.caption(f"图表缓存：命中 {stats['hits']} / 未命中 {stats['misses']}，"
+                   f"{stats['entries']} 项，{stats['bytes'] / 2**20:.1f} MB")
+
+finish_run(run)
+if show_timings:
+    for line in run.lines():
+        st.sidebar.caption(line)
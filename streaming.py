@@ -0,0 +1,185 @@
+"""
+流式播放 (很长的扫描)
+
+默认的播放方式把全部帧嵌进图表一次发给浏览器，几千帧的扫描要先等很久的组装和一大块数据才能看到画面。
+这里改由服务端按需生成：扫描值分块懒生成，每块用批量引擎 (与 build_*_figure 相同的帧数据) 一次算完，
+逐帧放进一个有界的预读缓冲区；页面从缓冲区取一帧，就把当前帧的图表推到原来的图表占位里。
+首帧时间和内存只取决于块大小和缓冲区长度，与扫描总帧数无关。
+
+不直接依赖 Streamlit：play 只需要 "显示一帧" 的回调；两个页面共用的 stream_chart 接收页面的
+占位 (st.empty()，只用到 plotly_chart / caption)。
+"""
+import queue
+import threading
+import time
+
+import numpy as np
+
+from figures import (APP_SWEEPS, VIDEO_C_RANGE, app_frame_data, assemble_figure, build_app_figure,
+                     build_video_figure, video_curve_resolution, video_frame_arrays, video_frame_data)
+from frame_encoding import DEFAULT_ENCODING
+from metrics import stage
+
+# 每次批量计算的帧数与预读缓冲区的帧数
+STREAM_CHUNK = 32
+STREAM_LOOKAHEAD = 64
+
+# 流式播放的帧数滑块 (最小值, 最大值, 默认值, 步长) 与默认帧率
+STREAM_STEPS_SLIDER = (100, 20000, 2000, 100)
+STREAM_FPS = 20
+
+# 各页面每帧变化的 trace 序号 (与 build_*_figure 的帧一致)
+APP_STREAM_TRACES = (1, 2, 3, 4, 5, 6, 7, 8)
+VIDEO_STREAM_TRACES = (2, 3, 4, 5, 6, 7, 8)
+
+# 帧参数里需要与底图合并 (而不是整个替换) 的嵌套属性
+NESTED_ATTRS = ("line", "marker", "textfont")
+
+
+def sweep_chunks(start, stop, steps, chunk=STREAM_CHUNK):
+    """均匀扫描 [start, stop] 共 steps 个值，每次只生成 chunk 个 (与 np.linspace 的取值相同)"""
+    for lo in range(0, steps, chunk):
+        idx = np.arange(lo, min(lo + chunk, steps))
+        yield start + (stop - start) * idx / max(steps - 1, 1)
+
+
+def app_frame_stream(c_val, n_val, angle_val, anim_var_name, steps, current_progress,
+                     encoding=DEFAULT_ENCODING, chunk=STREAM_CHUNK):
+    """app.py：逐帧产出 (动画变量取值, 各 trace 的帧参数)，每块用 app_frame_data 批量计算"""
+    start, stop, _ = APP_SWEEPS[anim_var_name]
+    for values in sweep_chunks(start, stop, steps, chunk):
+        frame_data, _ = app_frame_data(c_val, n_val, angle_val, anim_var_name, values, current_progress, encoding)
+        yield from zip(values, frame_data)
+
+
+def video_frame_stream(angle_val, steps, encoding=DEFAULT_ENCODING, zoom=1, chunk=STREAM_CHUNK):
+    """video.py：逐帧产出 (c, 各 trace 的帧参数)；每次只显示一帧，曲线分辨率按单帧选取"""
+    resolution = video_curve_resolution(1, zoom)
+    for values in sweep_chunks(*VIDEO_C_RANGE, steps, chunk):
+        frame_data, _ = video_frame_data(angle_val, values, encoding,
+                                         video_frame_arrays(angle_val, values, resolution))
+        yield from zip(values, frame_data)
+
+
+def still_base(fig):
+    """把 build_*_figure 的结果变成流式播放的底图：去掉嵌入的帧和播放控件"""
+    base = fig.to_plotly_json()
+    layout = {k: v for k, v in base["layout"].items() if k not in ("sliders", "updatemenus")}
+    return {"data": base["data"], "layout": layout}
+
+
+def app_stream_base(mode, c_val, n_val, angle_val, anim_var_name, current_progress, encoding=DEFAULT_ENCODING):
+    """app.py 流式播放的底图 (扫描起点的单帧图表)"""
+    start = np.array([APP_SWEEPS[anim_var_name][0]], dtype=float)
+    return still_base(build_app_figure(mode, c_val, n_val, angle_val, anim_var_name, start, current_progress,
+                                       encoding))
+
+
+def video_stream_base(angle_val, encoding=DEFAULT_ENCODING, zoom=1):
+    """video.py 流式播放的底图 (c 扫描起点的单帧图表)"""
+    return still_base(build_video_figure(angle_val, np.array([VIDEO_C_RANGE[0]]), encoding, zoom=zoom)[0])
+
+
+def stream_figure(base, trace_ids, updates):
+    """底图换上一帧的 trace 参数，组装成可以直接显示的 go.Figure"""
+    data = list(base["data"])
+    for trace_id, update in zip(trace_ids, updates):
+        trace = data[trace_id]
+        data[trace_id] = dict(trace, **{k: dict(trace.get(k, {}), **v) if k in NESTED_ATTRS else v
+                                        for k, v in update.items()})
+    return assemble_figure(data, [], base["layout"])
+
+
+class LookAhead:
+    """
+    有界预读：后台线程从 frames 里取帧放进长度为 size 的队列，满了就等；
+    close() (或离开 with) 时生产线程在下一帧放弃，不再计算
+    """
+    _DONE = object()
+
+    def __init__(self, frames, size=STREAM_LOOKAHEAD):
+        self._frames = frames
+        self._queue = queue.Queue(maxsize=size)
+        self._stop = threading.Event()
+        self._error = None
+        self._thread = threading.Thread(target=self._produce, daemon=True, name="stream-lookahead")
+        self._thread.start()
+
+    def _put(self, item):
+        """放进队列；队列满时等待，期间被关闭则返回 False"""
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _produce(self):
+        try:
+            for frame in self._frames:
+                if not self._put(frame):
+                    return
+        except Exception as e:
+            self._error = e
+        self._put(self._DONE)
+
+    def __iter__(self):
+        while True:
+            item = self._queue.get()
+            if item is self._DONE:
+                if self._error is not None:
+                    raise self._error
+                return
+            yield item
+
+    def buffered(self):
+        """当前缓冲区里已算好的帧数"""
+        return self._queue.qsize()
+
+    def close(self):
+        self._stop.set()
+        self._thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def play(frames, base, trace_ids, show, fps=STREAM_FPS, lookahead=STREAM_LOOKAHEAD):
+    """
+    逐帧播放：show(fig, 取值, 序号, 缓冲帧数) 负责把当前帧显示出来，按 fps 控制节奏
+    返回首帧时间 (秒)；页面重跑打断播放时，预读线程随之关闭
+    """
+    t0 = time.perf_counter()
+    first = None
+    with LookAhead(frames, lookahead) as buffer:
+        for i, (value, updates) in enumerate(buffer):
+            show(stream_figure(base, trace_ids, updates), value, i, buffer.buffered())
+            now = time.perf_counter()
+            if first is None:
+                first = now - t0
+            time.sleep(max(0.0, t0 + first + (i + 1) / fps - now))
+    return first
+
+
+def stream_chart(chart, status, base, frames, trace_ids, steps, label, start):
+    """
+    页面的流式播放：chart 里先放底图 (扫描起点的单帧图表)，start 为真时逐帧推送 frames，
+    status 显示进度；label 为扫描变量名。播放中页面重跑会打断播放
+    """
+    with stage("chart"):
+        chart.plotly_chart(stream_figure(base, (), ()), use_container_width=True)
+    if not start:
+        status.caption(f"均匀扫描 {label}，共 {steps} 帧；帧在播放时才生成")
+        return
+
+    def show(fig, value, i, buffered):
+        # 每帧是一个新图表，同一次运行里需要各自的 key
+        chart.plotly_chart(fig, use_container_width=True, key=f"stream-frame-{i}")
+        status.caption(f"第 {i + 1} / {steps} 帧，{label} = {value:.2f}，预读 {buffered} 帧")
+
+    first = play(frames, base, trace_ids, show)
+    status.caption(f"播放完毕：{steps} 帧，首帧 {first * 1e3:.0f} ms")
@@ -0,0 +1,131 @@
+"""
+离线参数扫描：在整个 (c, n, 角度) 网格上核对 calc_c_range
+
+对每个格点做完整的 n 型变换 (progress=1)，用 check_intersection 判定 D'E' 是否碰到 y=x，
+再与 calc_c_range 给出的理论区间对比。网格按 c 分块，交给进程池并行计算，
+结果直接写进内存映射的 .npy 文件；中断后重新运行会跳过已完成的块。
+
+每个格点存一个 uint8：
+    bit0 = check_intersection 判定相交
+    bit1 = c 落在 calc_c_range 的区间内
+所以 0/3 表示两者一致，1/2 表示不一致 (通常只出现在区间端点的浮点误差上)。
+
+用法:
+    python sweep.py --c -5 8 1000 --n 1 5 200 --angle 0 360 360 --out sweep.npy
+"""
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from geometry import (apply_n_transform_batch, calc_c_range_batch, check_intersection_batch,
+                      get_triangle_CDE_batch)
+
+HIT = 1       # check_intersection 判定相交
+IN_RANGE = 2  # c 在 calc_c_range 区间内
+
+
+def grid_axes(meta):
+    return (np.linspace(*meta["c"]), np.linspace(*meta["n"]), np.linspace(*meta["angle"]))
+
+
+def compute_block(c, n, angle):
+    """计算一块网格 (len(c), len(n), len(angle)) 的结果编码"""
+    C, N, A = np.meshgrid(c, n, angle, indexing="ij")
+    c_flat, n_flat, a_flat = C.ravel(), N.ravel(), A.ravel()
+    trans = apply_n_transform_batch(get_triangle_CDE_batch(c_flat, a_flat), n_flat, 1.0)
+    hit = check_intersection_batch(trans)
+    c_min, c_max = calc_c_range_batch(a_flat, n_flat)
+    in_range = (c_flat >= c_min) & (c_flat <= c_max)
+    codes = hit.astype(np.uint8) * HIT | in_range.astype(np.uint8) * IN_RANGE
+    return codes.reshape(C.shape)
+
+
+def run_chunk(out_path, meta, chunk):
+    """子进程：算出第 chunk 块并写回内存映射文件，落盘后才返回"""
+    c, n, angle = grid_axes(meta)
+    i0 = chunk * meta["chunk"]
+    i1 = min(i0 + meta["chunk"], len(c))
+    result = np.lib.format.open_memmap(out_path, mode="r+")
+    result[i0:i1] = compute_block(c[i0:i1], n, angle)
+    result.flush()
+    del result
+    return chunk
+
+
+def meta_path(out_path):
+    return out_path + ".meta.json"
+
+
+def save_meta(out_path, meta):
+    """原子地写入进度文件，避免中断时留下半截 JSON"""
+    tmp = meta_path(out_path) + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    os.replace(tmp, meta_path(out_path))
+
+
+def load_or_create(out_path, meta):
+    """新建输出文件，或在网格参数一致时沿用已有文件 (续跑)"""
+    shape = (meta["c"][2], meta["n"][2], meta["angle"][2])
+    if os.path.exists(out_path) and os.path.exists(meta_path(out_path)):
+        with open(meta_path(out_path), encoding="utf-8") as f:
+            old = json.load(f)
+        grid_keys = ("c", "n", "angle", "chunk")
+        if any(old[k] != meta[k] for k in grid_keys):
+            raise SystemExit(f"{out_path} 已存在但网格参数不同；请换一个输出文件或删除旧文件")
+        return old
+    np.lib.format.open_memmap(out_path, mode="w+", dtype=np.uint8, shape=shape).flush()
+    meta = dict(meta, done=[])
+    save_meta(out_path, meta)
+    return meta
+
+
+def summarize(out_path):
+    result = np.load(out_path, mmap_mode="r")
+    counts = np.bincount(np.asarray(result).ravel(), minlength=4)
+    total = result.size
+    print(f"格点总数: {total}")
+    print(f"  两者都判定相交:       {counts[HIT | IN_RANGE]}")
+    print(f"  两者都判定不相交:     {counts[0]}")
+    print(f"  仅 check_intersection: {counts[HIT]}")
+    print(f"  仅 calc_c_range:      {counts[IN_RANGE]}")
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="在 (c, n, 角度) 网格上并行核对 calc_c_range")
+    parser.add_argument("--c", type=float, nargs=3, default=[-5.0, 8.0, 1000], metavar=("START", "STOP", "NUM"))
+    parser.add_argument("--n", type=float, nargs=3, default=[1.0, 5.0, 200], metavar=("START", "STOP", "NUM"))
+    parser.add_argument("--angle", type=float, nargs=3, default=[0.0, 360.0, 360], metavar=("START", "STOP", "NUM"))
+    parser.add_argument("--chunk", type=int, default=4, help="每块包含多少个 c 值")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="进程数")
+    parser.add_argument("--out", default="sweep.npy", help="输出 .npy 文件 (进度记录在 <out>.meta.json)")
+    args = parser.parse_args(argv)
+
+    meta = {
+        "c": [args.c[0], args.c[1], int(args.c[2])],
+        "n": [args.n[0], args.n[1], int(args.n[2])],
+        "angle": [args.angle[0], args.angle[1], int(args.angle[2])],
+        "chunk": args.chunk,
+    }
+    meta = load_or_create(args.out, meta)
+    n_chunks = -(-meta["c"][2] // meta["chunk"])
+    todo = sorted(set(range(n_chunks)) - set(meta["done"]))
+    if len(todo) < n_chunks:
+        print(f"续跑：{n_chunks - len(todo)}/{n_chunks} 块已完成")
+
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = [pool.submit(run_chunk, args.out, meta, chunk) for chunk in todo]
+        for k, future in enumerate(as_completed(futures), 1):
+            meta["done"].append(future.result())
+            save_meta(args.out, meta)
+            print(f"\r{k}/{len(todo)} 块", end="", flush=True)
+    print()
+    summarize(args.out)
+
+
+if __name__ == "__main__":
+    main()
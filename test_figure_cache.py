@@ -0,0 +1,100 @@
+"""
+图表缓存 (figure_cache.py) 的 LRU 淘汰、字节预算和统计，以及共享静态部分的键
+
+    python -m pytest -q
+"""
+import numpy as np
+
+from figure_cache import FigureCache, data_nbytes, quantize_key
+from figures import APP_MODES, app_sample_steps, build_app_figure, static_parts
+
+
+def test_lru_order():
+    cache = FigureCache(max_entries=2, max_bytes=1000)
+    cache.put("a", 1, 10)
+    cache.put("b", 2, 10)
+    # 读一次 a，淘汰的就是最久没用过的 b
+    assert cache.get("a") == 1
+    cache.put("c", 3, 10)
+    assert "a" in cache and "c" in cache and "b" not in cache
+    assert cache.stats()["evictions"] == 1
+
+
+def test_byte_budget_eviction():
+    cache = FigureCache(max_entries=10, max_bytes=100)
+    for key in "abcd":
+        cache.put(key, key, 30)
+    # 第 4 个放入后超出 100 字节，淘汰最旧的 a
+    assert "a" not in cache and all(k in cache for k in "bcd")
+    assert cache.stats()["bytes"] == 90
+    cache.put("e", "e", 80)
+    assert [k for k in "bcde" if k in cache] == ["e"]
+    assert cache.stats()["bytes"] == 80
+
+
+def test_oversize_value_is_skipped_and_drops_stale_entry():
+    cache = FigureCache(max_entries=10, max_bytes=100)
+    cache.put("a", "small", 10)
+    cache.put("b", "other", 10)
+    # 超出预算的新值不缓存，同一个键的旧值也不能留下
+    cache.put("a", "huge", 101)
+    assert "a" not in cache and cache.get("a") is None
+    assert cache.stats()["bytes"] == 10
+    # 不影响其他条目，也不算淘汰
+    assert cache.get("b") == "other" and cache.stats()["evictions"] == 0
+
+
+def test_replace_existing_key_keeps_byte_count():
+    cache = FigureCache(max_entries=10, max_bytes=100)
+    cache.put("a", 1, 40)
+    cache.put("a", 2, 20)
+    assert cache.get("a") == 2 and cache.nbytes("a") == 20 and cache.stats()["bytes"] == 20
+
+
+def test_stats_counts_hits_and_misses():
+    cache = FigureCache(max_entries=2, max_bytes=1000)
+    cache.get("a")
+    cache.put("a", 1, 10)
+    cache.get("a")
+    cache.get("a")
+    "a" in cache
+    cache.nbytes("a")
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (2, 1)
+    assert stats["entries"] == 1 and stats["bytes"] == 10
+    assert (stats["max_entries"], stats["max_bytes"]) == (2, 1000)
+
+
+def test_get_or_build_uses_builder_size():
+    cache = FigureCache(max_entries=10, max_bytes=1000, sizeof=lambda value: 1 / 0)
+    calls = []
+
+    def build():
+        calls.append(1)
+        return "fig", 123
+
+    assert cache.get_or_build("a", build, sized=True) == "fig"
+    assert cache.get_or_build("a", build, sized=True) == "fig"
+    assert len(calls) == 1 and cache.nbytes("a") == 123
+
+
+def test_data_nbytes_walks_arrays():
+    x = np.zeros(100, dtype=np.float32)
+    frame = {"x": x, "y": [1.0, 2.0], "name": "abc", "line": {"width": 2}}
+    assert data_nbytes([frame, (x,)]) == 400 + 16 + 3 + 8 + 400
+
+
+def test_quantize_key():
+    assert quantize_key("m", 1.0000000001, 2, True) == quantize_key("m", 1.0, 2, True)
+    assert quantize_key(1.5) != quantize_key(1.4)
+
+
+def test_static_parts_only_share_uniform_steps():
+    static_parts.clear()
+    for c_val in (0.5, 1.5, 2.5):
+        for sampling in ("uniform", "adaptive"):
+            steps = app_sample_steps(sampling, "progress", c_val, 3.0, 180.0, 1.0)
+            build_app_figure(APP_MODES[0], c_val, 3.0, 180.0, "progress", steps, 1.0)
+    # 只有均匀网格的 steps 进共享缓存，自适应的 steps 随参数变化，不共享
+    steps_keys = [key for key in static_parts._data if key[0] == "app-steps"]
+    assert steps_keys == [("app-steps", "progress")]
@@ -0,0 +1,41 @@
+"""
+相图 (figures.build_phase_figure)：满分辨率的 z、较粗的点击层，以及点击坐标取回滑块值
+
+    python -m pytest -q
+"""
+import numpy as np
+
+from figures import (PHASE_CLICK_STEPS, PHASE_SLIDERS, build_phase_figure, phase_axes, phase_cell_params,
+                     phase_grid)
+from geometry import calc_c_range
+
+
+def test_phase_grid_is_full_resolution():
+    n_axis, angle_axis, (c_min, c_max, width) = phase_grid()
+    assert (len(n_axis), len(angle_axis)) == (401, 721)
+    assert c_min.shape == (401, 721)
+    np.testing.assert_allclose(np.diff(n_axis), PHASE_SLIDERS["n"][3])
+    np.testing.assert_allclose(np.diff(angle_axis), PHASE_SLIDERS["angle"][3])
+    rng = np.random.default_rng(0)
+    for i, j in zip(rng.integers(0, 401, 20), rng.integers(0, 721, 20)):
+        np.testing.assert_allclose((c_min[i, j], c_max[i, j]), calc_c_range(angle_axis[j], n_axis[i]), atol=1e-12)
+    np.testing.assert_allclose(width, c_max - c_min)
+
+
+def test_phase_figure_heatmaps_and_click_layer():
+    fig = build_phase_figure()
+    heatmaps = [t for t in fig.data if t.type == "heatmap"]
+    overlays = [t for t in fig.data if t.type == "scatter"]
+    assert len(heatmaps) == len(overlays) == 3
+    for heatmap in heatmaps:
+        assert heatmap.z.dtype == np.float32 and heatmap.z.shape == (401, 721)
+    n_axis, angle_axis = phase_axes(PHASE_CLICK_STEPS)
+    assert len(overlays[0].x) == len(n_axis) * len(angle_axis) < 401 * 721 / 10
+
+
+def test_phase_cell_params_snaps_to_slider():
+    assert phase_cell_params(182.4, 2.996) == (182.5, 3.0)
+    # float32 发送的格子中心取回原值
+    assert phase_cell_params(float(np.float32(17.5)), float(np.float32(1.1))) == (17.5, 1.1)
+    # 超出范围的取边界
+    assert phase_cell_params(400.0, 0.2) == (360.0, 1.0)
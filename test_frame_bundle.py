@@ -0,0 +1,71 @@
+"""
+预计算帧数据包 (frame_bundle.py)：网格查找，以及 0.01 步长的 c/n 不在网格上时退回现算
+
+    python -m pytest -q
+"""
+import numpy as np
+import pytest
+
+import frame_bundle
+from figures import app_sample_steps, app_trace_batch
+from frame_bundle import build_bundle, get_frame_bundle, grid_index, slider_grid
+
+
+@pytest.fixture(scope="module")
+def bundle(tmp_path_factory):
+    """
+    缩小 c、n 滑块范围后生成的 angle 模式数据包 (网格 11 × 11 × 2 种采样)
+    APP_SLIDERS 与 figures 共用同一个 dict，本模块的测试期间都是缩小后的范围
+    """
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setitem(frame_bundle.APP_SLIDERS, "c", (0.0, 1.0, 0.5, 0.01))
+        mp.setitem(frame_bundle.APP_SLIDERS, "n", (2.0, 3.0, 3.0, 0.01))
+        path = str(tmp_path_factory.mktemp("bundle") / "frames.bundle")
+        build_bundle(path, ["angle"], ["uniform", "adaptive"])
+        get_frame_bundle.cache_clear()
+        yield get_frame_bundle(path)
+    get_frame_bundle.cache_clear()
+
+
+def test_slider_grid_and_index():
+    lo, hi, default = -5.0, 8.0, 1.0
+    grid = slider_grid(lo, hi, default, 0.1)
+    assert grid[0] == lo and grid[-1] == hi and default in grid
+    for i, value in enumerate(grid):
+        assert grid_index(float(value), lo, hi, default, 0.1) == i
+    # 浮点累加误差 (如 -5 + 62 × 0.1) 仍落在网格上
+    assert grid_index(-5 + 62 * 0.1, lo, hi, default, 0.1) == 62
+    # 0.01 一档的滑块值不在 0.1 网格上；范围外也不在
+    assert grid_index(1.23, lo, hi, default, 0.1) is None
+    assert grid_index(hi + 0.1, lo, hi, default, 0.1) is None
+    assert grid_index(lo - 0.1, lo, hi, default, 0.1) is None
+
+
+@pytest.mark.parametrize("sampling", ["uniform", "adaptive"])
+def test_on_grid_matches_live_build(bundle, sampling):
+    c_val, n_val, angle_val = 0.3, 2.7, 180.0
+    anim_steps, batch = bundle.app_frames("angle", c_val, n_val, angle_val, 1.0, sampling)
+    live_steps = app_sample_steps(sampling, "angle", c_val, n_val, angle_val, 1.0)
+    np.testing.assert_array_equal(anim_steps, live_steps)
+    live = app_trace_batch(c_val, n_val, angle_val, "angle", live_steps, 1.0)
+    assert batch.keys() == live.keys()
+    for key in live:
+        np.testing.assert_allclose(batch[key], live[key], atol=1e-12, err_msg=key)
+
+
+@pytest.mark.parametrize("c_val, n_val", [(0.37, 2.7), (0.3, 2.71), (1.5, 2.7)])
+def test_off_grid_falls_back_to_live_build(bundle, c_val, n_val):
+    # 页面里 bundled 为 None 时改为现算 (app_sample_steps + app_trace_batch)
+    assert bundle.app_frames("angle", c_val, n_val, 180.0, 1.0, "uniform") is None
+
+
+def test_unavailable_lookups(bundle):
+    assert bundle.app_frames("c", 0.3, 2.7, 180.0, 1.0, "uniform") is None   # 没有生成的模式
+    assert bundle.app_frames("angle", 0.3, 2.7, 180.0, 0.5, "uniform") is None  # progress 不是 1
+    assert bundle.video_frames(180.0, "uniform") is None
+
+
+def test_stale_signature_is_ignored(bundle, monkeypatch):
+    monkeypatch.setattr(frame_bundle, "BUNDLE_VERSION", frame_bundle.BUNDLE_VERSION + 1)
+    get_frame_bundle.cache_clear()
+    assert get_frame_bundle(bundle.path) is None
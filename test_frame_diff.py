@@ -0,0 +1,43 @@
+"""
+动画帧差分 (frame_diff.py)：省略不变部分后，叠加到底图上的画面与完整帧一致
+
+    python -m pytest -q
+"""
+import numpy as np
+
+from frame_diff import build_diffed_frames, changing_attrs
+
+
+def make_frame_data(rng, frames=20):
+    frame_data = []
+    for i in range(frames):
+        frame_data.append([
+            {"x": [0.0, 1.0], "y": [1.0, 2.0], "line": {"color": "#000000"}},  # 不变
+            {"x": rng.normal(size=5), "y": [0.0, None, 1.0, 2.0, 3.0]},          # 只有 x 变
+            {"x": [float(i)], "y": [float(i)], "text": [f"c={i}"]},               # 全变
+        ])
+    return frame_data
+
+
+def test_changing_attrs():
+    frame_data = make_frame_data(np.random.default_rng(0))
+    assert changing_attrs(frame_data, ["a", "b", "c"]) == {"b": ["x"], "c": ["x", "y", "text"]}
+
+
+def test_diffed_frames_render_like_full_frames():
+    trace_ids = [0, 1, 2]
+    frame_data = make_frame_data(np.random.default_rng(0))
+    frames = build_diffed_frames([str(i) for i in range(len(frame_data))], trace_ids, frame_data)
+    # 不变的 trace 不出现在帧里
+    assert all(list(frame.traces) == [1, 2] for frame in frames)
+
+    base = [dict(d) for d in frame_data[0]]
+    for frame, full in zip(frames, frame_data):
+        rendered = [dict(d) for d in base]
+        for trace_id, trace in zip(frame.traces, frame.data):
+            rendered[trace_id].update({k: v for k, v in trace.to_plotly_json().items() if k != "type"})
+        for got, want in zip(rendered, full):
+            assert got.keys() == want.keys()
+            for key in want:
+                dtype = object if key == "y" else None
+                np.testing.assert_array_equal(np.asarray(got[key], dtype=dtype), np.asarray(want[key], dtype=dtype))
@@ -0,0 +1,73 @@
+"""
+坐标编码 (frame_encoding.py) 经 Plotly 序列化后的往返一致性
+
+    python -m pytest -q
+"""
+import base64
+import json
+
+import numpy as np
+import plotly
+import plotly.graph_objects as go
+import pytest
+
+import frame_encoding
+from frame_encoding import DISPLAY_DECIMALS, ENCODINGS, MIN_BINARY_LENGTH, encode_coords, plotly_sends_binary
+
+
+def round_trip(values, encoding):
+    """编码后放进图表并序列化成 JSON，再按浏览器端的方式解码回浮点数组 (null 为 NaN)"""
+    fig = go.Figure(go.Scatter(x=encode_coords(values, encoding)))
+    sent = json.loads(fig.to_json())["data"][0]["x"]
+    if isinstance(sent, dict):
+        return np.frombuffer(base64.b64decode(sent["bdata"]), dtype=np.dtype(sent["dtype"])).astype(float), sent
+    return np.array([np.nan if v is None else v for v in sent], dtype=float), sent
+
+
+@pytest.fixture
+def coords():
+    values = list(np.random.default_rng(0).uniform(-10, 10, 200))
+    values[50] = None
+    return values
+
+
+@pytest.mark.parametrize("encoding", list(ENCODINGS))
+def test_round_trip_within_display_precision(coords, encoding):
+    decoded, _ = round_trip(coords, encoding)
+    expected = np.array([np.nan if v is None else v for v in coords], dtype=float)
+    assert np.isnan(decoded[50])
+    # 取整误差半个显示单位，float32 在 |x|<=10 时再加不到 1e-6
+    atol = 0 if encoding == "json" else 0.5 * 10 ** -DISPLAY_DECIMALS + 1e-6
+    np.testing.assert_allclose(decoded, expected, atol=atol, rtol=0)
+
+
+def test_rounded_encoding_is_exact_after_rounding(coords):
+    decoded, sent = round_trip(coords, "rounded")
+    assert isinstance(sent, list)
+    expected = np.round(np.array([np.nan if v is None else v for v in coords], dtype=float), DISPLAY_DECIMALS)
+    np.testing.assert_array_equal(decoded, expected)
+
+
+def test_float32_uses_bdata_with_plotly_6(coords):
+    major = int(plotly.__version__.split(".")[0])
+    assert plotly_sends_binary() == (major >= 6)
+    _, sent = round_trip(coords, "float32")
+    if major >= 6:
+        assert isinstance(sent, dict) and sent["dtype"] == "f4" and "bdata" in sent
+    else:
+        assert isinstance(sent, list)
+
+
+def test_short_arrays_stay_json():
+    _, sent = round_trip([0.5] * (MIN_BINARY_LENGTH - 1), "float32")
+    assert isinstance(sent, list)
+
+
+def test_float32_falls_back_without_binary(coords, monkeypatch):
+    monkeypatch.setattr(frame_encoding, "BINARY_ARRAYS", False)
+    assert encode_coords(coords, "float32") == encode_coords(coords, "rounded")
+
+
+def test_unknown_encoding():
+    with pytest.raises(ValueError):
+        encode_coords([1.0], "float16")
@@ -0,0 +1,118 @@
+"""
+帧数据服务 (frame_server.py)：查询参数解析、畸形请求返回 400、keep-alive 复用连接
+
+    python -m pytest -q
+"""
+import http.client
+import json
+import socket
+import struct
+import threading
+
+import numpy as np
+import pytest
+
+from figures import APP_SLIDERS, APP_SWEEPS, VIDEO_STEPS
+from frame_server import MAX_STEPS, BadRequest, FrameServer, parse_request
+
+
+@pytest.fixture(scope="module")
+def server():
+    server = FrameServer(("127.0.0.1", 0), workers=2)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+def raw_request(server, data):
+    """直接往套接字里写请求，读到服务端关闭连接为止，返回 (状态行, 头部, 正文)"""
+    with socket.create_connection(server.server_address, timeout=5) as sock:
+        sock.sendall(data)
+        response = sock.makefile("rb").read()
+    head, _, body = response.partition(b"\r\n\r\n")
+    status, *headers = head.decode("latin-1").split("\r\n")
+    return status, dict(h.split(": ", 1) for h in headers), body
+
+
+# ==========================================
+# 查询参数
+# ==========================================
+def test_parse_defaults():
+    mode, params = parse_request({})
+    assert mode == "c"
+    assert (params["c"], params["n"], params["angle"]) == tuple(APP_SLIDERS[p][2] for p in ("c", "n", "angle"))
+    assert (params["steps"], params["sampling"], params["format"]) == (APP_SWEEPS["c"][2], "uniform", "json")
+    assert parse_request({"mode": ["video"]})[1]["steps"] == VIDEO_STEPS
+
+
+def test_parse_values():
+    mode, params = parse_request({"mode": ["angle"], "c": ["1.5"], "n": ["2"], "steps": ["10"],
+                                  "sampling": ["adaptive"], "format": ["bin"], "progress": ["0.5"]})
+    assert mode == "angle"
+    assert params == {"c": 1.5, "n": 2.0, "angle": APP_SLIDERS["angle"][2], "progress": 0.5, "steps": 10,
+                      "sampling": "adaptive", "format": "bin"}
+
+
+@pytest.mark.parametrize("query", [
+    {"mode": ["spin"]}, {"c": ["abc"]}, {"steps": ["1.5"]}, {"steps": ["1"]}, {"steps": [str(MAX_STEPS + 1)]},
+    {"sampling": ["random"]}, {"format": ["xml"]}, {"n": ["nan"]}, {"angle": ["inf"]},
+])
+def test_parse_rejects(query):
+    with pytest.raises(BadRequest):
+        parse_request(query)
+
+
+# ==========================================
+# HTTP
+# ==========================================
+@pytest.mark.parametrize("data", [
+    b"GARBAGE\r\n\r\n",
+    b"GET /frames HTTP/1.1 extra\r\n\r\n",
+    b"GET /frames HTTP/x.y\r\n\r\n",
+])
+def test_malformed_request_line_is_400(server, data):
+    # 有状态行的 400 + JSON 错误信息，随后服务端关闭连接 (raw_request 读到 EOF 才返回)
+    status, headers, body = raw_request(server, data)
+    assert status.split()[1] == "400"
+    assert headers["Connection"] == "close" and headers["Content-Type"] == "application/json"
+    assert json.loads(body)["error"]
+
+
+def test_bad_query_is_400_json(server):
+    conn = http.client.HTTPConnection(*server.server_address, timeout=5)
+    conn.request("GET", "/frames?mode=spin")
+    response = conn.getresponse()
+    assert response.status == 400
+    assert "未知的模式" in json.loads(response.read())["error"]
+    conn.close()
+
+
+def test_keep_alive_reuses_connection(server):
+    conn = http.client.HTTPConnection(*server.server_address, timeout=5)
+    conn.request("GET", "/frames?mode=c&steps=5")
+    first = conn.getresponse()
+    body = json.loads(first.read())
+    sock = conn.sock
+    assert first.status == 200 and body["frames"] == 5
+    assert np.array(body["fields"]["orig"]["data"]).size == np.prod(body["fields"]["orig"]["shape"])
+
+    # 同一个连接上再发两个请求 (其中一个是错误请求，也不断开)
+    for path, status in (("/frames?mode=spin", 400), ("/frames?mode=video&steps=7&format=bin", 200)):
+        conn.request("GET", path)
+        response = conn.getresponse()
+        data = response.read()
+        assert response.status == status and conn.sock is sock
+    head_len = struct.unpack("<I", data[:4])[0]
+    header = json.loads(data[4:4 + head_len])
+    assert header["frames"] == 7 and header["fields"]["orig"]["shape"] == [7, 4, 2]
+    conn.close()
+
+
+def test_unknown_path_is_404(server):
+    conn = http.client.HTTPConnection(*server.server_address, timeout=5)
+    conn.request("GET", "/nothing")
+    assert conn.getresponse().status == 404
+    conn.close()
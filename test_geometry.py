@@ -0,0 +1,81 @@
+"""
+批量/闭式实现与逐帧参考实现的一致性检查
+
+    python -m pytest -q
+"""
+import numpy as np
+import pytest
+
+from geometry import (calc_sector_c_range, check_polygon_line_intersection_batch, get_trace_data, get_trace_data_batch,
+                      trace_data_at)
+
+
+@pytest.fixture
+def rng():
+    return np.random.default_rng(0)
+
+
+def check_polygon_line_intersection_loop(poly_x, poly_y):
+    """基线 video.py 的逐帧写法，作为批量版的参考"""
+    diffs = poly_x - poly_y
+    if np.all(diffs > 1e-5) or np.all(diffs < -1e-5):
+        return False
+    for i in range(len(diffs) - 1):
+        if diffs[i] * diffs[i + 1] <= 1e-6:
+            return True
+    return False
+
+
+@pytest.mark.parametrize("anim_var", ["c", "n", "angle", "progress", None])
+def test_trace_data_batch_matches_scalar(rng, anim_var):
+    params = {"c": 1.3, "n": 2.7, "angle": 195.0, "progress": 0.95}
+    frames = 200
+    values = {
+        "c": rng.uniform(-5, 8, frames),
+        "n": rng.uniform(1, 6, frames),
+        "angle": rng.uniform(0, 360, frames),
+        "progress": rng.uniform(0, 1, frames),
+    }
+    if anim_var is None:
+        params = values
+    else:
+        params[anim_var] = values[anim_var]
+
+    batch = get_trace_data_batch(params["c"], params["n"], params["angle"], params["progress"])
+    for i in range(frames):
+        scalar = {k: v if np.ndim(v) == 0 else v[i] for k, v in params.items()}
+        expected = get_trace_data(scalar["c"], scalar["n"], scalar["angle"], scalar["progress"])
+        actual = trace_data_at(batch, i)
+        assert actual.keys() == expected.keys()
+        for key, value in expected.items():
+            if isinstance(value, str) or (isinstance(value, list) and isinstance(value[0], str)):
+                assert actual[key] == value, key
+            else:
+                np.testing.assert_allclose(actual[key], value, atol=1e-12, err_msg=key)
+
+
+def test_polygon_intersection_batch_matches_loop(rng):
+    frames, points = 500, 12
+    # 围绕 y=x 随机摆放的小多边形，相交与不相交的帧都有
+    center = rng.uniform(-3, 3, (frames, 1))
+    offset = rng.uniform(-2, 2, (frames, 1))
+    poly_x = center + offset + rng.normal(0, 1, (frames, points))
+    poly_y = center - offset + rng.normal(0, 1, (frames, points))
+    poly_x[:, -1], poly_y[:, -1] = poly_x[:, 0], poly_y[:, 0]
+
+    is_intersect, cross_lo, cross_hi = check_polygon_line_intersection_batch(poly_x, poly_y)
+    expected = [check_polygon_line_intersection_loop(x, y) for x, y in zip(poly_x, poly_y)]
+    assert is_intersect.tolist() == expected
+    assert 0 < sum(expected) < frames
+    assert np.all(np.isnan(cross_lo[~is_intersect])) and np.all(np.isnan(cross_hi[~is_intersect]))
+    assert np.all(cross_lo[is_intersect] <= cross_hi[is_intersect])
+
+
+@pytest.mark.parametrize("n, angle_lo, angle_hi", [(3.0, 135, 270), (1.0, 135, 270), (4.5, 0, 360),
+                                                   (2.0, 10, 80), (3.0, 200, 250)])
+def test_sector_c_range_matches_sampling(n, angle_lo, angle_hi):
+    # 在 θ 上密集采样 D'、E' 两端的 x-y (不含 c 的部分)，取极值
+    theta = np.radians(np.linspace(angle_lo, angle_hi, 200001))
+    g = np.concatenate([2 * np.cos(theta) + 2 * np.sin(theta), 4 * np.sin(theta)])
+    expected = ((n - g.max()) / 2, (n - g.min()) / 2)
+    np.testing.assert_allclose(calc_sector_c_range(n, angle_lo, angle_hi), expected, atol=1e-6)
@@ -0,0 +1,91 @@
+"""
+热路径计时 (metrics.py)：嵌套阶段不重复计时，Prometheus / JSON 导出的格式
+
+    python -m pytest -q
+"""
+import json
+
+import pytest
+
+import metrics
+from metrics import MetricsRegistry, note, record_run, stage, timed
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """可手动推进的 perf_counter"""
+    now = [0.0]
+    monkeypatch.setattr(metrics.time, "perf_counter", lambda: now[0])
+
+    def advance(seconds):
+        now[0] += seconds
+    return advance
+
+
+@pytest.fixture
+def exported(monkeypatch, tmp_path):
+    """导出到临时文件，累计值用新的 registry"""
+    monkeypatch.setattr(metrics, "registry", MetricsRegistry())
+    monkeypatch.setattr(metrics, "PROM_FILE", str(tmp_path / "metrics.prom"))
+    monkeypatch.setattr(metrics, "JSON_LOG", str(tmp_path / "metrics.jsonl"))
+    return tmp_path
+
+
+def test_nested_stage_is_not_double_counted(clock):
+    with record_run("app") as run:
+        with stage("figure"):
+            clock(1.0)
+            with stage("frames"):
+                clock(2.0)
+                with stage("serialize"):
+                    clock(4.0)
+            clock(0.5)
+        # 同名阶段多次调用累加
+        timed("figure", clock)(0.25)
+    assert run.stages == {"figure": 1.75, "frames": 2.0, "serialize": 4.0}
+    assert sum(run.stages.values()) == 7.75
+    assert not run.cache_hit
+
+
+def test_stage_without_run_is_noop(clock):
+    with stage("frames"):
+        clock(1.0)
+    note(frames=3)
+    assert metrics.current_run() is None
+
+
+def test_export_shape(clock, exported):
+    for frames in (50, 60):
+        with record_run("app"):
+            with stage("frames"):
+                clock(0.5)
+            with stage("chart"):
+                clock(0.1)
+            note(frames=frames, payload_bytes=1000)
+    with record_run("video"):
+        with stage("chart"):
+            clock(0.2)
+
+    lines = [json.loads(line) for line in (exported / "metrics.jsonl").read_text(encoding="utf-8").splitlines()]
+    assert len(lines) == 3
+    assert set(lines[0]) == {"page", "time", "stages", "frames", "payload_bytes", "cache_hit"}
+    assert lines[0]["stages"] == {"frames": 0.5, "chart": pytest.approx(0.1)}
+    assert (lines[1]["frames"], lines[2]["cache_hit"]) == (60, True)
+
+    text = (exported / "metrics.prom").read_text(encoding="utf-8")
+    samples = {}
+    for line in text.splitlines():
+        if line.startswith("#"):
+            assert line.split()[1] in ("HELP", "TYPE")
+            continue
+        name, value = line.rsplit(" ", 1)
+        samples[name] = float(value)
+    assert samples['geometry_stage_seconds_sum{page="app",stage="frames"}'] == pytest.approx(1.0)
+    assert samples['geometry_stage_seconds_count{page="app",stage="frames"}'] == 2
+    assert samples['geometry_stage_seconds_max{page="video",stage="chart"}'] == pytest.approx(0.2)
+    assert samples['geometry_runs_total{page="app"}'] == 2
+    assert samples['geometry_cache_hits_total{page="video"}'] == 1
+    assert samples['geometry_frames_total{page="app"}'] == 110
+    assert samples['geometry_payload_bytes_total{page="app"}'] == 2000
+    # 每个指标的 TYPE 行在其样本之前
+    assert text.index("# TYPE geometry_runs_total counter") < text.index("geometry_runs_total{")
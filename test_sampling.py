@@ -0,0 +1,58 @@
+"""
+自适应帧采样 (sampling.py)：临界值都在、帧数不超预算、序列单调、标签不重复
+
+    python -m pytest -q
+"""
+import numpy as np
+import pytest
+
+from figures import ADAPTIVE_FRACTION, APP_SWEEPS, VIDEO_STEPS, app_adaptive_steps, video_c_values
+from geometry import FIXED_N, calc_sector_c_range
+from sampling import LABEL_DECIMALS, adaptive_steps, find_transitions
+
+
+def check_steps(steps, start, stop, budget, events):
+    assert len(steps) <= budget
+    assert steps[0] == start and steps[-1] == stop
+    diffs = np.diff(steps) * np.sign(stop - start)
+    assert np.all(diffs > 0)
+    for e in events:
+        assert e in steps
+    labels = [f"{v:.{LABEL_DECIMALS}f}" for v in steps]
+    assert len(set(labels)) == len(labels)
+
+
+@pytest.mark.parametrize("start, stop", [(0, 1), (-4, 8), (360, 0)])
+@pytest.mark.parametrize("budget", [10, 30, 43, 120])
+def test_adaptive_steps_properties(start, stop, budget):
+    rng = np.random.default_rng(budget)
+    span = stop - start
+    # 彼此、与端点都隔开的临界值
+    events = start + span * np.sort(rng.choice(np.arange(1, 10), 2, replace=False)) / 10
+    steps = adaptive_steps(start, stop, budget, events)
+    check_steps(steps, start, stop, budget, events)
+
+
+def test_adaptive_steps_without_events_is_uniform():
+    np.testing.assert_array_equal(adaptive_steps(0, 1, 11, []), np.linspace(0, 1, 11))
+
+
+def test_find_transitions():
+    events = find_transitions(lambda x: (x > 0.3) & (x < 0.7), 0, 1)
+    np.testing.assert_allclose(events, [0.3, 0.7], atol=1e-9)
+
+
+@pytest.mark.parametrize("anim_var_name", list(APP_SWEEPS))
+def test_app_adaptive_steps(anim_var_name):
+    start, stop, steps = APP_SWEEPS[anim_var_name]
+    values = app_adaptive_steps(anim_var_name, 1.0, 3.0, 180.0, 1.0)
+    assert len(values) <= round(steps * ADAPTIVE_FRACTION)
+    assert values[0] == start and values[-1] == stop
+    assert np.all(np.diff(values) > 0)
+    labels = [f"{v:.{LABEL_DECIMALS}f}" for v in values]
+    assert len(set(labels)) == len(labels)
+
+
+def test_video_adaptive_keeps_closed_form_events():
+    values = video_c_values(sampling="adaptive")
+    check_steps(values, values[0], values[-1], round(VIDEO_STEPS * ADAPTIVE_FRACTION), calc_sector_c_range(FIXED_N))
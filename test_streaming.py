@@ -0,0 +1,51 @@
+"""
+流式播放 (streaming.py)：页面共用的 stream_chart 把每一帧推到同一个占位里
+
+    python -m pytest -q
+"""
+import numpy as np
+import pytest
+
+import streaming
+from streaming import VIDEO_STREAM_TRACES, stream_chart, video_frame_stream, video_stream_base
+
+
+class Placeholder:
+    """记录调用的假占位 (代替 st.empty())"""
+
+    def __init__(self):
+        self.charts = []
+        self.captions = []
+
+    def plotly_chart(self, fig, **kwargs):
+        self.charts.append((fig, kwargs.get("key")))
+
+    def caption(self, text):
+        self.captions.append(text)
+
+
+@pytest.fixture
+def base():
+    return video_stream_base(180.0)
+
+
+def test_not_started_shows_base_only(base):
+    chart, status = Placeholder(), Placeholder()
+    stream_chart(chart, status, base, video_frame_stream(180.0, 10), VIDEO_STREAM_TRACES, 10, "c", start=False)
+    assert len(chart.charts) == 1 and chart.charts[0][1] is None
+    assert status.captions == ["均匀扫描 c，共 10 帧；帧在播放时才生成"]
+
+
+def test_started_pushes_every_frame(base, monkeypatch):
+    monkeypatch.setattr(streaming.time, "sleep", lambda seconds: None)
+    chart, status = Placeholder(), Placeholder()
+    steps = 10
+    stream_chart(chart, status, base, video_frame_stream(180.0, steps, chunk=4), VIDEO_STREAM_TRACES, steps, "c",
+                 start=True)
+    # 底图 + 每帧一张，各帧 key 不同
+    assert len(chart.charts) == steps + 1
+    assert [key for _, key in chart.charts[1:]] == [f"stream-frame-{i}" for i in range(steps)]
+    assert status.captions[-1].startswith(f"播放完毕：{steps} 帧")
+    # 最后一帧的 C 点就在扫描终点
+    c_points = [fig.data[6].x[0] for fig, _ in chart.charts[1:]]
+    np.testing.assert_allclose(c_points[-1], streaming.VIDEO_C_RANGE[1], atol=1e-3)
@@ -0,0 +1,49 @@
+"""
+离线参数扫描 (sweep.py)：批量区间与逐点区间一致，中断后续跑不重算已完成的块
+
+    python -m pytest -q
+"""
+import json
+
+import numpy as np
+
+import sweep
+from geometry import calc_c_range, calc_c_range_batch
+
+GRID = ["--c", "-5", "8", "10", "--n", "1", "5", "6", "--angle", "0", "360", "8", "--chunk", "3", "--workers", "1"]
+
+
+def test_c_range_batch_matches_scalar():
+    rng = np.random.default_rng(0)
+    angles = rng.uniform(0, 360, 50)
+    ns = rng.uniform(1, 6, 50)
+    c_min, c_max = calc_c_range_batch(angles, ns)
+    for angle, n, lo, hi in zip(angles, ns, c_min, c_max):
+        np.testing.assert_allclose((lo, hi), calc_c_range(angle, n), atol=1e-12)
+
+
+def test_resume_skips_completed_chunks(tmp_path):
+    out = str(tmp_path / "sweep.npy")
+    sweep.main(GRID + ["--out", out])
+    expected = np.load(out).copy()
+    meta = json.loads(open(sweep.meta_path(out), encoding="utf-8").read())
+    assert sorted(meta["done"]) == [0, 1, 2, 3]
+    c, n, angle = sweep.grid_axes(meta)
+    np.testing.assert_array_equal(expected, sweep.compute_block(c, n, angle))
+
+    # 模拟中断：第 2 块没记进进度；其余块的结果换成标记值，续跑若重算就会被覆盖
+    result = np.lib.format.open_memmap(out, mode="r+")
+    result[:] = 255
+    result.flush()
+    del result
+    meta["done"] = [0, 1, 3]
+    sweep.save_meta(out, meta)
+
+    sweep.main(GRID + ["--out", out])
+    resumed = np.load(out)
+    rows = slice(2 * meta["chunk"], 3 * meta["chunk"])
+    np.testing.assert_array_equal(resumed[rows], expected[rows])
+    untouched = np.ones(len(c), dtype=bool)
+    untouched[rows] = False
+    assert np.all(resumed[untouched] == 255)
+    assert sorted(json.loads(open(sweep.meta_path(out), encoding="utf-8").read())["done"]) == [0, 1, 2, 3]
@@ -0,0 +1,80 @@
+"""
+仿射变换流水线 (transforms.py) 的组合，以及多形状画布 (shapes.py) 的批量变换与逐个形状的写法一致
+
+    python -m pytest -q
+"""
+import numpy as np
+import pytest
+
+from figures import build_shapes_figure, shapes_polygons, shapes_transforms
+from geometry import apply_n_transform_batch, check_intersection_batch, get_triangle_CDE_batch
+from transforms import (apply_affine, compose, identity, interpolate, n_transform, n_transform_at, reflect_y, rotate,
+                        scale, segments_cross_line, translate)
+
+
+def test_compose_applies_in_written_order():
+    point = np.array([[1.0, 0.0]])
+    # 先平移再旋转 90°: (1,0) -> (2,0) -> (0,2)；反过来: (1,0) -> (0,1) -> (1,1)
+    np.testing.assert_allclose(apply_affine(point, compose(translate(1, 0), rotate(90))), [[0, 2]], atol=1e-12)
+    np.testing.assert_allclose(apply_affine(point, compose(rotate(90), translate(1, 0))), [[1, 1]], atol=1e-12)
+
+
+def test_pivots_and_stacks():
+    # 绕 (1, 1) 旋转、以 (1, 1) 为中心缩放都不动中心
+    np.testing.assert_allclose(apply_affine([[1.0, 1.0]], rotate(37, 1, 1)), [[1, 1]], atol=1e-12)
+    np.testing.assert_allclose(apply_affine([[1.0, 1.0]], scale(3, 2, 1, 1)), [[1, 1]], atol=1e-12)
+    # 成叠的矩阵与逐个构造一致
+    stack = compose(rotate(np.array([0.0, 90.0])), translate(np.array([1.0, 2.0]), 0))
+    for i, (angle, dx) in enumerate([(0, 1), (90, 2)]):
+        np.testing.assert_allclose(stack[i], compose(rotate(angle), translate(dx, 0)), atol=1e-12)
+
+
+def test_interpolate_endpoints():
+    m = compose(rotate(30), scale(2), translate(1, -1))
+    np.testing.assert_allclose(interpolate(m, 0), identity())
+    np.testing.assert_allclose(interpolate(m, 1), m)
+    np.testing.assert_allclose(interpolate(m, [0.0, 0.5, 1.0])[1], (identity() + m) / 2)
+
+
+@pytest.mark.parametrize("progress", [0.0, 0.2, 0.5, 0.8, 1.0])
+def test_n_transform_at_matches_composition(progress):
+    n = 2.5
+    t1, t2 = min(progress / 0.5, 1.0), max(progress - 0.5, 0.0) / 0.5
+    expected = compose(interpolate(reflect_y(n), t1), translate(t2 * n, 0))
+    np.testing.assert_allclose(n_transform_at(n, progress), expected, atol=1e-12)
+    if progress == 1.0:
+        np.testing.assert_allclose(n_transform_at(n, progress), n_transform(n), atol=1e-12)
+
+
+def test_affine_pipeline_matches_closed_form():
+    rng = np.random.default_rng(0)
+    frames = 300
+    c, angle = rng.uniform(-5, 8, frames), rng.uniform(0, 360, frames)
+    n, progress = rng.uniform(1, 5, frames), rng.uniform(0, 1, frames)
+    pts = get_triangle_CDE_batch(c, angle)
+    expected = apply_n_transform_batch(pts, n, progress)
+    np.testing.assert_allclose(apply_affine(pts, n_transform_at(n, progress)), expected, atol=1e-12)
+    # D'E' 线段与 y=x 的判定
+    np.testing.assert_array_equal(segments_cross_line(expected[:, 1:3], closed=False),
+                                  check_intersection_batch(expected))
+
+
+def test_shapes_batch_matches_per_shape_loop():
+    count, n_val, spin, scale_val = 13, 2.0, 120, 1.5
+    polygons, centers = shapes_polygons(count)
+    progress = np.linspace(0, 1, 7)
+    points = apply_affine(polygons, shapes_transforms(centers, n_val, spin, scale_val, progress))
+    assert points.shape == (len(progress), count) + polygons.shape[1:]
+    for f, t in enumerate(progress):
+        for s in range(count):
+            m = compose(rotate(spin * t, *centers[s]), interpolate(scale(scale_val), t), n_transform_at(n_val, t))
+            np.testing.assert_allclose(points[f, s], apply_affine(polygons[s], m), atol=1e-12)
+            assert segments_cross_line(points[f, s]) == segments_cross_line(points[f:f + 1, s:s + 1])[0, 0]
+
+
+def test_build_shapes_figure():
+    (fig, n_hits), nbytes = build_shapes_figure(24, 1.0, 90, 1.0, steps=10, with_nbytes=True)
+    assert len(fig.frames) == 10 and len(fig.data) == 4 and nbytes > 0
+    polygons, centers = shapes_polygons(24)
+    final = apply_affine(polygons, shapes_transforms(centers, 1.0, 90, 1.0, [1.0]))
+    assert n_hits == int(segments_cross_line(final).sum()) > 0
@@ -0,0 +1,78 @@
+"""
+后台预热 (warmup.py)：切换模式后不再需要的预热任务被取消，不进预热缓存
+
+    python -m pytest -q
+"""
+import threading
+
+import pytest
+
+from figure_cache import FigureCache
+from warmup import Cancelled, Warmer
+
+
+@pytest.fixture
+def warmer():
+    warmer = Warmer(FigureCache(max_entries=8, max_bytes=1000), workers=1, yield_seconds=0)
+    yield warmer
+    warmer._pool.shutdown(wait=True)
+
+
+def blocking_build(started, release, value):
+    """开始后等待 release，再经过一次检查点才返回"""
+    def build(check):
+        started.set()
+        release.wait(5)
+        check()
+        return value, 10
+    return build
+
+
+def test_mode_switch_cancels_pending_warm(warmer):
+    started, release = threading.Event(), threading.Event()
+    # 当前模式 1：预热模式 2、3 (只有一个线程，模式 3 在排队)
+    warmer.want("session", {"mode-2": blocking_build(started, release, "fig-2"),
+                            "mode-3": blocking_build(threading.Event(), release, "fig-3")})
+    assert started.wait(5)
+    # 切到模式 3：现在要预热模式 1、2；模式 3 的任务不再需要，排队中直接撤销
+    job_3 = warmer._jobs["mode-3"]
+    warmer.want("session", {"mode-1": blocking_build(threading.Event(), release, "fig-1"),
+                            "mode-2": blocking_build(threading.Event(), release, "unused")})
+    assert job_3.cancelled.is_set() and job_3.future.cancelled()
+    # 模式 2 仍在运行 (沿用原任务)，模式 1 排在它后面
+    job_1 = warmer._jobs["mode-1"]
+    release.set()
+    job_1.future.result(5)
+    assert "mode-3" not in warmer.cache
+    assert warmer.cache.get("mode-2") == "fig-2" and warmer.cache.get("mode-1") == "fig-1"
+    stats = warmer.stats()
+    assert (stats["done"], stats["cancelled"], stats["pending"]) == (2, 1, 0)
+
+
+def test_running_warm_stops_at_checkpoint(warmer):
+    started, release = threading.Event(), threading.Event()
+    warmer.want("session", {"mode-2": blocking_build(started, release, "fig-2")})
+    assert started.wait(5)
+    job = warmer._jobs["mode-2"]
+    # 换了参数，运行中的任务在下一个检查点放弃
+    warmer.want("session", {})
+    release.set()
+    job.future.result(5)
+    with pytest.raises(Cancelled):
+        job.check()
+    assert "mode-2" not in warmer.cache
+    assert warmer.stats()["done"] == 0 and warmer.stats()["cancelled"] == 1
+
+
+def test_shared_key_survives_other_session_leaving(warmer):
+    started, release = threading.Event(), threading.Event()
+    build = blocking_build(started, release, "fig-2")
+    warmer.want("a", {"mode-2": build})
+    warmer.want("b", {"mode-2": build})
+    assert started.wait(5)
+    job = warmer._jobs["mode-2"]
+    warmer.want("a", {})
+    assert not job.cancelled.is_set()
+    release.set()
+    job.future.result(5)
+    assert warmer.cache.get("mode-2") == "fig-2"
@@ -0,0 +1,144 @@
+"""
+仿射变换流水线
+
+平面仿射变换统一用 3×3 齐次矩阵表示，可以任意组合；n 型变换 (关于 y=n 翻折再右移 n)
+及其随 progress 插值的动画版本也只是其中的一种。多边形按 "数组结构" 存放：S 个 V 顶点的
+多边形就是一个 (S, V, 2) 数组，任意多个形状 × 任意多帧的变换都在一次批量矩阵乘法里完成，
+与 y=x 等直线的相交判定同样是整批向量化的，不随形状数量增加 Python 层的开销。
+只依赖 NumPy。
+
+geometry.py 里页面和基准测试走的单一 n 型变换仍用直接写出的闭式表达式 (逐帧矩阵在很长的
+扫描上慢约 1.3 倍)；这里的流水线用于组合多个变换、同时处理多个形状的多形状画布 (shapes.py，
+图表生成见 figures.shapes_frame_data)。
+"""
+import numpy as np
+
+
+# ==========================================
+# PART A: 3×3 齐次矩阵
+# ==========================================
+def identity():
+    return np.eye(3)
+
+def translate(dx, dy):
+    """平移；dx、dy 为标量或等长数组 (得到一叠矩阵)"""
+    dx, dy = np.broadcast_arrays(np.asarray(dx, dtype=float), np.asarray(dy, dtype=float))
+    m = np.zeros(dx.shape + (3, 3))
+    m[..., 0, 0] = m[..., 1, 1] = m[..., 2, 2] = 1.0
+    m[..., 0, 2], m[..., 1, 2] = dx, dy
+    return m
+
+def scale(sx, sy=None, cx=0.0, cy=0.0):
+    """以 (cx, cy) 为中心缩放"""
+    sy = sx if sy is None else sy
+    sx, sy = np.broadcast_arrays(np.asarray(sx, dtype=float), np.asarray(sy, dtype=float))
+    m = np.zeros(sx.shape + (3, 3))
+    m[..., 0, 0], m[..., 1, 1], m[..., 2, 2] = sx, sy, 1.0
+    m[..., 0, 2], m[..., 1, 2] = cx - sx * cx, cy - sy * cy
+    return m
+
+def rotate(angle_deg, cx=0.0, cy=0.0):
+    """绕 (cx, cy) 逆时针旋转 angle_deg 度"""
+    theta = np.radians(np.asarray(angle_deg, dtype=float))
+    cos, sin = np.cos(theta), np.sin(theta)
+    m = np.zeros(theta.shape + (3, 3))
+    m[..., 0, 0], m[..., 0, 1] = cos, -sin
+    m[..., 1, 0], m[..., 1, 1] = sin, cos
+    m[..., 0, 2] = cx - cos * cx + sin * cy
+    m[..., 1, 2] = cy - sin * cx - cos * cy
+    m[..., 2, 2] = 1.0
+    return m
+
+def reflect_y(n):
+    """关于水平线 y=n 翻折: (x, y) -> (x, 2n - y)"""
+    n = np.asarray(n, dtype=float)
+    m = np.zeros(n.shape + (3, 3))
+    m[..., 0, 0], m[..., 1, 1], m[..., 2, 2] = 1.0, -1.0, 1.0
+    m[..., 1, 2] = 2 * n
+    return m
+
+def compose(*mats):
+    """按书写顺序依次施加：compose(A, B) 先做 A 再做 B (= B @ A)，支持成叠的矩阵广播"""
+    result = identity()
+    for m in mats:
+        result = np.matmul(m, result)
+    return result
+
+def interpolate(m, t):
+    """从恒等变换到 m 的线性插值 (1-t)·I + t·m；t 为标量或数组 (得到一叠矩阵)"""
+    t = np.asarray(t, dtype=float)[..., None, None]
+    return (1 - t) * identity() + t * m
+
+
+# ==========================================
+# PART B: n 型变换
+# ==========================================
+def n_transform(n):
+    """完整的 n 型变换: 关于 y=n 翻折，再向右平移 n —— (x, y) -> (x + n, 2n - y)"""
+    return compose(reflect_y(n), translate(n, 0))
+
+def n_transform_at(n, progress):
+    """
+    动画中间状态的 n 型变换 (与 apply_n_transform 一致)：
+    progress ∈ [0, 0.5] 从原图逐渐翻折到关于 y=n 的像，(0.5, 1] 再逐渐右移 n，
+    即 compose(interpolate(reflect_y(n), t1), translate(t2 * n, 0))
+    n、progress 为标量或可相互广播的数组，返回 (..., 3, 3)
+    """
+    n, progress = np.broadcast_arrays(np.asarray(n, dtype=float), np.asarray(progress, dtype=float))
+    # 两个阶段的插值系数：前半段 t2 恒为 0，后半段 t1 恒为 1，所以不需要按阶段分支
+    t1 = np.minimum(progress / 0.5, 1.0)
+    t2 = np.maximum(progress - 0.5, 0.0) / 0.5
+    # 逐元素写出上面的组合，避免为每一帧做一次 3×3 矩阵乘法
+    m = np.zeros(n.shape + (3, 3))
+    m[..., 0, 0] = m[..., 2, 2] = 1.0
+    m[..., 0, 2] = t2 * n
+    m[..., 1, 1] = 1 - 2 * t1
+    m[..., 1, 2] = 2 * n * t1
+    return m
+
+
+# ==========================================
+# PART C: 多边形批量变换与相交判定
+# ==========================================
+def apply_affine(points, m):
+    """
+    points: (..., V, 2) 顶点数组；m: (..., 3, 3) 变换矩阵，两者的前导维度互相广播
+    例: (S, V, 2) 个形状 × (F, 1, 3, 3) 帧的变换 -> (F, S, V, 2)
+    """
+    points = np.asarray(points, dtype=float)
+    m = np.asarray(m, dtype=float)
+    if m.ndim == 2:
+        # 所有形状共用一个矩阵：整批顶点一次矩阵乘法
+        return points @ m[:2, :2].T + m[:2, 2]
+    # 每帧/每个形状各有矩阵时，把 2×2 的乘法按分量展开，比成批的小矩阵 matmul 快
+    x, y = points[..., 0], points[..., 1]
+    m = m[..., None, :, :]
+    return np.stack([m[..., 0, 0] * x + m[..., 0, 1] * y + m[..., 0, 2],
+                     m[..., 1, 0] * x + m[..., 1, 1] * y + m[..., 1, 2]], axis=-1)
+
+def pad_polygons(polygons):
+    """
+    不同顶点数的多边形 -> (S, V, 2) 数组；短的用最后一个顶点补齐 (退化成零长度的边，不影响相交判定)
+    """
+    polygons = [np.asarray(p, dtype=float).reshape(-1, 2) for p in polygons]
+    n_vertices = max(len(p) for p in polygons)
+    out = np.empty((len(polygons), n_vertices, 2))
+    for i, p in enumerate(polygons):
+        out[i, :len(p)] = p
+        out[i, len(p):] = p[-1]
+    return out
+
+def line_side(points, a=-1.0, b=1.0, c=0.0):
+    """顶点相对直线 a·x + b·y = c 的有符号值 (默认直线为 y=x)"""
+    return a * points[..., 0] + b * points[..., 1] - c
+
+def segments_cross_line(points, closed=True, a=-1.0, b=1.0, c=0.0):
+    """
+    每个多边形 (或折线) 是否有边碰到直线 a·x + b·y = c
+    points: (..., V, 2)；closed 为真时把最后一个顶点连回第一个
+    返回 (...,) 布尔数组；边的端点落在直线上也算相交
+    """
+    side = line_side(points, a, b, c)
+    if closed:
+        side = np.concatenate([side, side[..., :1]], axis=-1)
+    return np.any(side[..., :-1] * side[..., 1:] <= 0, axis=-1)
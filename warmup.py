@@ -0,0 +1,127 @@
+"""
+后台预热
+
+用户看着当前模式时，用一个有界的线程池把其他模式的图表提前做好，放进单独的预热缓存
+(有条目数和字节数上限)；切换模式时页面从预热缓存里取出，直接显示。
+预热线程和前台的 rerun 争用同一个 GIL：页面在前台图表显示之后才提交预热，线程池默认只有
+一个线程，每个任务开始前先让出一小段时间，让紧接着的 rerun 先跑 (也有机会先把任务取消)。
+每个会话声明自己当前想要预热哪些键 (want)，参数一变，不再需要的任务随即取消：
+还在排队的直接撤销，正在运行的在下一个检查点放弃。同一个键被多个会话需要时只算一次。
+"""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from figure_cache import get_figure_cache
+
+WARM_WORKERS = int(os.environ.get("WARM_WORKERS", 1))
+# 每个预热任务开始前让出的时间 (秒)
+WARM_YIELD = float(os.environ.get("WARM_YIELD", 0.05))
+WARM_MAX_ENTRIES = int(os.environ.get("WARM_MAX_ENTRIES", 32))
+WARM_MAX_BYTES = int(os.environ.get("WARM_MAX_BYTES", 64 * 2**20))
+
+
+class Cancelled(Exception):
+    """任务在检查点发现已被取消"""
+
+
+class WarmJob:
+    def __init__(self):
+        self.owners = set()
+        self.cancelled = threading.Event()
+        self.future = None
+
+    def check(self):
+        """检查点：任务已取消时抛出 Cancelled"""
+        if self.cancelled.is_set():
+            raise Cancelled
+
+
+class Warmer:
+    """按会话登记预热需求，在后台线程池里生成并放进预热缓存"""
+
+    def __init__(self, cache, workers=WARM_WORKERS, yield_seconds=WARM_YIELD):
+        self.cache = cache
+        self.yield_seconds = yield_seconds
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="warm")
+        self._lock = threading.Lock()
+        self._jobs = {}    # 键 -> WarmJob (排队中或运行中)
+        self._wanted = {}  # 会话 -> 该会话需要的键
+        self.done = 0
+        self.cancelled = 0
+
+    def want(self, owner, builds):
+        """
+        owner 当前需要预热的全部任务 {键: build(check)}；替换它上一次的需求
+        build 返回 (值, 字节数)，字节数直接用于预热缓存计量 (见 FigureCache.put)；
+        build 在耗时步骤之间调用 check()，任务被取消时 check() 抛出 Cancelled
+        """
+        with self._lock:
+            for key in self._wanted.pop(owner, set()) - set(builds):
+                self._release(owner, key)
+            wanted = set()
+            for key, build in builds.items():
+                if key in self.cache:
+                    continue
+                job = self._jobs.get(key)
+                if job is None:
+                    job = self._jobs[key] = WarmJob()
+                    job.future = self._pool.submit(self._run, key, build, job)
+                job.owners.add(owner)
+                wanted.add(key)
+            if wanted:
+                self._wanted[owner] = wanted
+
+    def _release(self, owner, key):
+        """owner 不再需要 key；没有会话需要时取消任务"""
+        job = self._jobs.get(key)
+        if job is None:
+            return
+        job.owners.discard(owner)
+        if not job.owners:
+            job.cancelled.set()
+            job.future.cancel()
+            del self._jobs[key]
+            self.cancelled += 1
+
+    def _run(self, key, build, job):
+        try:
+            # 先让出 GIL，前台的 rerun 优先
+            time.sleep(self.yield_seconds)
+            job.check()
+            value, nbytes = build(job.check)
+            job.check()
+            self.cache.put(key, value, nbytes)
+            with self._lock:
+                self.done += 1
+        except Cancelled:
+            pass
+        finally:
+            with self._lock:
+                if self._jobs.get(key) is job:
+                    del self._jobs[key]
+                for owner in job.owners:
+                    keys = self._wanted.get(owner)
+                    if keys is not None:
+                        keys.discard(key)
+                        if not keys:
+                            del self._wanted[owner]
+
+    def stats(self):
+        with self._lock:
+            return {"pending": len(self._jobs), "done": self.done, "cancelled": self.cancelled,
+                    "ready": self.cache.stats()["entries"]}
+
+
+_warmers = {}
+_warmers_lock = threading.Lock()
+
+
+def get_warmer(name):
+    """按名字取进程内共享的预热器；预热缓存登记为 "<名字>-warm" (见 figure_cache.get_figure_cache)"""
+    with _warmers_lock:
+        if name not in _warmers:
+            cache = get_figure_cache(f"{name}-warm", max_entries=WARM_MAX_ENTRIES, max_bytes=WARM_MAX_BYTES)
+            _warmers[name] = Warmer(cache)
+        return _warmers[name]